@@ -35,7 +35,7 @@ class State:
 
 pass_state = click.make_pass_decorator(State, ensure=True)
 
-clean_help = "Remove old files from the site_dir before building (the default)."
+clean_help = "Remove old files from the site_dir which are not part of the build (the default)."
 config_help = "Provide a specific MkDocs config"
 dev_addr_help = ("IP address and port to serve documentation locally (default: "
                  "localhost:8000)")
@@ -60,6 +60,14 @@ watch_theme_help = ("Include the theme in list of files to watch for live reload
                     "Ignored when live reload is not used.")
 wait_help = "Wait the specified number of seconds before reloading (default 0)."
 shell_help = "Use the shell when invoking Git."
+jobs_help = "The number of processes used to render Markdown pages. Use 0 for one process per CPU."
+cache_help = "Reuse rendered pages from the cache directory (default: the `cache` setting, which is off)."
+timings_help = "Print a summary of the time taken by each phase of the build and by each plugin event."
+timings_json_help = "Write the time taken by each phase of the build and by each plugin event to a JSON file."
+profile_markdown_help = (
+    "Print a summary of the time taken by each Markdown processor (such as those added by "
+    "extensions) and the slowest pages to render."
+)
 
 
 def add_options(opts):
@@ -150,12 +158,20 @@ def serve_command(dev_addr, livereload, **kwargs):
 @click.option('-c', '--clean/--dirty', is_flag=True, default=True, help=clean_help)
 @common_config_options
 @click.option('-d', '--site-dir', type=click.Path(), help=site_dir_help)
+@click.option('-j', '--jobs', type=int, help=jobs_help)
+@click.option('--cache/--no-cache', is_flag=True, default=None, help=cache_help)
+@click.option('--timings', is_flag=True, help=timings_help)
+@click.option('--timings-json', type=click.Path(dir_okay=False, writable=True), help=timings_json_help)
+@click.option('--profile-markdown', is_flag=True, help=profile_markdown_help)
 @common_options
-def build_command(clean, **kwargs):
+def build_command(clean, timings, timings_json, profile_markdown, **kwargs):
     """Build the MkDocs documentation"""
 
     try:
-        build.build(config.load_config(**kwargs), dirty=not clean)
+        build.build(
+            config.load_config(**kwargs), dirty=not clean, timings=timings, timings_json=timings_json,
+            profile_markdown=profile_markdown
+        )
     except exceptions.ConfigurationError as e:  # pragma: no cover
         # Avoid ugly, unhelpful traceback
         raise SystemExit('\n' + str(e))
@@ -171,6 +187,8 @@ def build_command(clean, **kwargs):
 @click.option('--shell', is_flag=True, help=shell_help)
 @common_config_options
 @click.option('-d', '--site-dir', type=click.Path(), help=site_dir_help)
+@click.option('-j', '--jobs', type=int, help=jobs_help)
+@click.option('--cache/--no-cache', is_flag=True, default=None, help=cache_help)
 @common_options
 def gh_deploy_command(clean, message, remote_branch, remote_name, force, ignore_version, shell, **kwargs):
     """Deploy your documentation to GitHub Pages"""
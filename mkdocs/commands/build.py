@@ -1,15 +1,33 @@
+import functools
+import io
+import json
 import logging
+import multiprocessing
 import os
+import tempfile
+import threading
+import time
 import gzip
 from urllib.parse import urlparse
 
 from jinja2.exceptions import TemplateNotFound
+from jinja2 import meta
 import jinja2
 
-from mkdocs import utils
+from mkdocs import instrument, utils
 from mkdocs.exceptions import BuildError
 from mkdocs.structure.files import Files, get_files
 from mkdocs.structure.nav import get_navigation
+from mkdocs.structure.pages import (
+    _get_link_url, activate, get_missing_links, get_missing_links_report, get_processor_times,
+    get_processor_times_summary, profile_markdown as set_markdown_profiling
+)
+from mkdocs.utils.cache import Cache, get_key
+from mkdocs.utils.deps import DependencyGraph
+from mkdocs.utils.fingerprint import Fingerprints
+from mkdocs.utils.manifest import Manifest
+from mkdocs.utils.prefetch import Prefetcher
+from mkdocs.utils.snapshot import Snapshot
 import mkdocs
 
 
@@ -28,6 +46,13 @@ log = logging.getLogger(__name__)
 log.addFilter(DuplicateFilter())
 log.addFilter(utils.warning_filter)
 
+# The links to missing files are reported through the logger of the pages, which has no
+# `DuplicateFilter`, so that the same report is logged (and counted) again by every build.
+links_log = logging.getLogger('mkdocs.structure.pages')
+
+# The file in site_dir which records the dependencies of each page for dirty builds.
+DEPS_FILENAME = '.mkdocs-deps.json'
+
 
 def get_context(nav, files, config, page=None, base_url=''):
     """
@@ -44,9 +69,13 @@ def get_context(nav, files, config, page=None, base_url=''):
     if isinstance(files, Files):
         files = files.documentation_pages()
 
+    # The page and its ancestors, which the theme should mark as active.
+    active_items = (page, *page.ancestors) if page is not None else ()
+
     return {
         'nav': nav,
         'pages': files,
+        'active_items': active_items,
 
         'base_url': base_url,
 
@@ -118,10 +147,11 @@ def _build_theme_template(template_name, env, files, config, nav):
         if template_name == 'sitemap.xml':
             log.debug("Gzipping template: %s", template_name)
             gz_filename = '{}.gz'.format(output_path)
-            with open(gz_filename, 'wb') as f:
-                timestamp = utils.get_build_timestamp()
-                with gzip.GzipFile(fileobj=f, filename=gz_filename, mode='wb', mtime=timestamp) as gz_buf:
-                    gz_buf.write(output.encode('utf-8'))
+            gz_content = io.BytesIO()
+            timestamp = utils.get_build_timestamp()
+            with gzip.GzipFile(fileobj=gz_content, filename=gz_filename, mode='wb', mtime=timestamp) as gz_buf:
+                gz_buf.write(output.encode('utf-8'))
+            utils.write_file(gz_content.getvalue(), gz_filename)
     else:
         log.info("Template skipped: '{}' generated empty output.".format(template_name))
 
@@ -151,106 +181,457 @@ def _build_extra_template(template_name, files, config, nav):
         log.info("Template skipped: '{}' generated empty output.".format(template_name))
 
 
-def _populate_page(page, config, files, dirty=False):
-    """ Read page content from docs_dir and render Markdown. """
+def _populate_page(page, config, files, cache=None, prefetcher=None, lazy=False):
+    """
+    Read page content from docs_dir and render Markdown. If `lazy`, the Markdown is rendered
+    the first time that the content of the page is accessed.
+    """
 
     try:
-        # When --dirty is used, only read the page if the file has been modified since the
-        # previous build of the output.
-        if dirty and not page.file.is_modified():
-            return
-
         # Run the `pre_page` plugin event
         page = config['plugins'].run_event(
             'pre_page', page, config=config, files=files
         )
 
-        page.read_source(config)
+        page.read_source(config, prefetcher)
 
         # Run `page_markdown` plugin events.
         page.markdown = config['plugins'].run_event(
             'page_markdown', page.markdown, page=page, config=config, files=files
         )
 
-        page.render(config, files)
-
-        # Run `page_content` plugin events.
-        page.content = config['plugins'].run_event(
-            'page_content', page.content, page=page, config=config, files=files
-        )
+        if lazy:
+            page.defer_render(functools.partial(_render_deferred_page, page, config, files, cache))
+        else:
+            _render_page(page, config, files, cache)
     except Exception as e:
         log.error("Error reading page '{}': {}".format(page.file.src_path, e))
         raise
 
 
-def _build_page(page, config, doc_files, nav, env, dirty=False):
-    """ Pass a Page to theme template and write output to site_dir. """
+def _render_page(page, config, files, cache=None):
+    """ Render the Markdown of a page and run the `page_content` plugin events. """
+
+    page.render(config, files, cache)
+
+    # Run `page_content` plugin events.
+    page.content = config['plugins'].run_event(
+        'page_content', page.content, page=page, config=config, files=files
+    )
+
+
+def _render_deferred_page(page, config, files, cache=None):
+    """ Render a page whose rendering was deferred, when its content is first accessed. """
 
     try:
-        # When --dirty is used, only build the page if the file has been modified since the
-        # previous build of the output.
-        if dirty and not page.file.is_modified():
-            return
+        with instrument.span('render_page', page.file.src_path):
+            _render_page(page, config, files, cache)
+    except Exception as e:
+        log.error("Error rendering page '{}': {}".format(page.file.src_path, e))
+        raise
 
-        log.debug("Building page {}".format(page.file.src_path))
 
-        # Activate page. Signals to theme that this is the current page.
-        page.active = True
+def _populate_pages(config, files, cache=None, spill_dir=None, lazy=False):
+    """
+    Read and render all Markdown pages, using worker processes if `jobs` allows it.
+
+    If a `spill_dir` is given, the Markdown and HTML of each page are released to it once rendered.
+    If `lazy`, each page is rendered the first time that its content is accessed.
+    """
+
+    for page in _iter_populated_pages(config, files, cache, lazy):
+        if spill_dir is not None:
+            page.release(spill_dir)
 
-        context = get_context(nav, doc_files, config, page)
 
-        # Allow 'template:' override in md source files.
-        if 'template' in page.meta:
-            template = env.get_template(page.meta['template'])
+def _iter_populated_pages(config, files, cache=None, lazy=False):
+    """
+    Read and render all Markdown pages, using worker processes if `jobs` allows it, and yield
+    each page (in order) as soon as it has been populated.
+    """
+
+    pages = [file.page for file in files.documentation_pages()]
+    jobs = config['jobs'] if config['jobs'] > 0 else os.cpu_count() or 1
+
+    # Pages which are rendered lazily are rendered in the main process, so they are read serially.
+    if jobs > 1 and len(pages) > 1 and not lazy:
+        unsafe = config['plugins'].get_parallel_unsafe()
+        if 'fork' not in multiprocessing.get_all_start_methods():  # pragma: no cover
+            log.info("Rendering pages in parallel is not supported on this platform.")
+        elif threading.active_count() > 1:
+            # A forked process only has a copy of the thread which forked it, so any lock held by
+            # another thread (such as those of the live reload server) could never be released.
+            log.info("Rendering pages serially as other threads are running, such as those of a server.")
+        elif unsafe:
+            log.info(
+                "Rendering pages serially as the following plugins are not marked as "
+                "safe to run in parallel: {}".format(', '.join(unsafe))
+            )
         else:
-            template = env.get_template('main.html')
+            yield from _populate_pages_parallel(pages, config, files, cache, jobs)
+            return
 
-        # Run `page_context` plugin events.
-        context = config['plugins'].run_event(
-            'page_context', context, page=page, config=config, nav=nav
+    # Read the sources of the pages which follow on background threads while each page is rendered,
+    # unless a plugin provides the sources.
+    paths = [] if config['plugins'].events['page_read_source'] else [page.file.abs_src_path for page in pages]
+    with Prefetcher(paths) as prefetcher:
+        for page in pages:
+            log.debug("Reading: " + page.file.src_path)
+            with instrument.span('populate_page', page.file.src_path):
+                _populate_page(page, config, files, cache, prefetcher, lazy)
+            yield page
+
+
+def _read_headers(config, files):
+    """ Read the meta-data and title of all Markdown pages, without rendering them. """
+
+    for file in files.documentation_pages():
+        try:
+            file.page.read_header(config)
+        except Exception as e:
+            log.error("Error reading page '{}': {}".format(file.src_path, e))
+            raise
+
+
+def _use_streaming(config):
+    """ Return whether pages are streamed, as requested by the `streaming` option and allowed by plugins. """
+
+    if not config['streaming']:
+        return False
+    unsafe = config['plugins'].get_streaming_unsafe()
+    if unsafe:
+        log.info(
+            "Building pages in two phases as the following plugins are not marked as "
+            "safe to stream pages: {}".format(', '.join(unsafe))
         )
+        return False
+    return True
 
-        # Render the template.
-        output = template.render(context)
 
-        # Run `post_page` plugin events.
-        output = config['plugins'].run_event(
-            'post_page', output, page=page, config=config
+def _use_lazy_render(config, streaming=False):
+    """
+    Return whether pages are rendered when their content is first accessed, as requested by the
+    `lazy_render` option and allowed by plugins. Streamed pages are always rendered as they are built.
+    """
+
+    if not config['lazy_render'] or streaming:
+        return False
+    unsafe = config['plugins'].get_streaming_unsafe()
+    if unsafe:
+        log.info(
+            "Rendering all pages before they are built as the following plugins are not marked as "
+            "safe to stream pages: {}".format(', '.join(unsafe))
         )
+        return False
+    return True
+
+
+class _RecordCollector(logging.Handler):
+    """ Collect the log records of a worker process so that the main process can emit them. """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Merge the arguments into the message so that the record can be pickled.
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+# The state of a worker process, which is inherited from the main process by `fork`.
+_worker_state = None
+
+
+def _init_worker(config, files, cache):
+    """ Initialize a worker process and redirect all of its logging to a collector. """
+    global _worker_state
+
+    collector = _RecordCollector()
+    logging.getLogger().handlers = [collector]
+    mkdocs_logger = logging.getLogger('mkdocs')
+    mkdocs_logger.handlers = []
+    mkdocs_logger.propagate = True
+
+    _worker_state = (config, files, cache, collector)
+
+
+def _populate_page_in_worker(src_path):
+    """ Populate a page in a worker process and return the data needed by the main process. """
+
+    config, files, cache, collector = _worker_state
+    collector.records = []
+    config['plugins'].reset_costs()
+    file = files.get_file_from_path(src_path)
+    start = time.perf_counter()
+    try:
+        _populate_page(file.page, config, files, cache)
+    except Exception as e:
+        return None, collector.records, e
+
+    page = file.page
+    data = (
+        page.markdown, page.content, page.toc, page.meta, page.title, page._links, page._processor_times,
+        time.perf_counter() - start, config['plugins'].costs
+    )
+    if config['low_memory']:
+        # The main process keeps the page, so the copy in this process is no longer needed.
+        page.markdown = page.content = None
+    return data, collector.records, None
+
+
+def _populate_pages_parallel(pages, config, files, cache, jobs):
+    """
+    Populate pages in a pool of worker processes, and yield each page once it is populated.
+
+    Results are applied to the pages in order, and any messages logged by a worker are
+    emitted in the main process (before the page they relate to is updated), so that the
+    outcome matches a serial build.
+    """
+
+    log.debug("Reading markdown pages with {} processes.".format(jobs))
+    context = multiprocessing.get_context('fork')
+    chunksize = max(1, len(pages) // (jobs * 4))
+    with context.Pool(jobs, _init_worker, (config, files, cache)) as pool:
+        results = pool.imap(_populate_page_in_worker, [page.file.src_path for page in pages], chunksize)
+        for page, (data, records, error) in zip(pages, results):
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            if error is not None:
+                raise error
+            (
+                page.markdown, page.content, page.toc, page.meta, page.title, page._links, page._processor_times,
+                duration, costs
+            ) = data
+            instrument.record('populate_page', duration, page.file.src_path)
+            for (plugin_name, event_name), (calls, event_duration) in costs.items():
+                config['plugins'].add_cost(plugin_name, event_name, event_duration, calls)
+            yield page
+
+
+def _get_template_name(page):
+    """ Return the name of the theme template used to build a page. """
+
+    # Allow 'template:' override in md source files.
+    return page.meta.get('template', 'main.html')
+
+
+def _get_template_deps(env, name, templates=None):
+    """
+    Return a dict of the name and source hash of the template and every template it references.
+
+    Templates referenced by a dynamic name can not be determined, so all templates are
+    included when one is found. A dict passed as `templates` is updated in place.
+    """
+
+    templates = {} if templates is None else templates
+    if name in templates:
+        return templates
+    try:
+        source, filename, uptodate = env.loader.get_source(env, name)
+    except TemplateNotFound:
+        # The error is reported when the template is rendered.
+        templates[name] = None
+        return templates
+    templates[name] = get_key(source)
+    for ref in meta.find_referenced_templates(env.parse(source)):
+        if ref is None:
+            for ref in env.list_templates():
+                _get_template_deps(env, ref, templates)
+        else:
+            _get_template_deps(env, ref, templates)
+    return templates
+
+
+def _get_build_key(config):
+    """ Return a key for the config and any other inputs which every page depends on. """
+
+    values = {}
+    for key, value in config.items():
+        if key == 'plugins':
+            value = [(name, dict(plugin.config)) for name, plugin in value.items()]
+        elif key == 'theme':
+            value = (value.name, value.dirs, sorted(value.static_templates), dict(value._vars))
+        values[key] = value
+    return get_key(mkdocs.__version__, values, utils.asset_urls)
+
+
+def _get_nav_key(nav, doc_files):
+    """ Return a key for the titles and structure of the navigation and the list of pages. """
+
+    return get_key(repr(nav), [(file.url, file.page.title) for file in doc_files])
+
+
+def _get_page_deps(page, env, nav_key, templates, lazy=False, files=None, previous=None):
+    """
+    Return the inputs of a page's output, for recording in a `DependencyGraph`.
+
+    `templates` is a dict of the dependencies of each template name, which is shared between pages.
+
+    If `lazy`, the content of the page is represented by its Markdown, so that a page which has not
+    been rendered need not be. The links of such a page are taken from the `previous` deps of its
+    output (if there are any), with the URLs which they resolve to in `files`.
+    """
+
+    name = _get_template_name(page)
+    if name not in templates:
+        templates[name] = _get_template_deps(env, name)
+
+    if not lazy:
+        content = get_key(page.content, str(page.toc), page.meta, page.title)
+        links = page._links
+    else:
+        content = get_key(page.markdown, page.meta, page.title)
+        if page._deferred is not None and previous is not None:
+            links = [
+                (target_path, _get_link_url(page.file, files, target_path))
+                for target_path in previous['deps']['links']
+            ]
+        else:
+            page.render_deferred()
+            links = page._links
+
+    return {
+        'content': content,
+        'links': {target_path: url for target_path, url in links},
+        'templates': templates[name],
+        'nav': nav_key,
+    }
+
+
+def _build_page(page, config, doc_files, nav, env, changed=True):
+    """
+    Pass a Page to theme template and write output to site_dir.
+
+    When `changed` is false, the inputs of the page are the same as those of its existing
+    output, so only the `page_context` plugin events are run.
+    """
+
+    try:
+        log.debug("Building page {}".format(page.file.src_path))
+
+        context = get_context(nav, doc_files, config, page)
+
+        template_name = _get_template_name(page)
+        template = env.get_template(template_name)
+        producing = utils.output_tracker.producing('template:' + template_name, page.file.src_path)
+
+        # Activate page. Signals to theme that this is the current page. The state only applies
+        # to this thread, so the shared navigation is never modified.
+        with activate(context['active_items']):
+            # Run `page_context` plugin events.
+            context = config['plugins'].run_event(
+                'page_context', context, page=page, config=config, nav=nav
+            )
+
+            if not changed:
+                log.debug("Skip building unchanged page: '{}'".format(page.file.src_path))
+                with producing:
+                    utils.output_tracker.add(page.file.abs_dest_path, written=False)
+                return
+
+            # Render the template.
+            output = template.render(context)
+
+            # Run `post_page` plugin events.
+            output = config['plugins'].run_event(
+                'post_page', output, page=page, config=config
+            )
 
         # Write the output file.
         if output.strip():
-            utils.write_file(output.encode('utf-8', errors='xmlcharrefreplace'), page.file.abs_dest_path)
+            with producing:
+                utils.write_file(output.encode('utf-8', errors='xmlcharrefreplace'), page.file.abs_dest_path)
         else:
             log.info("Page skipped: '{}'. Generated empty output.".format(page.file.src_path))
-
-        # Deactivate page
-        page.active = False
     except Exception as e:
         log.error("Error building page '{}': {}".format(page.file.src_path, e))
         raise
 
 
-def build(config, live_server=False, dirty=False):
+def _report_missing_links(files):
+    """ Report every link to a missing file at once, rather than as each page is rendered. """
+
+    missing_links = get_missing_links(file.page for file in files.documentation_pages())
+    if missing_links:
+        links_log.warning(get_missing_links_report(missing_links))
+
+
+def _remove_outputs(paths, files, site_dir):
+    """
+    Remove output files of a previous build which are not produced by any of `files`, and any
+    directories of `site_dir` left empty.
+    """
+
+    dest_paths = {file.abs_dest_path for file in files}
+    removed = []
+    for path in paths:
+        if path not in dest_paths and os.path.isfile(path):
+            log.debug("Removing stale output file: '{}'".format(path))
+            os.remove(path)
+            removed.append(path)
+    utils.remove_empty_dirs(site_dir, removed)
+
+
+def _write_timings(path, plugins, pages=None):
+    """
+    Write the timing spans of the build and the cost of each plugin's event methods as JSON,
+    with the time spent in each Markdown processor if they were profiled for `pages`.
+    """
+    data = {
+        'spans': instrument.to_dict()['children'],
+        'plugins': plugins.get_costs(),
+    }
+    if pages is not None:
+        data['markdown'] = {
+            'processors': [
+                {'name': label, 'pages': count, 'time': seconds}
+                for label, count, seconds in get_processor_times(pages)
+            ],
+            'pages': {
+                page.file.src_path: page._processor_times for page in pages if page._processor_times
+            },
+        }
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    except OSError as e:
+        log.warning("Unable to write build timings to '{}': {}".format(path, e))
+
+
+def build(config, live_server=False, dirty=False, timings=False, timings_json=None, profile_markdown=False):
     """ Perform a full site build. """
+    spill = None
+    manifest = None
     try:
+        # Worker processes inherit the setting, as they are forked after it is set.
+        set_markdown_profiling(profile_markdown)
 
-        from time import time
-        start = time()
+        start = time.time()
+        utils.output_tracker.reset()
+        utils.asset_urls.clear()
+        instrument.reset()
+        config['plugins'].reset_costs()
 
         # Run `config` plugin events.
-        config = config['plugins'].run_event('config', config)
+        with instrument.span('config'):
+            config = config['plugins'].run_event('config', config)
+
+        # List the files in the site_dir before anything is output, as only those files (which are
+        # not output again) are stale once the build is complete. If the manifest of the previous
+        # build lists every file it output, only those files are listed.
+        manifest = Manifest(config['site_dir'])
+        manifest.load()
+        listing = None
+        if not dirty:
+            with instrument.span('list_site_dir'):
+                listing = utils.list_files(config['site_dir'], manifest.get_paths() if manifest.complete else None)
 
         # Run `pre_build` plugin events.
-        config['plugins'].run_event('pre_build', config=config)
-
-        if not dirty:
-            log.info("Cleaning site directory")
-            utils.clean_directory(config['site_dir'])
-        else:  # pragma: no cover
-            # Warn user about problems that may occur with --dirty option
-            log.warning("A 'dirty' build is being performed, this will likely lead to inaccurate navigation and other"
-                        " links within your site. This option is designed for site development purposes only.")
+        with instrument.span('pre_build'):
+            config['plugins'].run_event('pre_build', config=config)
 
         if not live_server:  # pragma: no cover
             log.info("Building documentation to directory: %s", config['site_dir'])
@@ -259,52 +640,204 @@ def build(config, live_server=False, dirty=False):
 
         # First gather all data from all files/pages to ensure all data is consistent across all pages.
 
-        files = get_files(config)
+        with instrument.span('get_files'):
+            files = get_files(config)
         env = config['theme'].get_env()
-        files.add_files_from_theme(env, config)
+        theme_cache = None
+        if config['cache']:
+            theme_cache = Cache(os.path.join(config['cache_dir'], 'theme'), config['cache_max_size'] * 1024 * 1024)
+        with instrument.span('add_files_from_theme'):
+            files.add_files_from_theme(env, config, theme_cache)
 
         # Run `files` plugin events.
-        files = config['plugins'].run_event('files', files, config=config)
-
-        nav = get_navigation(files, config)
+        with instrument.span('files'):
+            files = config['plugins'].run_event('files', files, config=config)
+
+        # Compare the sources with those of the previous build, so that a dirty build can tell which
+        # files have changed even when the modification times of unchanged files have changed.
+        snapshot = None
+        loaded = False
+        if config['cache']:
+            with instrument.span('snapshot'):
+                snapshot = Snapshot(os.path.join(config['cache_dir'], 'snapshot'), config['site_dir'])
+                loaded = snapshot.load()
+                paths = [file.abs_src_path for file in files]
+                if config.config_file_path:
+                    paths.append(os.path.abspath(config.config_file_path))
+                snapshot.scan(paths)
+            if loaded:
+                log.debug("Found {} added, {} changed and {} removed source files since the previous build.".format(
+                    len(snapshot.added), len(snapshot.changed), len(snapshot.removed)
+                ))
+
+        with instrument.span('get_navigation'):
+            nav = get_navigation(files, config)
 
         # Run `nav` plugin events.
-        nav = config['plugins'].run_event('nav', nav, config=config, files=files)
-
-        log.debug("Reading markdown pages.")
-        for file in files.documentation_pages():
-            log.debug("Reading: " + file.src_path)
-            _populate_page(file.page, config, files, dirty)
+        with instrument.span('nav'):
+            nav = config['plugins'].run_event('nav', nav, config=config, files=files)
+
+        cache = None
+        if config['cache']:
+            cache = Cache(os.path.join(config['cache_dir'], 'render'), config['cache_max_size'] * 1024 * 1024)
+
+        # When streaming, only the titles of the pages are read now. Each page is then rendered,
+        # built and written in turn, and its content is discarded before the next page is read.
+        streaming = _use_streaming(config)
+
+        # In low memory mode, the Markdown and HTML of each page are written to a temporary
+        # directory as soon as they are no longer needed, and are read back if accessed.
+        spill_dir = None
+        if config['low_memory'] and not streaming:
+            spill = tempfile.TemporaryDirectory(prefix='mkdocs_')
+            spill_dir = spill.name
+
+        # When rendering lazily, each page is rendered when its content is first accessed (which is
+        # usually when it is built), and a page whose output is unchanged may not be rendered at all.
+        lazy = _use_lazy_render(config, streaming)
+
+        if streaming:
+            log.debug("Reading the headers of markdown pages.")
+            with instrument.span('read_headers'):
+                _read_headers(config, files)
+        else:
+            log.debug("Reading markdown pages.")
+            with instrument.span('populate_pages'):
+                _populate_pages(config, files, cache, spill_dir, lazy)
+            if not lazy:
+                _report_missing_links(files)
 
         # Run `env` plugin events.
-        env = config['plugins'].run_event(
-            'env', env, config=config, files=files
-        )
+        with instrument.span('env'):
+            env = config['plugins'].run_event(
+                'env', env, config=config, files=files
+            )
+
+        # Give the assets URLs which include the hash of their content, so that they can be cached
+        # for as long as they are unchanged. The URLs are returned by the `url` template filter.
+        fingerprints = None
+        if config['fingerprint_assets']:
+            with instrument.span('fingerprint_assets'):
+                fingerprints = Fingerprints(config['site_dir'])
+                fingerprints.add_files(files)
+                utils.asset_urls.update(fingerprints.urls)
+
+        # Record the inputs of each page, so that a dirty build only builds the pages whose inputs
+        # have changed since the previous build.
+        doc_files = files.documentation_pages()
+        graph = DependencyGraph(os.path.join(config['site_dir'], DEPS_FILENAME), _get_build_key(config))
+        if dirty:
+            if graph.load():
+                _remove_outputs(
+                    graph.get_removed(file.src_path for file in doc_files), files, config['site_dir']
+                )
+            else:
+                log.info("Building all pages as no record of the previous build could be used.")
 
         # Start writing files to site_dir now that all data is gathered. Note that order matters. Files
         # with lower precedence get written first so that files with higher precedence can overwrite them.
 
         log.debug("Copying static assets.")
-        files.copy_static_files(dirty=dirty)
-
-        for template in config['theme'].static_templates:
-            _build_theme_template(template, env, files, config, nav)
-
-        for template in config['extra_templates']:
-            _build_extra_template(template, files, config, nav)
+        with instrument.span('copy_static_files'):
+            files.copy_static_files(
+                dirty=dirty, mode=config['static_copy_mode'], snapshot=snapshot if loaded else None
+            )
+            if fingerprints is not None:
+                fingerprints.write(mode=config['static_copy_mode'])
+
+        with instrument.span('static_templates'):
+            for template in config['theme'].static_templates:
+                with utils.output_tracker.producing('template:' + template):
+                    _build_theme_template(template, env, files, config, nav)
+
+        with instrument.span('extra_templates'):
+            for template in config['extra_templates']:
+                with utils.output_tracker.producing('template:' + template, template):
+                    _build_extra_template(template, files, config, nav)
 
         log.debug("Building markdown pages.")
-        doc_files = files.documentation_pages()
-        for file in doc_files:
-            _build_page(file.page, config, doc_files, nav, env, dirty)
+        with instrument.span('build_pages'):
+            nav_key = _get_nav_key(nav, doc_files)
+            templates = {}
+            if streaming:
+                pages = _iter_populated_pages(config, files, cache)
+            else:
+                pages = (file.page for file in doc_files)
+            for page in pages:
+                file = page.file
+                with instrument.span('build_page', file.src_path):
+                    deps = _get_page_deps(
+                        page, env, nav_key, templates, lazy, files, graph.previous.get(file.src_path)
+                    )
+                    changed = graph.is_changed(file.src_path, file.dest_path, deps)
+                    _build_page(page, config, doc_files, nav, env, changed)
+                    if lazy and page._deferred is None:
+                        # Record the links of the page as rendered, rather than when it was last built.
+                        deps['links'] = {target_path: url for target_path, url in page._links}
+                    elif lazy:
+                        # The links of a page which was not rendered are those it had when last built.
+                        page._links = list(deps['links'].items())
+                    graph.add(file.src_path, file.dest_path, deps)
+                if streaming:
+                    page.markdown = page.content = None
+                elif spill_dir is not None:
+                    page.release(spill_dir)
+
+            graph.save()
+
+        if streaming or lazy:
+            _report_missing_links(files)
 
         # Run `post_build` plugin events.
-        config['plugins'].run_event('post_build', config=config)
+        with instrument.span('post_build'):
+            config['plugins'].run_event('post_build', config=config)
+
+        # Remove any files left by previous builds. Files which are unchanged from a previous build
+        # were left untouched, so are identified by the output tracker rather than their mtime.
+        with instrument.span('remove_stale_files'):
+            if listing is not None:
+                removed = utils.remove_stale_files(config['site_dir'], utils.output_tracker.paths, listing)
+                if removed:
+                    log.info("Removed {} stale files from the site directory.".format(removed))
+            manifest.update(utils.output_tracker.files, complete=not dirty)
+            manifest = None
+        if snapshot is not None:
+            snapshot.save()
+
+        log.info("Wrote {} files and skipped {} unchanged files.".format(
+            utils.output_tracker.written, utils.output_tracker.skipped
+        ))
+
+        if cache is not None:
+            cache.prune()
+        if theme_cache is not None:
+            theme_cache.prune()
 
         if config['strict'] and utils.warning_filter.count:
             raise SystemExit('\nExited with {} warnings in strict mode.'.format(utils.warning_filter.count))
 
-        log.info('Documentation built in %.2f seconds', time() - start)
+        if timings:
+            log.info("Build timings:\n" + instrument.get_summary())
+            log.info("Plugin event timings:\n" + config['plugins'].get_costs_summary())
+        else:
+            log.debug("Plugin event timings:\n" + config['plugins'].get_costs_summary())
+
+        pages = None
+        if profile_markdown:
+            pages = [file.page for file in files.documentation_pages()]
+            log.info("Markdown processor timings:\n" + get_processor_times_summary(pages))
+
+        if timings_json:
+            _write_timings(timings_json, config['plugins'], pages)
+
+        peak = utils.get_peak_memory()
+        if peak is not None:
+            log.log(
+                logging.INFO if config['low_memory'] else logging.DEBUG,
+                "Peak memory usage: {:.1f} MB".format(peak / 1024 / 1024)
+            )
+
+        log.info('Documentation built in %.2f seconds', time.time() - start)
 
     except Exception as e:
         # Run `build_error` plugin events.
@@ -313,6 +846,17 @@ def build(config, live_server=False, dirty=False):
             raise SystemExit('\n' + str(e))
         raise
 
+    finally:
+        if manifest is not None:
+            # The build failed (or was interrupted) after the manifest was loaded. Add the files
+            # which it output to the manifest, so that a later build removes them if they are no
+            # longer produced.
+            manifest.update(utils.output_tracker.files, complete=False)
+        set_markdown_profiling(False)
+        utils.asset_urls.clear()
+        if spill is not None:
+            spill.cleanup()
+
 
 def site_directory_contains_stale_files(site_directory):
     """ Check if the site directory contains stale files from a previous build. """
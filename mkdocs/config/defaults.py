@@ -1,3 +1,4 @@
+from mkdocs import utils
 from mkdocs.config import config_options
 
 # NOTE: The order here is important. During validation some config options
@@ -36,6 +37,10 @@ DEFAULT_SCHEMA = (
     # The directory containing the documentation markdown.
     ('docs_dir', config_options.Dir(default='docs', exists=True)),
 
+    # A list of gitignore style patterns of files and directories in the
+    # docs_dir to exclude from the site.
+    ('exclude_docs', config_options.Type(list, default=[])),
+
     # The directory where the site will be built to
     ('site_dir', config_options.SiteDir(default='site')),
 
@@ -93,6 +98,42 @@ DEFAULT_SCHEMA = (
     # encountered rather than display an error.
     ('strict', config_options.Type(bool, default=False)),
 
+    # The number of processes used to read and render Markdown pages. A value
+    # of 0 uses one process per CPU.
+    ('jobs', config_options.Type(int, default=1)),
+
+    # Cache the rendered HTML of pages in `cache_dir`, so that later builds only
+    # render pages which have changed. The size of the cache is limited to
+    # `cache_max_size` megabytes, after which the least recently used entries
+    # are removed. Disabled by default, as files read by Markdown extensions are
+    # not part of the key of a cached page.
+    ('cache', config_options.Type(bool, default=False)),
+    ('cache_dir', config_options.Dir(default='.cache/mkdocs')),
+    ('cache_max_size', config_options.Type(int, default=256)),
+
+    # How static files are materialized in the site_dir: copied, hard linked,
+    # cloned with a reflink (on copy-on-write filesystems) or symlinked. Falls
+    # back to copying when the mode is not supported.
+    ('static_copy_mode', config_options.Choice(utils.COPY_MODES, default='copy')),
+
+    # Output a copy of each asset (such as CSS, JavaScript, fonts and images)
+    # with the hash of its content in its name, and use those names in the URLs
+    # returned by the `url` template filter and in the `url()` references of
+    # stylesheets.
+    ('fingerprint_assets', config_options.Type(bool, default=False)),
+
+    # Release the Markdown and HTML of each page from memory once they are no
+    # longer needed, and write the search index entries to a temporary file.
+    ('low_memory', config_options.Type(bool, default=False)),
+
+    # Read the title and meta-data of every page first, and then render, build and
+    # write each page in turn, discarding its content before the next page.
+    ('streaming', config_options.Type(bool, default=False)),
+
+    # Render the Markdown of each page the first time that its content is used,
+    # so that pages whose output is unchanged need not be rendered.
+    ('lazy_render', config_options.Type(bool, default=False)),
+
     # the remote branch to commit to when using gh-deploy
     ('remote_branch', config_options.Type(
         str, default='gh-pages')),
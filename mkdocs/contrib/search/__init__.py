@@ -1,6 +1,10 @@
 import os
+import json
 import logging
+import markdown
+import mkdocs
 from mkdocs import utils
+from mkdocs.utils.cache import get_key
 from mkdocs.plugins import BasePlugin
 from mkdocs.config import config_options
 from mkdocs.contrib.search.search_index import SearchIndex
@@ -9,6 +13,9 @@ from mkdocs.contrib.search.search_index import SearchIndex
 log = logging.getLogger(__name__)
 base_path = os.path.dirname(os.path.abspath(__file__))
 
+# The file in site_dir which records the search entries of each page when pages are rendered lazily.
+ENTRIES_FILENAME = '.mkdocs-search.json'
+
 
 class LangOption(config_options.OptionallyRequired):
     """ Validate Language(s) provided in config are known languages. """
@@ -40,6 +47,9 @@ class SearchPlugin(BasePlugin):
         ('prebuild_index', config_options.Choice((False, True, 'node', 'python'), default=False)),
     )
 
+    # The index is built from each page's context and written once all pages have been built.
+    streaming_safe = True
+
     def on_config(self, config, **kwargs):
         "Add plugin templates and scripts to config."
         if 'include_search_page' in config['theme'] and config['theme']['include_search_page']:
@@ -53,14 +63,78 @@ class SearchPlugin(BasePlugin):
 
     def on_pre_build(self, config, **kwargs):
         "Create search index instance for later use."
+        if getattr(self, 'search_index', None) is not None:
+            # The index of a previous build which failed.
+            self.search_index.close()
         self.search_index = SearchIndex(**self.config)
+        if config['low_memory']:
+            self.search_index.spill()
+        self._pending_pages = None
+
+    def on_env(self, env, config, files, **kwargs):
+        "Find out whether pages are rendered lazily."
+        # When they are, the rendering of every page has been deferred once the pages have been read.
+        # Pages are then added to the index once every page has been built, so that the entries of
+        # a page which was not rendered can be taken from the previous build.
+        if any(file.page is not None and file.page.is_render_deferred for file in files.documentation_pages()):
+            self._pending_pages = []
+        return env
 
     def on_page_context(self, context, **kwargs):
         "Add page to search index."
-        self.search_index.add_entry_from_context(context['page'])
+        if self._pending_pages is not None:
+            self._pending_pages.append(context['page'])
+        else:
+            self.search_index.add_entry_from_context(context['page'])
+
+    def _add_pending_pages(self, config):
+        """
+        Add the pages which were built to the index. The entries of a page which has not been
+        rendered, and whose Markdown, title and URL are unchanged, are those of the previous build.
+        """
+        path = os.path.join(config['site_dir'], ENTRIES_FILENAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = {}
+
+        pages = {}
+        for page in self._pending_pages:
+            key = get_key(
+                mkdocs.__version__,
+                markdown.__version__,
+                config['markdown_extensions'],
+                config['mdx_configs'],
+                page.file.url,
+                page.title,
+                page.markdown
+            )
+            record = previous.get(page.file.src_path)
+            if page.is_render_deferred and isinstance(record, dict) and record.get('key') == key:
+                entries = record['entries']
+                self.search_index.add_entries(entries)
+            else:
+                entries = self.search_index.add_entry_from_context(page)
+            pages[page.file.src_path] = {'key': key, 'entries': entries}
+        self._pending_pages = None
+
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(pages, f, sort_keys=True)
+        except OSError as e:
+            log.debug("Unable to write search entries '{}': {}".format(path, e))
 
     def on_post_build(self, config, **kwargs):
         "Build search index."
+        if self._pending_pages is not None:
+            self._add_pending_pages(config)
+        else:
+            # No page was rendered lazily, so the entries of a previous build are no longer needed.
+            try:
+                os.remove(os.path.join(config['site_dir'], ENTRIES_FILENAME))
+            except OSError:
+                pass
         output_base_path = os.path.join(config['site_dir'], 'search')
         search_index = self.search_index.generate_search_index()
         json_output_path = os.path.join(output_base_path, 'search_index.json')
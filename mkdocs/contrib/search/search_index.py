@@ -3,6 +3,7 @@ import re
 import json
 import logging
 import subprocess
+import tempfile
 
 from lunr import lunr
 
@@ -19,8 +20,40 @@ class SearchIndex:
 
     def __init__(self, **config):
         self._entries = []
+        self._spill_file = None
         self.config = config
 
+    def spill(self):
+        """
+        Write entries to a temporary file rather than keeping them in
+        memory until the index is generated.
+        """
+        self._spill_file = tempfile.TemporaryFile('w+', encoding='utf-8')
+        for entry in self._entries:
+            self._spill_file.write(json.dumps(entry) + '\n')
+        self._entries = []
+
+    def _get_entries(self):
+        """
+        Return a list of all entries, reading back any which were
+        written to the temporary file. The file is then closed, as
+        the entries are only read back to generate the index.
+        """
+        if self._spill_file is not None:
+            self._spill_file.seek(0)
+            self._entries = [json.loads(line) for line in self._spill_file]
+            self.close()
+        return self._entries
+
+    def close(self):
+        """
+        Close the temporary file of any entries which have not been
+        read back. Those entries are discarded.
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
     def _find_toc_by_id(self, toc, id_):
         """
         Given a table of contents and HTML ID, iterate through
@@ -40,17 +73,33 @@ class SearchIndex:
         text = text.replace('\u00a0', ' ')
         text = re.sub(r'[ \t\n\r\f\v]+', ' ', text.strip())
 
-        self._entries.append({
+        entry = {
             'title': title,
             'text': text,
             'location': loc
-        })
+        }
+        self._append(entry)
+        return entry
+
+    def _append(self, entry):
+        if self._spill_file is not None:
+            self._spill_file.write(json.dumps(entry) + '\n')
+        else:
+            self._entries.append(entry)
+
+    def add_entries(self, entries):
+        """
+        Add entries which were created by `add_entry_from_context`,
+        such as those of an unchanged page in a previous build.
+        """
+        for entry in entries:
+            self._append(entry)
 
     def add_entry_from_context(self, page):
         """
         Create a set of entries in the index for a page. One for
         the page itself and then one for each of its' heading
-        tags.
+        tags. Return the entries.
         """
 
         # Create the content parser and feed in the HTML for the
@@ -65,14 +114,17 @@ class SearchIndex:
         url = page.url
 
         # Create an entry for the full page.
-        self._add_entry(
+        entries = [self._add_entry(
             title=page.title,
             text=parser.stripped_html.rstrip('\n'),
             loc=url
-        )
+        )]
 
         for section in parser.data:
-            self.create_entry_for_section(section, page.toc, url)
+            entry = self.create_entry_for_section(section, page.toc, url)
+            if entry is not None:
+                entries.append(entry)
+        return entries
 
     def create_entry_for_section(self, section, toc, abs_url):
         """
@@ -84,7 +136,7 @@ class SearchIndex:
         toc_item = self._find_toc_by_id(toc, section.id)
 
         if toc_item is not None:
-            self._add_entry(
+            return self._add_entry(
                 title=toc_item.title,
                 text=" ".join(section.text),
                 loc=abs_url + toc_item.url
@@ -92,8 +144,9 @@ class SearchIndex:
 
     def generate_search_index(self):
         """python to json conversion"""
+        entries = self._get_entries()
         page_dicts = {
-            'docs': self._entries,
+            'docs': entries,
             'config': self.config
         }
         data = json.dumps(page_dicts, sort_keys=True, separators=(',', ':'))
@@ -119,7 +172,7 @@ class SearchIndex:
                 log.warning('Failed to pre-build search index. Error: {}'.format(e))
         elif self.config['prebuild_index'] == 'python':
             idx = lunr(
-                ref='location', fields=('title', 'text'), documents=self._entries,
+                ref='location', fields=('title', 'text'), documents=entries,
                 languages=self.config['lang'])
             page_dicts['index'] = idx.serialize()
             data = json.dumps(page_dicts, sort_keys=True, separators=(',', ':'))
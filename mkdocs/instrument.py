@@ -0,0 +1,150 @@
+"""
+Timing spans for the phases of a build.
+
+A span measures the time taken by a block of code. Spans are nestable: a span
+opened while another span is open on the same thread is recorded as a child of
+that span. The spans of the latest build can be printed as a summary with the
+`--timings` option of the `build` command. Plugins may open their own spans:
+
+    from mkdocs import instrument
+
+    with instrument.span('my_plugin.index'):
+        ...
+"""
+
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Span:
+    """
+    A timed block of code.
+
+    Keywords:
+
+        name: The name of the span. Spans of the same name are combined in the summary.
+
+        detail: An optional string which identifies the subject of the span (such as a page).
+    """
+
+    def __init__(self, name, detail=None):
+        self.name = name
+        self.detail = detail
+        self.duration = 0.0
+        self.children = []
+
+    def __repr__(self):
+        return "Span(name='{}', detail={!r}, duration={:.4f})".format(self.name, self.detail, self.duration)
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_root = Span('')
+
+
+def _get_stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def _add(span):
+    stack = _get_stack()
+    parent = stack[-1] if stack else _root
+    with _lock:
+        parent.children.append(span)
+
+
+def reset():
+    """ Discard all recorded spans and return the new root span. """
+    global _root
+    _root = Span('')
+    _local.stack = []
+    return _root
+
+
+def get_root():
+    """ Return the root span, whose children are the outermost spans recorded since the last `reset`. """
+    return _root
+
+
+@contextmanager
+def span(name, detail=None):
+    """ Time the code run within the context as a span. """
+    s = Span(name, detail)
+    _add(s)
+    stack = _get_stack()
+    stack.append(s)
+    start = time.perf_counter()
+    try:
+        yield s
+    finally:
+        s.duration = time.perf_counter() - start
+        stack.pop()
+
+
+def record(name, duration, detail=None):
+    """ Record a span which has been timed elsewhere, such as in another process. """
+    s = Span(name, detail)
+    s.duration = duration
+    _add(s)
+    return s
+
+
+def _combine(spans):
+    """ Return a list of `(name, count, duration, children)` for spans grouped by name. """
+    groups = OrderedDict()
+    for s in spans:
+        group = groups.setdefault(s.name, [0, 0.0, []])
+        group[0] += 1
+        group[1] += s.duration
+        group[2].extend(s.children)
+    return [(name, count, duration, children) for name, (count, duration, children) in groups.items()]
+
+
+def _iter_spans(spans):
+    for s in spans:
+        yield s
+        yield from _iter_spans(s.children)
+
+
+def to_dict(span=None):
+    """ Return a span and its children as a dict which can be serialized as JSON. """
+    span = span or _root
+    return {
+        'name': span.name,
+        'detail': span.detail,
+        'duration': span.duration,
+        'children': [to_dict(child) for child in span.children],
+    }
+
+
+def get_summary(root=None, slowest=10):
+    """
+    Return a table of the time spent in each span, with the spans of the same name and parent
+    combined, followed by the slowest spans which have a detail (such as pages).
+    """
+    root = root or _root
+    total = sum(s.duration for s in root.children) or 1.0
+    lines = ['{:<48} {:>7} {:>10} {:>7}'.format('Span', 'Count', 'Time (s)', '%')]
+
+    def add_lines(spans, depth):
+        for name, count, duration, children in _combine(spans):
+            label = '{}{}'.format('  ' * depth, name)
+            lines.append('{:<48} {:>7} {:>10.3f} {:>6.1f}%'.format(label, count, duration, duration / total * 100))
+            add_lines(children, depth + 1)
+
+    add_lines(root.children, 0)
+
+    detailed = sorted(
+        (s for s in _iter_spans(root.children) if s.detail is not None), key=lambda s: s.duration, reverse=True
+    )
+    if detailed and slowest:
+        lines.append('')
+        lines.append('Slowest:')
+        for s in detailed[:slowest]:
+            lines.append('  {:<46} {:>7} {:>10.3f}'.format(s.detail, s.name, s.duration))
+    return '\n'.join(lines)
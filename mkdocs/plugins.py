@@ -6,8 +6,11 @@ Implements the plugin API for MkDocs.
 
 import pkg_resources
 import logging
+import threading
+import time
 from collections import OrderedDict
 
+from mkdocs import utils
 from mkdocs.config.base import Config
 
 
@@ -20,6 +23,16 @@ EVENTS = (
     'page_content', 'page_context', 'post_page', 'post_build', 'serve', 'build_error'
 )
 
+# Page events which are run in worker processes when pages are rendered in parallel.
+WORKER_EVENTS = ('pre_page', 'page_read_source', 'page_markdown', 'page_content')
+
+# Events which are run in a different order when pages are streamed (each page is rendered and
+# written before the next is read), or which could see pages whose content has been discarded.
+STREAMING_EVENTS = (
+    'env', 'pre_template', 'template_context', 'post_template',
+    'pre_page', 'page_read_source', 'page_markdown', 'page_content', 'page_context', 'post_page', 'post_build'
+)
+
 
 def get_plugins():
     """ Return a dict of all installed Plugins by name. """
@@ -39,6 +52,14 @@ class BasePlugin:
     config_scheme = ()
     config = {}
 
+    # Set to `True` if the plugin's `WORKER_EVENTS` methods may be run in a
+    # worker process, isolated from the plugin instance in the main process.
+    parallel_safe = False
+
+    # Set to `True` if the plugin's `STREAMING_EVENTS` methods do not need every page to be
+    # rendered before any page is built, nor the content of pages which have been built.
+    streaming_safe = False
+
     def load_config(self, options, config_file_path=None):
         """ Load config from a dict of options. Returns a tuple of (errors, warnings)."""
 
@@ -60,6 +81,9 @@ class PluginCollection(OrderedDict):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.events = {x: [] for x in EVENTS}
+        self._names = {}
+        self._lock = threading.Lock()
+        self.reset_costs()
 
     def _register_event(self, event_name, method):
         """ Register a method for an event. """
@@ -72,12 +96,53 @@ class PluginCollection(OrderedDict):
                 'sublcasses'.format(self.__module__, self.__name__,
                                     BasePlugin.__module__, BasePlugin.__name__))
         super().__setitem__(key, value, **kwargs)
+        self._names[id(value)] = key
         # Register all of the event methods defined for this Plugin.
         for event_name in (x for x in dir(value) if x.startswith('on_')):
             method = getattr(value, event_name)
             if callable(method):
                 self._register_event(event_name[3:], method)
 
+    def get_parallel_unsafe(self):
+        """ Return the names of plugins which prevent pages from being rendered in worker processes. """
+        return [
+            name for name, plugin in self.items()
+            if not plugin.parallel_safe and any(callable(getattr(plugin, 'on_' + x, None)) for x in WORKER_EVENTS)
+        ]
+
+    def get_streaming_unsafe(self):
+        """ Return the names of plugins which prevent pages from being streamed. """
+        return [
+            name for name, plugin in self.items()
+            if not plugin.streaming_safe and any(callable(getattr(plugin, 'on_' + x, None)) for x in STREAMING_EVENTS)
+        ]
+
+    def reset_costs(self):
+        """ Discard the recorded cost of running the event methods. """
+        self.costs = {}
+
+    def add_cost(self, plugin_name, event_name, duration, calls=1):
+        """ Add to the time taken and number of calls of a plugin's method for an event. """
+        with self._lock:
+            cost = self.costs.setdefault((plugin_name, event_name), [0, 0.0])
+            cost[0] += calls
+            cost[1] += duration
+
+    def get_costs(self):
+        """ Return a list of the calls and time of each plugin's event methods, the most expensive first. """
+        costs = [
+            {'plugin': plugin_name, 'event': event_name, 'calls': calls, 'time': duration}
+            for (plugin_name, event_name), (calls, duration) in self.costs.items()
+        ]
+        return sorted(costs, key=lambda cost: cost['time'], reverse=True)
+
+    def get_costs_summary(self, limit=10):
+        """ Return a table of the most expensive plugin event methods. """
+        lines = ['{:<30} {:<20} {:>7} {:>10}'.format('Plugin', 'Event', 'Calls', 'Time (s)')]
+        for cost in self.get_costs()[:limit]:
+            lines.append('{plugin:<30} {event:<20} {calls:>7} {time:>10.3f}'.format(**cost))
+        return '\n'.join(lines)
+
     def run_event(self, name, item=None, **kwargs):
         """
         Run all registered methods of an event.
@@ -90,10 +155,17 @@ class PluginCollection(OrderedDict):
 
         pass_item = item is not None
         for method in self.events[name]:
-            if pass_item:
-                result = method(item, **kwargs)
-            else:
-                result = method(**kwargs)
+            # Attribute any files written by the method to its plugin.
+            plugin_name = self._names.get(id(getattr(method, '__self__', None)))
+            start = time.perf_counter()
+            try:
+                with utils.output_tracker.producing('plugin:{}'.format(plugin_name)):
+                    if pass_item:
+                        result = method(item, **kwargs)
+                    else:
+                        result = method(**kwargs)
+            finally:
+                self.add_cost(plugin_name, name, time.perf_counter() - start)
             # keep item if method returned `None`
             if result is not None:
                 item = result
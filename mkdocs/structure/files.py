@@ -1,10 +1,15 @@
 import fnmatch
+import functools
 import os
 import logging
-from functools import cmp_to_key
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote as urlquote
+from urllib.parse import unquote as urlunquote
 
-from mkdocs import utils
+from mkdocs import exceptions, utils
+from mkdocs.utils.cache import get_key
 
 
 log = logging.getLogger(__name__)
@@ -13,9 +18,33 @@ log.addFilter(utils.warning_filter)
 
 class Files:
     """ A collection of File objects. """
+
+    # The categories of files which are indexed, and the `File` method which tests for each.
+    _categories = (
+        ('documentation', 'is_documentation_page'),
+        ('static', 'is_static_page'),
+        ('media', 'is_media_file'),
+        ('javascript', 'is_javascript'),
+        ('css', 'is_css'),
+    )
+
     def __init__(self, files):
         self._files = files
         self.src_paths = {file.src_path: file for file in files}
+        # The files in each category and with each extension. The indexes are built when first
+        # used and are then kept up to date by `append` and `remove`.
+        self._category_index = None
+        self._extension_index = None
+        # Tuples of the files in each category and with each extension, as returned to callers.
+        # They are discarded whenever the collection changes.
+        self._views = {}
+        # The files by URL and by destination path. These are also built when first used, as
+        # plugins may change the URLs of files until then.
+        self._url_index = None
+        self._dest_index = None
+        # The links resolved by `mkdocs.structure.pages`, which are shared by every page. They are
+        # discarded whenever the collection changes.
+        self._link_cache = {}
 
     def __iter__(self):
         return iter(self._files)
@@ -26,61 +55,239 @@ class Files:
     def __contains__(self, path):
         return path in self.src_paths
 
+    def _get_index(self):
+        """ Return the category index, classifying every file if it has not been built yet. """
+        if self._category_index is None:
+            self._category_index = {name: [] for name, _ in self._categories}
+            self._extension_index = {}
+            for file in self._files:
+                self._add_to_index(file)
+        return self._category_index
+
+    def _get_view(self, category=None, extension=None):
+        """
+        Return a tuple of the files in a category or with an extension. The tuple is kept, so that
+        it is only built again once the collection has changed.
+        """
+        key = (category, extension)
+        view = self._views.get(key)
+        if view is None:
+            index = self._get_index()
+            files = index[category] if category is not None else self._extension_index.get(extension, ())
+            view = self._views[key] = tuple(files)
+        return view
+
+    def _add_to_index(self, file):
+        for name, method in self._categories:
+            if getattr(file, method)():
+                self._category_index[name].append(file)
+        self._extension_index.setdefault(os.path.splitext(file.src_path)[1], []).append(file)
+
+    def _get_dest_index(self):
+        """ Return the destination path index, building it and the URL index if needed. """
+        if self._dest_index is None:
+            self._url_index = {}
+            self._dest_index = {}
+            for file in self._files:
+                self._add_to_dest_index(file)
+        return self._dest_index
+
+    def _add_to_dest_index(self, file):
+        # The first file wins, as with `src_paths`, if several files have the same URL.
+        self._url_index.setdefault(_normalize_url(file.url), file)
+        self._dest_index.setdefault(os.path.normpath(file.dest_path), file)
+
     def get_file_from_path(self, path):
         """ Return a File instance with File.src_path equal to path. """
         return self.src_paths.get(os.path.normpath(path))
 
+    def get_file_from_url(self, url):
+        """
+        Return a File instance with File.url equal to url (relative to the site and with or
+        without a leading slash or percent-encoding), or `None` if there isn't one.
+
+        The index of URLs is built when this (or `get_file_from_dest`) is first called, so
+        changes to the URL of a file after that are not reflected.
+        """
+        self._get_dest_index()
+        return self._url_index.get(_normalize_url(url))
+
+    def get_file_from_dest(self, path):
+        """
+        Return a File instance with File.dest_path equal to path, or `None` if there isn't one.
+
+        The index of destination paths is built when this (or `get_file_from_url`) is first
+        called, so changes to the destination path of a file after that are not reflected.
+        """
+        return self._get_dest_index().get(os.path.normpath(path))
+
     def append(self, file):
         """ Append file to Files collection. """
         self._files.append(file)
         self.src_paths[file.src_path] = file
-
-    def copy_static_files(self, dirty=False):
-        """ Copy static files from source to destination. """
-        for file in self:
-            if not file.is_documentation_page():
-                file.copy_file(dirty)
+        self._link_cache.clear()
+        self._views.clear()
+        if self._category_index is not None:
+            self._add_to_index(file)
+        if self._dest_index is not None:
+            self._add_to_dest_index(file)
+
+    def remove(self, file):
+        """ Remove file from Files collection. """
+        _remove_item(self._files, file)
+        self._link_cache.clear()
+        self._views.clear()
+        if self.src_paths.get(file.src_path) is file:
+            del self.src_paths[file.src_path]
+        if self._category_index is not None:
+            for files in list(self._category_index.values()) + list(self._extension_index.values()):
+                if any(other is file for other in files):
+                    _remove_item(files, file)
+        if self._dest_index is not None:
+            for index, key in (
+                (self._url_index, _normalize_url(file.url)),
+                (self._dest_index, os.path.normpath(file.dest_path)),
+            ):
+                if index.get(key) is file:
+                    del index[key]
+
+    def copy_static_files(self, dirty=False, mode='copy', max_workers=None, snapshot=None):
+        """
+        Copy static files from source to destination, using one of `mkdocs.utils.COPY_MODES`.
+
+        The destination directories are created first, and then the files are copied by a pool of
+        up to `max_workers` threads. An error copying a file is logged, and a `BuildError` is
+        raised once every other file has been copied.
+
+        If `dirty` is true, files which have not been modified since the previous build are
+        skipped. A `mkdocs.utils.snapshot.Snapshot` of the sources of the previous build tells
+        which those are when given, and otherwise the modification times of the files do.
+        """
+        files = self.static_pages() + self.media_files()
+        for dest_dir in sorted({os.path.dirname(file.abs_dest_path) for file in files}):
+            os.makedirs(dest_dir, exist_ok=True)
+
+        def copy(file):
+            try:
+                if dirty and snapshot is not None and not snapshot.is_changed(file.abs_src_path):
+                    abs_dest_path = file.abs_dest_path
+                    if os.path.isfile(abs_dest_path):
+                        log.debug("Skip copying unmodified file: '{}'".format(file.src_path))
+                        with utils.output_tracker.producing('copy', file.src_path):
+                            utils.output_tracker.add(abs_dest_path, written=False)
+                        return None
+                file.copy_file(dirty and snapshot is None, mode, makedirs=False)
+            except Exception as e:
+                log.error("Error copying static file '{}': {}".format(file.src_path, e))
+                return file
+            return None
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            failed = [file for file in executor.map(copy, files) if file is not None]
+        if failed:
+            raise exceptions.BuildError("Unable to copy {} static files.".format(len(failed)))
 
     def documentation_pages(self):
-        """ Return iterable of all Markdown page file objects. """
-        return [file for file in self if file.is_documentation_page()]
+        """ Return a tuple of all Markdown page file objects. """
+        return self._get_view('documentation')
 
     def static_pages(self):
-        """ Return iterable of all static page file objects. """
-        return [file for file in self if file.is_static_page()]
+        """ Return a tuple of all static page file objects. """
+        return self._get_view('static')
 
     def media_files(self):
-        """ Return iterable of all file objects which are not documentation or static pages. """
-        return [file for file in self if file.is_media_file()]
+        """ Return a tuple of all file objects which are not documentation or static pages. """
+        return self._get_view('media')
 
     def javascript_files(self):
-        """ Return iterable of all javascript file objects. """
-        return [file for file in self if file.is_javascript()]
+        """ Return a tuple of all javascript file objects. """
+        return self._get_view('javascript')
 
     def css_files(self):
-        """ Return iterable of all CSS file objects. """
-        return [file for file in self if file.is_css()]
+        """ Return a tuple of all CSS file objects. """
+        return self._get_view('css')
+
+    def get_files_by_extension(self, ext):
+        """ Return a tuple of all file objects with the extension `ext` (such as `.md`). """
+        return self._get_view(extension=ext)
+
+    def add_files_from_theme(self, env, config, cache=None):
+        """
+        Retrieve static files from the theme dirs and add to collection.
+
+        If a `Cache` is given, the list of files in each theme dir which is provided by an
+        installed package is kept in it, keyed by the version of the package, so that the dir
+        is not walked again until the package is upgraded.
+        """
+        # '.*' filters dot files/dirs at root level whereas '*/.*' filters nested levels
+        patterns = ['.*', '*/.*', '*.py', '*.pyc', '*.html', '*readme*', 'mkdocs_theme.yml']
+        patterns.extend('*{}'.format(x) for x in utils.markdown_extensions)
+        patterns.extend(config['theme'].static_templates)
 
-    def add_files_from_theme(self, env, config):
-        """ Retrieve static files from Jinja environment and add to collection. """
         def filter(name):
-            # '.*' filters dot files/dirs at root level whereas '*/.*' filters nested levels
-            patterns = ['.*', '*/.*', '*.py', '*.pyc', '*.html', '*readme*', 'mkdocs_theme.yml']
-            patterns.extend('*{}'.format(x) for x in utils.markdown_extensions)
-            patterns.extend(config['theme'].static_templates)
             for pattern in patterns:
                 if fnmatch.fnmatch(name.lower(), pattern):
                     return False
             return True
-        for path in env.list_templates(filter_func=filter):
+
+        # Find the first theme dir which contains each path
+        theme_dirs = {}
+        for dir in config['theme'].dirs:
+            version = config['theme'].get_dir_version(dir)
+            for path in _list_theme_dir(dir, version, cache):
+                theme_dirs.setdefault(path, dir)
+
+        for name in sorted(theme_dirs):
+            if not filter(name):
+                continue
             # Theme files do not override docs_dir files
-            path = os.path.normpath(path)
+            path = os.path.normpath(name)
             if path not in self:
-                for dir in config['theme'].dirs:
-                    # Find the first theme dir which contains path
-                    if os.path.isfile(os.path.join(dir, path)):
-                        self.append(File(path, dir, config['site_dir'], config['use_directory_urls']))
-                        break
+                self.append(File(path, theme_dirs[name], config['site_dir'], config['use_directory_urls']))
+
+
+def _list_theme_dir(theme_dir, version=None, cache=None):
+    """
+    Return the paths (relative to `theme_dir` and using forward slashes) of the files in a theme
+    dir, as listed by its Jinja loader. The paths are taken from the cache when the dir is
+    provided by a package of a known version.
+    """
+    key = None
+    if cache is not None and version is not None:
+        try:
+            mtime = os.stat(theme_dir).st_mtime_ns
+        except OSError:
+            return []
+        key = get_key('theme_files', os.path.abspath(theme_dir), version, mtime)
+        paths = cache.get(key)
+        if paths is not None:
+            return paths
+
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(theme_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.relpath(os.path.join(dirpath, filename), theme_dir)
+            paths.append(path.replace(os.sep, '/'))
+
+    if key is not None:
+        cache.set(key, paths)
+    return paths
+
+
+def _normalize_url(url):
+    """ Return a URL relative to the site in the form used as a key of the URL index. """
+    url = urlunquote(url).lstrip('/')
+    return url or '.'
+
+
+def _remove_item(items, item):
+    """ Remove `item` from the list `items`. Unlike `list.remove`, items are compared by identity. """
+    for i, other in enumerate(items):
+        if other is item:
+            del items[i]
+            return
+    raise ValueError('{!r} is not in the list'.format(item))
 
 
 class File:
@@ -114,15 +321,35 @@ class File:
 
     File.url
         The url of the destination file relative to the destination directory as a string.
+
+    To keep the memory used by large sites down, `File` objects have `__slots__`, and the other
+    properties are derived from `src_path` when they are first used (the absolute paths each time
+    they are used) rather than stored. Each property may still be assigned a different value. As
+    when they were computed on creation, the properties are not changed by assigning a different
+    `src_path`, `dest_path` or other attribute they are derived from: every derived property is
+    computed and stored before the first such assignment.
     """
+
+    # `__dict__` is included so that plugins can still add attributes of their own. The dict is
+    # only created for the objects which are given one.
+    __slots__ = (
+        'page', '_src_path', '_src_dir', '_dest_dir', '_use_directory_urls', '_name', '_dest_path', '_url',
+        '_abs_src_path', '_abs_dest_path', '_frozen', '__dict__',
+    )
+
     def __init__(self, path, src_dir, dest_dir, use_directory_urls):
         self.page = None
-        self.src_path = os.path.normpath(path)
-        self.abs_src_path = os.path.normpath(os.path.join(src_dir, self.src_path))
-        self.name = self._get_stem()
-        self.dest_path = self._get_dest_path(use_directory_urls)
-        self.abs_dest_path = os.path.normpath(os.path.join(dest_dir, self.dest_path))
-        self.url = self._get_url(use_directory_urls)
+        self._src_path = os.path.normpath(path)
+        # The same directories are shared by all files, so are only stored once.
+        self._src_dir = _intern(src_dir)
+        self._dest_dir = _intern(dest_dir)
+        self._use_directory_urls = use_directory_urls
+        self._name = None
+        self._dest_path = None
+        self._url = None
+        self._abs_src_path = None
+        self._abs_dest_path = None
+        self._frozen = False
 
     def __eq__(self, other):
         return (
@@ -135,6 +362,102 @@ class File:
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def _freeze(self):
+        """ Compute and store every derived property, before an attribute they are derived from is changed. """
+        if not self._frozen:
+            self._abs_src_path = self.abs_src_path
+            self._abs_dest_path = self.abs_dest_path
+            self._url = self.url
+            self._frozen = True
+
+    @property
+    def src_path(self):
+        return self._src_path
+
+    @src_path.setter
+    def src_path(self, value):
+        self._freeze()
+        self._src_path = value
+
+    @property
+    def src_dir(self):
+        return self._src_dir
+
+    @src_dir.setter
+    def src_dir(self, value):
+        self._freeze()
+        self._src_dir = value
+
+    @property
+    def dest_dir(self):
+        return self._dest_dir
+
+    @dest_dir.setter
+    def dest_dir(self, value):
+        self._freeze()
+        self._dest_dir = value
+
+    @property
+    def use_directory_urls(self):
+        return self._use_directory_urls
+
+    @use_directory_urls.setter
+    def use_directory_urls(self, value):
+        self._freeze()
+        self._use_directory_urls = value
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = self._get_stem()
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._freeze()
+        self._name = value
+
+    @property
+    def abs_src_path(self):
+        if self._abs_src_path is not None:
+            return self._abs_src_path
+        return os.path.normpath(os.path.join(self.src_dir, self.src_path))
+
+    @abs_src_path.setter
+    def abs_src_path(self, value):
+        self._abs_src_path = value
+
+    @property
+    def dest_path(self):
+        if self._dest_path is None:
+            self._dest_path = self._get_dest_path(self.use_directory_urls)
+        return self._dest_path
+
+    @dest_path.setter
+    def dest_path(self, value):
+        self._freeze()
+        self._dest_path = value
+
+    @property
+    def abs_dest_path(self):
+        if self._abs_dest_path is not None:
+            return self._abs_dest_path
+        return os.path.normpath(os.path.join(self.dest_dir, self.dest_path))
+
+    @abs_dest_path.setter
+    def abs_dest_path(self, value):
+        self._abs_dest_path = value
+
+    @property
+    def url(self):
+        if self._url is None:
+            self._url = self._get_url(self.use_directory_urls)
+        return self._url
+
+    @url.setter
+    def url(self, value):
+        self._url = value
+
     def _get_stem(self):
         """ Return the name of the file without it's extension. """
         filename = os.path.basename(self.src_path)
@@ -169,13 +492,18 @@ class File:
         """ Return url for file relative to other file. """
         return utils.get_relative_url(self.url, other.url if isinstance(other, File) else other)
 
-    def copy_file(self, dirty=False):
-        """ Copy source file to destination, ensuring parent directories exist. """
-        if dirty and not self.is_modified():
-            log.debug("Skip copying unmodified file: '{}'".format(self.src_path))
-        else:
-            log.debug("Copying media file: '{}'".format(self.src_path))
-            utils.copy_file(self.abs_src_path, self.abs_dest_path)
+    def copy_file(self, dirty=False, mode='copy', makedirs=True):
+        """
+        Copy source file to destination, ensuring parent directories exist unless `makedirs` is
+        false (when the caller has already created them).
+        """
+        with utils.output_tracker.producing('copy', self.src_path):
+            if dirty and not self.is_modified():
+                log.debug("Skip copying unmodified file: '{}'".format(self.src_path))
+                utils.output_tracker.add(self.abs_dest_path, written=False)
+            else:
+                log.debug("Copying media file: '{}'".format(self.src_path))
+                utils.copy_file(self.abs_src_path, self.abs_dest_path, mode, makedirs)
 
     def is_modified(self):
         if os.path.isfile(self.abs_dest_path):
@@ -213,59 +541,163 @@ class File:
         )
 
 
+def _intern(path):
+    """ Return the single stored copy of a directory path (which may be a path-like object). """
+    return sys.intern(path) if type(path) is str else path
+
+
 def get_files(config):
     """ Walk the `docs_dir` and return a Files collection. """
-    files = []
-    exclude = ['.*', '/templates']
+    exclude = _compile_exclude(['.*', '/templates'] + config['exclude_docs'])
+    return Files([
+        File(path, config['docs_dir'], config['site_dir'], config['use_directory_urls'])
+        for path in _scan_dir(config['docs_dir'], exclude)
+    ])
 
-    for source_dir, dirnames, filenames in os.walk(config['docs_dir'], followlinks=True):
-        relative_dir = os.path.relpath(source_dir, config['docs_dir'])
 
-        for dirname in list(dirnames):
-            path = os.path.normpath(os.path.join(relative_dir, dirname))
+def _scan_dir(source_dir, exclude, relative_dir=''):
+    """
+    Yield the paths (relative to `source_dir` and using forward slashes) of the files in
+    `source_dir` which are not excluded, in the order in which they are added to the site.
+    """
+    try:
+        with os.scandir(source_dir) as it:
+            entries = list(it)
+    except OSError:
+        # Skip unreadable directories, as `os.walk` does.
+        return
+    filenames = {entry.name for entry in entries}
+
+    dirs = []
+    for entry in sorted(entries, key=_file_sort_key):
+        path = relative_dir + entry.name
+        # `DirEntry.is_dir` follows symlinks and usually needs no extra system call.
+        if entry.is_dir():
             # Skip any excluded directories
-            if _filter_paths(basename=dirname, path=path, is_dir=True, exclude=exclude):
-                dirnames.remove(dirname)
-        dirnames.sort()
+            if not exclude(path, is_dir=True):
+                dirs.append((entry.path, path + '/'))
+            continue
+        # Skip any excluded files
+        if exclude(path, is_dir=False):
+            continue
+        # Skip README.md if an index file also exists in dir
+        if entry.name.lower() == 'readme.md' and 'index.md' in filenames:
+            log.warning("Both index.md and readme.md found. Skipping readme.md from {}".format(source_dir))
+            continue
+        yield path
+
+    for source_dir, relative_dir in sorted(dirs):
+        yield from _scan_dir(source_dir, exclude, relative_dir)
 
-        for filename in _sort_files(filenames):
-            path = os.path.normpath(os.path.join(relative_dir, filename))
-            # Skip any excluded files
-            if _filter_paths(basename=filename, path=path, is_dir=False, exclude=exclude):
-                continue
-            # Skip README.md if an index file also exists in dir
-            if filename.lower() == 'readme.md' and 'index.md' in filenames:
-                log.warning("Both index.md and readme.md found. Skipping readme.md from {}".format(source_dir))
-                continue
-            files.append(File(path, config['docs_dir'], config['site_dir'], config['use_directory_urls']))
 
-    return Files(files)
+def _file_sort_key(entry):
+    """ Sort `index` or `README` first, and all other names in order. Accepts names or `os.DirEntry` objects. """
+    name = getattr(entry, 'name', entry)
+    if os.path.splitext(name)[0] in ('index', 'README'):
+        # The sort is stable, so index files keep their original order.
+        return (0, '')
+    return (1, name)
 
 
 def _sort_files(filenames):
     """ Always sort `index` or `README` as first filename in list. """
+    return sorted(filenames, key=_file_sort_key)
+
+
+def _translate_pattern(pattern):
+    """ Translate a gitignore style glob (without a leading or trailing slash) to a regular expression. """
+    i, n = 0, len(pattern)
+    res = []
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            if pattern[i:i + 1] == '*':
+                i += 1
+                if pattern[i:i + 1] == '/':
+                    # `**/` matches zero or more directories.
+                    i += 1
+                    res.append('(?:.*/)?')
+                else:
+                    res.append('.*')
+            else:
+                res.append('[^/]*')
+        elif c == '?':
+            res.append('[^/]')
+        elif c == '[':
+            j = i
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                res.append('\\[')
+            else:
+                stuff = pattern[i:j].replace('\\', '\\\\')
+                i = j + 1
+                if stuff[0] in '!^':
+                    stuff = '^' + stuff[1:]
+                res.append('[{}]'.format(stuff))
+        else:
+            res.append(re.escape(c))
+    return ''.join(res)
 
-    def compare(x, y):
-        if x == y:
-            return 0
-        if os.path.splitext(y)[0] in ['index', 'README']:
-            return 1
-        if os.path.splitext(x)[0] in ['index', 'README'] or x < y:
-            return -1
-        return 1
 
-    return sorted(filenames, key=cmp_to_key(compare))
+@functools.lru_cache(maxsize=None)
+def _compile_patterns(patterns):
+    """
+    Compile a tuple of gitignore style patterns to a pair of regular expressions (for files and for
+    directories), along with the negation of the pattern which each of their groups matches.
+    """
+    files, dirs, negated = [], [], [None]
+    # The patterns are reversed, so that the first alternative which matches is the last pattern.
+    for pattern in reversed(patterns):
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        if not pattern:
+            continue
+        # Patterns containing a slash apply to the whole path. Other patterns apply to the basename.
+        if '/' in pattern:
+            regex = _translate_pattern(pattern.lstrip('/'))
+        else:
+            regex = '(?:.*/)?' + _translate_pattern(pattern)
+        negated.append(negate)
+        group = '({})'.format(regex)
+        dirs.append(group)
+        # Keep the group numbering of both expressions the same.
+        files.append('((?!))' if dir_only else group)
+
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+    return (
+        re.compile('|'.join(files) or '(?!)', flags),
+        re.compile('|'.join(dirs) or '(?!)', flags),
+        negated
+    )
+
+
+def _compile_exclude(patterns):
+    """
+    Return a function which returns `True` if a path (relative to the `docs_dir` and using forward
+    slashes) is excluded by a list of gitignore style patterns.
+
+    As in a `.gitignore` file, a pattern ending in `/` only matches directories, a pattern which
+    contains a `/` (other than a trailing one) is relative to the `docs_dir` and a pattern starting
+    with `!` includes paths excluded by an earlier pattern. The last pattern which matches wins.
+    """
+    files, dirs, negated = _compile_patterns(tuple(patterns))
+
+    def exclude(path, is_dir=False):
+        match = (dirs if is_dir else files).fullmatch(path)
+        return match is not None and not negated[match.lastindex]
+
+    return exclude
 
 
 def _filter_paths(basename, path, is_dir, exclude):
     """ .gitignore style file filtering. """
-    for item in exclude:
-        # Items ending in '/' apply only to directories.
-        if item.endswith('/') and not is_dir:
-            continue
-        # Items starting with '/' apply to the whole path.
-        # In any other cases just the basename is used.
-        match = path if item.startswith('/') else basename
-        if fnmatch.fnmatch(match, item.strip('/')):
-            return True
-    return False
+    return _compile_exclude(exclude)(path.replace(os.sep, '/'), is_dir)
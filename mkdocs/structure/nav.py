@@ -1,7 +1,7 @@
 import logging
 from urllib.parse import urlparse
 
-from mkdocs.structure.pages import Page
+from mkdocs.structure.pages import Page, get_active_items
 from mkdocs.utils import nest_paths, warning_filter
 
 log = logging.getLogger(__name__)
@@ -46,7 +46,7 @@ class Section:
 
     def _get_active(self):
         """ Return active status of section. """
-        return self.__active
+        return self.__active or any(item is self for item in get_active_items())
 
     def _set_active(self, value):
         """ Set active status of section and ancestors. """
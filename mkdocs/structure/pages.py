@@ -1,5 +1,10 @@
+import functools
 import os
 import logging
+import posixpath
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import urlparse, urlunparse, urljoin
 from urllib.parse import unquote as urlunquote
 
@@ -8,12 +13,49 @@ from markdown.extensions import Extension
 from markdown.treeprocessors import Treeprocessor
 from markdown.util import AMP_SUBSTITUTE
 
+import mkdocs
 from mkdocs.structure.toc import get_toc
-from mkdocs.utils import meta, get_build_date, get_markdown_title, warning_filter
+from mkdocs.utils import (
+    meta, get_build_date, get_markdown_extension_version, get_markdown_title, get_pygments_version, warning_filter
+)
+from mkdocs.utils.cache import get_key
 
 log = logging.getLogger(__name__)
 log.addFilter(warning_filter)
 
+# Holds the navigation items which are active for the template being rendered by the current thread.
+_active = threading.local()
+
+# Holds the Markdown converter which is reused by the pages rendered by the current thread.
+_converter = threading.local()
+
+# Whether `Page.render` times each processor of the Markdown converter. See `profile_markdown`.
+_profiling = False
+
+# The names by which the registries of processors of a Markdown converter are reported.
+_REGISTRY_NAMES = ('preprocessors', 'blockprocessors', 'treeprocessors', 'inlinepatterns', 'postprocessors')
+
+
+def get_active_items():
+    """ Return the navigation items which are active in the current thread. """
+    return getattr(_active, 'items', ())
+
+
+@contextmanager
+def activate(items):
+    """
+    Mark the given navigation items as active within the context.
+
+    The state is local to the current thread, which allows multiple pages to be rendered at once
+    from the same navigation. Usually `items` is a page followed by its ancestors.
+    """
+    previous = get_active_items()
+    _active.items = tuple(items)
+    try:
+        yield
+    finally:
+        _active.items = previous
+
 
 class Page:
     def __init__(self, title, file, config):
@@ -38,10 +80,17 @@ class Page:
         self._set_edit_url(config.get('repo_url', None), config.get('edit_uri', None))
 
         # Placeholders to be filled in later in the build process.
+        self._spill_paths = {}
+        # A callable which renders the page, when rendering is deferred by `defer_render`.
+        self._deferred = None
         self.markdown = None
         self.content = None
         self.toc = []
         self.meta = {}
+        # The (target_path, url) pairs of the links resolved by the last render.
+        self._links = []
+        # The time spent in each Markdown processor by the last render, when profiling.
+        self._processor_times = None
 
     def __eq__(self, other):
         return (
@@ -62,7 +111,7 @@ class Page:
 
     def _get_active(self):
         """ Return active status of page. """
-        return self.__active
+        return self.__active or any(item is self for item in get_active_items())
 
     def _set_active(self, value):
         """ Set active status of page and ancestors. """
@@ -72,6 +121,81 @@ class Page:
 
     active = property(_get_active, _set_active)
 
+    def _get_spilled(name, rendered=False):
+        """
+        Return a property for an attribute which may be released to a file by `release`. If the
+        attribute is `rendered`, any deferred rendering of the page is done when it is first accessed.
+        """
+        attr = '_' + name
+
+        def fget(self):
+            if rendered and self._deferred is not None:
+                self.render_deferred()
+            value = getattr(self, attr)
+            path = self._spill_paths.get(name)
+            if value is None and path is not None:
+                # Read the value without keeping it, so that the memory is released again.
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    value = f.read()
+            return value
+
+        def fset(self, value):
+            if rendered:
+                # A value which is set takes the place of any deferred rendering.
+                self._deferred = None
+            self._spill_paths.pop(name, None)
+            setattr(self, attr, value)
+
+        return property(fget, fset)
+
+    markdown = _get_spilled('markdown')
+    content = _get_spilled('content', rendered=True)
+    del _get_spilled
+
+    @property
+    def toc(self):
+        if self._deferred is not None:
+            self.render_deferred()
+        return self._toc
+
+    @toc.setter
+    def toc(self, value):
+        self._toc = value
+
+    @property
+    def is_render_deferred(self):
+        """ Whether the rendering of the page has been deferred by `defer_render`, and not yet done. """
+        return self._deferred is not None
+
+    def defer_render(self, render):
+        """
+        Defer the rendering of the page to `render`, a callable which is called the first time that
+        the `content` or `toc` of the page is accessed (or by `render_deferred`).
+        """
+        self._deferred = render
+
+    def render_deferred(self):
+        """ Render the page now if its rendering was deferred by `defer_render`, and not yet done. """
+        render, self._deferred = self._deferred, None
+        if render is not None:
+            render()
+
+    def release(self, spill_dir):
+        """
+        Write the `markdown` and `content` of the page to files in `spill_dir` and release them
+        from memory. They are read back from the files whenever they are accessed.
+        """
+        key = get_key(self.file.src_path)
+        for name, ext in (('markdown', '.md'), ('content', '.html')):
+            value = getattr(self, '_' + name)
+            if value is None:
+                continue
+            path = os.path.join(spill_dir, key + ext)
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(value)
+            setattr(self, '_' + name, None)
+            self._spill_paths[name] = path
+
     @property
     def is_index(self):
         return self.file.name == 'index'
@@ -111,32 +235,62 @@ class Page:
         else:
             self.edit_url = None
 
-    def read_source(self, config):
+    def read_source(self, config, prefetcher=None):
+        """
+        Read the Markdown source of the page, and its meta-data and title. If a
+        `mkdocs.utils.prefetch.Prefetcher` is given, the source is taken from it when it has been read.
+        """
+        source = config['plugins'].run_event(
+            'page_read_source', page=self, config=config
+        )
+        if source is None:
+            try:
+                if prefetcher is not None:
+                    source = prefetcher.read_text(self.file.abs_src_path)
+                if source is None:
+                    with open(self.file.abs_src_path, 'r', encoding='utf-8-sig', errors='strict') as f:
+                        source = f.read()
+            except OSError:
+                log.error('File not found: {}'.format(self.file.src_path))
+                raise
+            except ValueError:
+                log.error('Encoding error reading file: {}'.format(self.file.src_path))
+                raise
+
+        self.markdown, self.meta, title = meta.get_header(source)
+        self._set_title(title)
+
+    def read_header(self, config):
+        """
+        Read the meta-data and title of the page from the header of its source, without reading
+        (or keeping) the rest of the source. The page is left to be read by `read_source`.
+        """
         source = config['plugins'].run_event(
             'page_read_source', page=self, config=config
         )
         if source is None:
             try:
                 with open(self.file.abs_src_path, 'r', encoding='utf-8-sig', errors='strict') as f:
-                    source = f.read()
+                    self.meta, title = meta.read_header(f)
             except OSError:
                 log.error('File not found: {}'.format(self.file.src_path))
                 raise
             except ValueError:
                 log.error('Encoding error reading file: {}'.format(self.file.src_path))
                 raise
+        else:
+            _, self.meta, title = meta.get_header(source)
 
-        self.markdown, self.meta = meta.get_data(source)
-        self._set_title()
+        self._set_title(title)
 
-    def _set_title(self):
+    def _set_title(self, markdown_title=None):
         """
         Set the title for a Markdown document.
 
         Check these in order and use the first that returns a valid title:
         - value provided on init (passed in from config)
         - value of metadata 'title'
-        - content of the first H1 in Markdown content
+        - content of the first H1 in Markdown content (`markdown_title`, if it has been found)
         - convert filename to title
         """
         if self.title is not None:
@@ -146,7 +300,9 @@ class Page:
             self.title = self.meta['title']
             return
 
-        title = get_markdown_title(self.markdown)
+        title = markdown_title
+        if title is None and self.markdown is not None:
+            title = get_markdown_title(self.markdown)
 
         if title is None:
             if self.is_homepage:
@@ -159,27 +315,240 @@ class Page:
 
         self.title = title
 
-    def render(self, config, files):
+    def render(self, config, files, cache=None):
         """
         Convert the Markdown source file to HTML as per the config.
+
+        If a `mkdocs.utils.cache.Cache` is given, the output is reused from a previous render of
+        identical Markdown as long as every link in it still resolves to the same URL. The cache
+        is not used while profiling Markdown processors (see `profile_markdown`).
+        """
+
+        if _profiling:
+            cache = None
+
+        if cache is not None:
+            key = self._get_render_key(config)
+            entry = cache.get(key)
+            if entry is not None and all(
+                _get_link_url(self.file, files, target_path) == url for target_path, url in entry['links']
+            ):
+                self.content = entry['content']
+                self.toc = get_toc(entry['toc'])
+                self._links = entry['links']
+                return
+
+        md, relpath = _get_converter(config)
+        relpath.set_file(self.file, files)
+        try:
+            self.content = md.convert(self.markdown)
+            toc_tokens = getattr(md, 'toc_tokens', [])
+            self.toc = get_toc(toc_tokens)
+            self._links = relpath.links
+            if _profiling:
+                self._processor_times = dict(_converter.times)
+        finally:
+            # Don't keep the files collection alive after the build.
+            relpath.set_file(None, None)
+
+        if cache is not None:
+            cache.set(key, {'content': self.content, 'toc': toc_tokens, 'links': self._links})
+
+    def _get_render_key(self, config):
         """
+        Return a cache key for all of the inputs to `render`, except for the targets of links. The
+        versions of the packages which provide the extensions, and of Pygments (which extensions
+        use to highlight code), are included. Files read by extensions are not.
+        """
+        return get_key(
+            mkdocs.__version__,
+            markdown.__version__,
+            config['markdown_extensions'],
+            config['mdx_configs'],
+            [get_markdown_extension_version(name) for name in config['markdown_extensions']],
+            get_pygments_version(),
+            self.file.src_path,
+            self.file.url,
+            self.markdown
+        )
+
 
-        extensions = [
-            _RelativePathExtension(self.file, files)
-        ] + config['markdown_extensions']
+def _get_converter(config):
+    """
+    Return a Markdown converter for the extensions in `config`, which is ready to convert a page,
+    and the `_RelativePathExtension` registered with it.
 
+    Creating a converter imports and sets up every extension, so each thread reuses its converter
+    for as long as the extensions are unchanged, and resets it between pages.
+    """
+    key = get_key(config['markdown_extensions'], config['mdx_configs'], _profiling)
+    if getattr(_converter, 'key', None) != key:
+        relpath = _RelativePathExtension(None, None)
         md = markdown.Markdown(
-            extensions=extensions,
+            extensions=[relpath] + config['markdown_extensions'],
             extension_configs=config['mdx_configs'] or {}
         )
-        self.content = md.convert(self.markdown)
-        self.toc = get_toc(getattr(md, 'toc_tokens', []))
+        _converter.key = key
+        _converter.md = md
+        _converter.relpath = relpath
+        _converter.processors = _get_processor_names(md)
+        _converter.times = {}
+        if _profiling:
+            _time_processors(md, _converter.times)
+    md = _converter.md
+    md.reset()
+    _converter.times.clear()
+    # Some extensions register processors while converting a document (such as the `abbr`
+    # extension, for each abbreviation), which must not apply to the next page.
+    for registry, names in zip(_get_registries(md), _converter.processors):
+        for name in set(registry._data) - names:
+            registry.deregister(name)
+    return md, _converter.relpath
+
+
+def profile_markdown(enabled=True):
+    """
+    Enable or disable the timing of each processor of the Markdown converter by `Page.render`.
+
+    While enabled, the time spent in each processor (excluding any processors it runs, such as
+    the inline patterns run by the `inline` treeprocessor) by the last render of a page is kept
+    in `page._processor_times`, which maps a label such as
+    `treeprocessors.hilite (markdown.extensions.codehilite)` to a number of seconds.
+    """
+    global _profiling
+    _profiling = enabled
+
+
+def _time_processors(md, times):
+    """ Wrap each processor of a converter so that the time spent in it is added to `times`. """
+    # The time spent in the processors which are running, less that spent in the processors they run.
+    stack = []
+
+    def timed(label, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                times[label] = times.get(label, 0.0) + duration - stack.pop()
+                if stack:
+                    stack[-1] += duration
+        return wrapper
+
+    for registry_name, registry in zip(_REGISTRY_NAMES, _get_registries(md)):
+        for name, processor in registry._data.items():
+            label = '{}.{} ({})'.format(registry_name, name, type(processor).__module__)
+            # Block processors are tested against every block, and inline patterns are matched
+            # by the `inline` treeprocessor before they handle a match.
+            for method in ('test', 'run', 'handleMatch'):
+                func = getattr(processor, method, None)
+                if func is not None:
+                    setattr(processor, method, timed(label, func))
+
+
+def get_processor_times(pages):
+    """
+    Return a list of `(label, pages, seconds)` for each Markdown processor, with the slowest first,
+    from the times recorded for `pages` while profiling.
+    """
+    totals = {}
+    for page in pages:
+        for label, seconds in (page._processor_times or {}).items():
+            total = totals.setdefault(label, [0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+    return sorted(
+        ((label, count, seconds) for label, (count, seconds) in totals.items()), key=lambda item: item[2], reverse=True
+    )
+
+
+def get_processor_times_summary(pages, limit=10, slowest=10):
+    """
+    Return a table of the `limit` slowest Markdown processors across `pages`, followed by the
+    `slowest` pages and the processors which took the most time on each.
+    """
+    lines = ['{:<80} {:>7} {:>10}'.format('Processor', 'Pages', 'Time (s)')]
+    for label, count, seconds in get_processor_times(pages)[:limit]:
+        lines.append('{:<80} {:>7} {:>10.3f}'.format(label, count, seconds))
+
+    profiled = [page for page in pages if page._processor_times]
+    profiled.sort(key=lambda page: sum(page._processor_times.values()), reverse=True)
+    if profiled and slowest:
+        lines.append('')
+        lines.append('Slowest pages:')
+        for page in profiled[:slowest]:
+            times = sorted(page._processor_times.items(), key=lambda item: item[1], reverse=True)
+            lines.append('  {:<86} {:>10.3f}'.format(page.file.src_path, sum(page._processor_times.values())))
+            for label, seconds in times[:3]:
+                lines.append('    {:<84} {:>10.3f}'.format(label, seconds))
+    return '\n'.join(lines)
+
+
+def _get_registries(md):
+    return (md.preprocessors, md.parser.blockprocessors, md.treeprocessors, md.inlinePatterns, md.postprocessors)
+
+
+def _get_processor_names(md):
+    """ Return the names of the processors registered with each registry of a converter. """
+    return [set(registry._data) for registry in _get_registries(md)]
+
+
+def _get_url_base(url):
+    """ Return the part of a page's URL which the URLs relative to the page depend on. """
+    if url != '.':
+        head, tail = posixpath.split(url)
+        return head if '.' in tail else url
+    return url
+
+
+def _get_link_url(file, files, target_path):
+    """ Return the URL of the file at `target_path` relative to `file`, or `None` if there isn't one. """
+    link_cache = getattr(files, '_link_cache', None)
+    key = ('target', _get_url_base(file.url), target_path)
+    if link_cache is not None and key in link_cache:
+        return link_cache[key]
+
+    target_file = files.get_file_from_path(target_path)
+    url = None if target_file is None else target_file.url_relative_to(file)
+
+    if link_cache is not None:
+        link_cache[key] = url
+    return url
+
+
+def get_missing_links(pages):
+    """
+    Return a dict of the `src_path` of each page which links to files that are not found in the
+    documentation files, to a list of the paths of those files.
+    """
+    missing = {}
+    for page in pages:
+        targets = []
+        for target_path, url in page._links:
+            if url is None and target_path not in targets:
+                targets.append(target_path)
+        if targets:
+            missing[page.file.src_path] = targets
+    return missing
+
+
+def get_missing_links_report(missing):
+    """ Return a report of the links to missing files, as returned by `get_missing_links`. """
+    lines = ['Documentation files contain links to files which are not found in the documentation files:']
+    for src_path, targets in missing.items():
+        lines.append("  - '{}': {}".format(src_path, ', '.join("'{}'".format(target) for target in targets)))
+    return '\n'.join(lines)
 
 
 class _RelativePathTreeprocessor(Treeprocessor):
-    def __init__(self, file, files):
+    def __init__(self, file, files, links):
         self.file = file
         self.files = files
+        # A list of (target_path, url) pairs, in document order, for every link which was resolved.
+        self.links = links
 
     def run(self, root):
         """
@@ -203,6 +572,27 @@ class _RelativePathTreeprocessor(Treeprocessor):
         return root
 
     def path_to_url(self, url):
+        # The same link from any page in the same directory, and with the same URL base, resolves
+        # to the same URL, so the result is shared by every page which uses the files collection.
+        link_cache = getattr(self.files, '_link_cache', None)
+        key = ('href', os.path.dirname(self.file.src_path), _get_url_base(self.file.url), url)
+        if link_cache is not None and key in link_cache:
+            new_url, target_path, path = link_cache[key]
+        else:
+            new_url, target_path, path = self._resolve(url)
+            if link_cache is not None:
+                link_cache[key] = (new_url, target_path, path)
+
+        if target_path is not None:
+            self.links.append((target_path, path))
+        return new_url
+
+    def _resolve(self, url):
+        """
+        Return the new URL of a link, the path of the file it links to (or `None` if it is not a
+        link to a file) and the URL of that file relative to the page (or `None` if the file is
+        not found).
+        """
         scheme, netloc, path, params, query, fragment = urlparse(url)
 
         if (scheme or netloc or not path or url.startswith('/') or url.startswith('\\')
@@ -210,23 +600,18 @@ class _RelativePathTreeprocessor(Treeprocessor):
             # Ignore URLs unless they are a relative link to a source file.
             # AMP_SUBSTITUTE is used internally by Markdown only for email.
             # No '.' in the last part of a path indicates path does not point to a file.
-            return url
+            return url, None, None
 
         # Determine the filepath of the target.
         target_path = os.path.join(os.path.dirname(self.file.src_path), urlunquote(path))
         target_path = os.path.normpath(target_path).lstrip(os.sep)
 
         # Validate that the target exists in files collection.
-        if target_path not in self.files:
-            log.warning(
-                "Documentation file '{}' contains a link to '{}' which is not found "
-                "in the documentation files.".format(self.file.src_path, target_path)
-            )
-            return url
-        target_file = self.files.get_file_from_path(target_path)
-        path = target_file.url_relative_to(self.file)
+        path = _get_link_url(self.file, self.files, target_path)
+        if path is None:
+            return url, target_path, None
         components = (scheme, netloc, path, params, query, fragment)
-        return urlunparse(components)
+        return urlunparse(components), target_path, path
 
 
 class _RelativePathExtension(Extension):
@@ -238,7 +623,19 @@ class _RelativePathExtension(Extension):
     def __init__(self, file, files):
         self.file = file
         self.files = files
+        self.links = []
+        self.treeprocessor = None
+
+    def set_file(self, file, files):
+        """ Make relative the links of the page of `file`, when the converter is reused. """
+        self.file = file
+        self.files = files
+        self.links = []
+        if self.treeprocessor is not None:
+            self.treeprocessor.file = file
+            self.treeprocessor.files = files
+            self.treeprocessor.links = self.links
 
     def extendMarkdown(self, md):
-        relpath = _RelativePathTreeprocessor(self.file, self.files)
-        md.treeprocessors.register(relpath, "relpath", 0)
+        self.treeprocessor = _RelativePathTreeprocessor(self.file, self.files, self.links)
+        md.treeprocessors.register(self.treeprocessor, "relpath", 0)
@@ -32,6 +32,9 @@ def load_config(**cfg):
     if 'docs_dir' not in cfg:
         # Point to an actual dir to avoid a 'does not exist' error on validation.
         cfg['docs_dir'] = os.path.join(path_base, 'docs')
+    if 'cache' not in cfg:
+        # Don't leave a render cache behind in the test directory.
+        cfg['cache'] = False
     conf = config.Config(schema=config.DEFAULT_SCHEMA, config_file_path=cfg['config_file_path'])
     conf.load_dict(cfg)
 
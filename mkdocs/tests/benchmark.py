@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks of the parts of a build which scale with the size of a site.
+
+These are not run as part of the test suite. Run a benchmark with:
+
+    python -m mkdocs.tests.benchmark <name> [--size N] [--repeat N]
+
+Each benchmark reports a duration (in seconds) or an amount of memory (in MB).
+"""
+
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from mkdocs.tests.base import load_config
+
+
+def _make_docs_dir(root, size, per_dir=100):
+    """ Create a `docs_dir` of `size` empty files, with `per_dir` files in each directory. """
+    for i in range(size):
+        dirname = os.path.join(root, 'section{}'.format(i // (per_dir * per_dir)), 'sub{}'.format(i // per_dir))
+        if i % per_dir == 0:
+            os.makedirs(dirname, exist_ok=True)
+        ext = '.md' if i % 4 else '.png'
+        open(os.path.join(dirname, 'file{}{}'.format(i, ext)), 'w').close()
+
+
+def bench_get_files(size, repeat):
+    """
+    Scan a `docs_dir` of `size` files, both without creating `File` objects (which measures the
+    scanner and the exclude patterns alone) and with `get_files`.
+    """
+    from mkdocs.structure.files import get_files, _compile_exclude, _scan_dir
+
+    with tempfile.TemporaryDirectory() as docs_dir:
+        _make_docs_dir(docs_dir, size)
+        exclude_docs = ['*.tmp', '/section0/sub1/', '!/section0/sub1/keep.md', 'drafts/']
+        config = load_config(docs_dir=docs_dir, exclude_docs=exclude_docs)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            exclude = _compile_exclude(['.*', '/templates'] + exclude_docs)
+            paths = list(_scan_dir(docs_dir, exclude))
+            yield 'scan', len(paths), time.perf_counter() - start, 's'
+        for _ in range(repeat):
+            start = time.perf_counter()
+            files = get_files(config)
+            yield 'get_files', len(files), time.perf_counter() - start, 's'
+
+
+def bench_files_memory(size, repeat):
+    """
+    Measure the memory used by `size` `File` objects, before and after their derived paths are
+    first used, without touching the file system.
+    """
+    from mkdocs.structure.files import File
+
+    src_dir = os.path.abspath('docs')
+    dest_dir = os.path.abspath('site')
+    paths = [
+        'section{}/sub{}/file{}{}'.format(i // 10000, i // 100, i, '.md' if i % 4 else '.png')
+        for i in range(size)
+    ]
+    for _ in range(repeat):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            files = [File(path, src_dir, dest_dir, use_directory_urls=True) for path in paths]
+            yield 'files', len(files), (tracemalloc.get_traced_memory()[0] - before) / 1024 / 1024, 'MB'
+            for file in files:
+                file.url
+                file.abs_dest_path
+            yield 'files (paths used)', len(files), (tracemalloc.get_traced_memory()[0] - before) / 1024 / 1024, 'MB'
+        finally:
+            tracemalloc.stop()
+        del files
+
+
+_PAGE = """# Page {0}
+
+## Section
+
+Some *text* with a [link](page{1}.md) and `code`.
+
+| Column | Other |
+| ------ | ----- |
+| a      | b     |
+
+```python
+def func():
+    return {0}
+```
+"""
+
+
+def bench_render(size, repeat):
+    """
+    Render `size` pages with a heavy set of Markdown extensions, both with a new Markdown converter
+    for each page (as MkDocs did before converters were reused) and with `Page.render`.
+    """
+    import markdown
+    from mkdocs.structure.files import File, Files
+    from mkdocs.structure.pages import Page, _RelativePathExtension
+
+    extensions = ['toc', 'tables', 'fenced_code', 'codehilite', 'attr_list', 'def_list', 'footnotes', 'admonition']
+    config = load_config(markdown_extensions=extensions)
+    files = Files([
+        File('page{}.md'.format(i), config['docs_dir'], config['site_dir'], config['use_directory_urls'])
+        for i in range(size)
+    ])
+    pages = []
+    for i, file in enumerate(files):
+        page = Page(None, file, config)
+        page.markdown = _PAGE.format(i, (i + 1) % size)
+        pages.append(page)
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            relpath = _RelativePathExtension(page.file, files)
+            md = markdown.Markdown(
+                extensions=[relpath] + config['markdown_extensions'],
+                extension_configs=config['mdx_configs'] or {}
+            )
+            md.convert(page.markdown)
+        yield 'converter per page', len(pages), time.perf_counter() - start, 's'
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            page.render(config, files)
+        yield 'render', len(pages), time.perf_counter() - start, 's'
+
+
+def _legacy_get_header(doc):
+    """ Extract the meta-data and title of a document as MkDocs did before `meta.get_header`. """
+    from mkdocs.utils.meta import META_RE, META_MORE_RE
+
+    lines = doc.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    data = {}
+    key = None
+    while lines:
+        line = lines.pop(0)
+        if line.strip() == '':
+            break
+        m1 = META_RE.match(line)
+        if m1:
+            key = m1.group('key').lower().strip()
+            data[key] = m1.group('value').strip()
+        else:
+            m2 = META_MORE_RE.match(line)
+            if m2 and key:
+                data[key] += ' {}'.format(m2.group('value').strip())
+            else:
+                lines.insert(0, line)
+                break
+    doc = '\n'.join(lines).lstrip('\n')
+
+    lines = doc.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    title = None
+    while lines:
+        line = lines.pop(0).strip()
+        if line:
+            title = line.lstrip('# ') if line.startswith('# ') else None
+            break
+    return doc, data, title
+
+
+def bench_header(size, repeat):
+    """
+    Extract the meta-data and title of generated pages of `size` KB with a MultiMarkdown header,
+    both as MkDocs did before `meta.get_header` and with it.
+    """
+    from mkdocs.utils.meta import get_header
+
+    line = 'Some text with *emphasis* and a [link](other.md).\n'
+    docs = [
+        'Title: Page\nAuthors: A\n    B\n\n# Page\n\n' + line * (size * 1024 // len(line)),
+        '# Page\n\n' + line * (size * 1024 // len(line)),
+    ]
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            _legacy_get_header(doc)
+        yield 'split lines', len(docs), time.perf_counter() - start, 's'
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            get_header(doc)
+        yield 'get_header', len(docs), time.perf_counter() - start, 's'
+
+
+BENCHMARKS = {
+    'get_files': (bench_get_files, 250000),
+    'files_memory': (bench_files_memory, 250000),
+    'render': (bench_render, 2000),
+    'header': (bench_header, 8192),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a MkDocs benchmark.')
+    parser.add_argument('name', choices=sorted(BENCHMARKS))
+    parser.add_argument('--size', type=int, help='The size of the input (such as a number of files).')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of times to run the benchmark.')
+    args = parser.parse_args()
+
+    func, size = BENCHMARKS[args.name]
+    for label, count, value, unit in func(args.size or size, args.repeat):
+        print('{:<30} {:>10} {:>10.3f}{}'.format(label, count, value, unit))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,27 @@
 #!/usr/bin/env python
 
 from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+import shutil
 import unittest
+from tempfile import TemporaryDirectory
 
-from mkdocs.structure.pages import Page
-from mkdocs.structure.files import File, Files
+from jinja2.exceptions import TemplateNotFound
+
+from mkdocs.structure import pages
+from mkdocs.structure.pages import Page, get_missing_links
+from mkdocs.structure.files import File, Files, get_files
 from mkdocs.structure.nav import get_navigation
 from mkdocs.commands import build
 from mkdocs.tests.base import load_config, tempdir, PathAssertionMixin
-from mkdocs.utils import meta
+from mkdocs.plugins import BasePlugin
+from mkdocs import instrument, utils
+from mkdocs.contrib import search
+from mkdocs.utils import meta, warning_filter
+from mkdocs.utils.manifest import MANIFEST_FILENAME, Manifest
 
 
 def build_page(title, path, config, md_src=''):
@@ -121,6 +134,26 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         context = build.get_context(mock.Mock(), mock.Mock(), cfg, base_url='/foo/')
         self.assertEqual(context['base_url'], '/foo/')
 
+    def test_context_active_items(self):
+        nav_cfg = [
+            {'Home': 'index.md'},
+            {'Section': [
+                {'Nested': 'foo/bar.md'}
+            ]}
+        ]
+        cfg = load_config(nav=nav_cfg)
+        files = Files([
+            File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+            File('foo/bar.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        ])
+        nav = get_navigation(files, cfg)
+        context = build.get_context(nav, files, cfg, nav.pages[1])
+        self.assertEqual(len(context['active_items']), 2)
+        self.assertIs(context['active_items'][0], nav.pages[1])
+        self.assertIs(context['active_items'][1], nav.items[1])
+        context = build.get_context(nav, files, cfg, base_url='..')
+        self.assertEqual(context['active_items'], ())
+
     def test_context_extra_css_js_from_homepage(self):
         nav_cfg = [
             {'Home': 'index.md'}
@@ -207,7 +240,8 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         cfg = load_config()
         env = cfg['theme'].get_env()
         build._build_theme_template('sitemap.xml', env, mock.Mock(), cfg, mock.Mock())
-        self.assert_mock_called_once(mock_write_file)
+        # The sitemap and its gzipped copy are both written.
+        self.assertEqual(mock_write_file.call_count, 2)
         self.assert_mock_called_once(mock_build_template)
         self.assert_mock_called_once(mock_gzip_gzipfile)
 
@@ -298,26 +332,6 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         build._populate_page(page, cfg, Files([file]))
         self.assertEqual(page.content, '<p>page content</p>')
 
-    @tempdir(files={'testing.html': '<p>page content</p>'})
-    def test_populate_page_dirty_modified(self, site_dir):
-        cfg = load_config(site_dir=site_dir)
-        file = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
-        page = Page('Foo', file, cfg)
-        build._populate_page(page, cfg, Files([file]), dirty=True)
-        self.assertTrue(page.markdown.startswith('# Welcome to MkDocs'))
-        self.assertTrue(page.content.startswith('<h1 id="welcome-to-mkdocs">Welcome to MkDocs</h1>'))
-
-    @tempdir(files={'index.md': 'page content'})
-    @tempdir(files={'index.html': '<p>page content</p>'})
-    def test_populate_page_dirty_not_modified(self, site_dir, docs_dir):
-        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
-        file = File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
-        page = Page('Foo', file, cfg)
-        build._populate_page(page, cfg, Files([file]), dirty=True)
-        # Content is empty as file read was skipped
-        self.assertEqual(page.markdown, None)
-        self.assertEqual(page.content, None)
-
     @tempdir(files={'index.md': 'new page content'})
     @mock.patch('mkdocs.structure.pages.open', side_effect=OSError('Error message.'))
     def test_populate_page_read_error(self, docs_dir, mock_open):
@@ -334,6 +348,292 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         )
         self.assert_mock_called_once(mock_open)
 
+    # Test build._populate_pages
+
+    @tempdir(files={
+        'index.md': '# Home',
+        'foo.md': 'foo content',
+        'bar/baz.md': 'Title: Baz\n\n[link](../foo.md)',
+    })
+    def test_populate_pages_parallel(self, docs_dir):
+        serial_cfg = load_config(docs_dir=docs_dir, plugins=[])
+        serial_files = get_files(serial_cfg)
+        get_navigation(serial_files, serial_cfg)
+        build._populate_pages(serial_cfg, serial_files)
+
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        build._populate_pages(cfg, files)
+
+        for serial_file, file in zip(serial_files.documentation_pages(), files.documentation_pages()):
+            self.assertEqual(file.page.markdown, serial_file.page.markdown)
+            self.assertEqual(file.page.content, serial_file.page.content)
+            self.assertEqual(str(file.page.toc), str(serial_file.page.toc))
+            self.assertEqual(file.page.meta, serial_file.page.meta)
+            self.assertEqual(file.page.title, serial_file.page.title)
+        self.assertEqual(files.get_file_from_path('bar/baz.md').page.title, 'Baz')
+        self.assertEqual(
+            files.get_file_from_path('bar/baz.md').page.content,
+            '<p><a href="../../foo/">link</a></p>'
+        )
+
+    @tempdir(files={'index.md': '# Home', 'foo.md': 'foo content'})
+    def test_populate_pages_lazy(self, docs_dir):
+        class ContentPlugin(BasePlugin):
+            streaming_safe = True
+
+            def on_page_content(self, html, page, **kwargs):
+                return html + '<p>{}</p>'.format(page.file.src_path)
+
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        cfg['plugins']['content'] = ContentPlugin()
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with mock.patch('mkdocs.structure.pages.Page.render', autospec=True, side_effect=Page.render) as mock_render:
+            build._populate_pages(cfg, files, lazy=True)
+            page = files.get_file_from_path('index.md').page
+            # The sources are read, but not rendered until the content is accessed.
+            self.assertEqual(page.markdown, '# Home')
+            self.assertEqual(page.title, 'Home')
+            mock_render.assert_not_called()
+            self.assertEqual(page.content, '<h1 id="home">Home</h1><p>index.md</p>')
+            self.assertEqual(mock_render.call_count, 1)
+
+    @tempdir(files={
+        'index.md': '# Home\n\n[foo](foo.md) [missing](missing.md)',
+        'foo.md': 'Title: Foo Title\n\nfoo content',
+    })
+    @tempdir()
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_lazy_render(self, site_dir, lazy_site_dir, docs_dir):
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(load_config(docs_dir=docs_dir, site_dir=lazy_site_dir, lazy_render=True))
+        build_pages = [s for s in instrument.get_root().children if s.name == 'build_pages'][0]
+        self.assertIn('render_page', [s.name for s in build_pages.children[0].children])
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertEqual(self._read_site(lazy_site_dir), self._read_site(site_dir))
+        # The links to missing files are reported once the pages have been built.
+        self.assertTrue(any("'index.md': 'missing.md'" in line for line in cm.output))
+
+    @tempdir(files={
+        'index.md': '# Home\n\n[foo](foo.md)',
+        'foo.md': 'foo content',
+        'bar.md': 'bar content',
+    })
+    @tempdir()
+    def test_build_lazy_render_dirty(self, site_dir, docs_dir):
+        def build_site():
+            cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, plugins=[], lazy_render=True)
+            render = mock.patch('mkdocs.structure.pages.Page.render', autospec=True, side_effect=Page.render)
+            with render as mock_render:
+                build.build(cfg, dirty=True)
+            return sorted(call[0][0].file.src_path for call in mock_render.call_args_list)
+
+        self.assertEqual(build_site(), ['bar.md', 'foo.md', 'index.md'])
+        # Pages whose output is unchanged are not rendered at all.
+        self.assertEqual(build_site(), [])
+
+        with open(os.path.join(docs_dir, 'bar.md'), 'w') as f:
+            f.write('changed')
+        self.assertEqual(build_site(), ['bar.md'])
+        self.assertPathIsFile(site_dir, 'bar', 'index.html')
+        with open(os.path.join(site_dir, 'bar', 'index.html'), encoding='utf-8') as f:
+            self.assertIn('changed', f.read())
+
+        # Every page is rendered again when the navigation changes.
+        os.rename(os.path.join(docs_dir, 'foo.md'), os.path.join(docs_dir, 'moved.md'))
+        with self.assertLogs('mkdocs', level='WARNING'):
+            self.assertEqual(build_site(), ['bar.md', 'index.md', 'moved.md'])
+        # The links of pages which are not rendered are still checked.
+        reports = []
+
+        def report_missing_links(pages):
+            reports.append(get_missing_links(pages))
+            return reports[-1]
+
+        with mock.patch('mkdocs.commands.build.get_missing_links', report_missing_links):
+            self.assertEqual(build_site(), [])
+        self.assertEqual(reports, [{'index.md': ['foo.md']}])
+
+    @tempdir(files={
+        'index.md': '# Home\n\n## Section\n\nhome content',
+        'foo.md': 'foo content',
+    })
+    @tempdir()
+    def test_build_lazy_render_dirty_search(self, site_dir, docs_dir):
+        def build_site():
+            cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, lazy_render=True)
+            render = mock.patch('mkdocs.structure.pages.Page.render', autospec=True, side_effect=Page.render)
+            with render as mock_render:
+                build.build(cfg, dirty=True)
+            with open(os.path.join(site_dir, 'search', 'search_index.json'), encoding='utf-8') as f:
+                index = json.load(f)
+            return sorted(call[0][0].file.src_path for call in mock_render.call_args_list), index
+
+        rendered, index = build_site()
+        self.assertEqual(rendered, ['foo.md', 'index.md'])
+        # The search plugin reuses the entries of the pages which are not rendered.
+        self.assertEqual(build_site(), ([], index))
+
+        with open(os.path.join(docs_dir, 'foo.md'), 'w') as f:
+            f.write('changed content')
+        rendered, changed_index = build_site()
+        self.assertEqual(rendered, ['foo.md'])
+        self.assertEqual(
+            [(entry['location'], entry['text']) for entry in changed_index['docs']],
+            [(entry['location'], 'changed content' if entry['location'] == 'foo/' else entry['text'])
+             for entry in index['docs']]
+        )
+
+    @tempdir(files={'index.md': '# Home', 'foo.md': 'foo content'})
+    @tempdir()
+    def test_build_lazy_render_unsafe_plugin(self, site_dir, docs_dir):
+        class UnsafePlugin(BasePlugin):
+            def on_page_content(self, html, **kwargs):
+                return html
+
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, lazy_render=True)
+        cfg['plugins']['unsafe'] = UnsafePlugin()
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(cfg)
+        self.assertIn(
+            "INFO:mkdocs.commands.build:Rendering all pages before they are built as the following plugins "
+            "are not marked as safe to stream pages: unsafe",
+            cm.output
+        )
+        # The search plugin indexes the pages as usual, as they are not rendered lazily.
+        self.assertPathNotExists(site_dir, search.ENTRIES_FILENAME)
+
+    @tempdir(files={'index.md': '!!! note\n\n    note content'})
+    @tempdir()
+    def test_build_lazy_render_extension_instance(self, site_dir, docs_dir):
+        from markdown.extensions.admonition import AdmonitionExtension
+        for dirty in (False, True):
+            cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, lazy_render=True)
+            cfg['markdown_extensions'].append(AdmonitionExtension())
+            build.build(cfg, dirty=dirty)
+        self.assertPathIsFile(site_dir, search.ENTRIES_FILENAME)
+        with open(os.path.join(site_dir, 'search', 'search_index.json'), encoding='utf-8') as f:
+            self.assertIn('note content', f.read())
+
+    @tempdir(files={'index.md': '# Home', 'foo.md': 'foo content'})
+    def test_populate_pages_prefetch(self, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, plugins=[])
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with mock.patch('mkdocs.commands.build.Prefetcher', wraps=build.Prefetcher) as mock_prefetcher:
+            build._populate_pages(cfg, files)
+        paths = [file.abs_src_path for file in files.documentation_pages()]
+        mock_prefetcher.assert_called_once_with(paths)
+        self.assertEqual(files.get_file_from_path('index.md').page.markdown, '# Home')
+
+    @tempdir(files={'index.md': '# Home', 'foo.md': 'foo content'})
+    def test_populate_pages_prefetch_read_source_plugin(self, docs_dir):
+        class SourcePlugin(BasePlugin):
+            def on_page_read_source(self, page, **kwargs):
+                return 'source of ' + page.file.src_path
+
+        cfg = load_config(docs_dir=docs_dir, plugins=[])
+        cfg['plugins']['source'] = SourcePlugin()
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with mock.patch('mkdocs.commands.build.Prefetcher', wraps=build.Prefetcher) as mock_prefetcher:
+            build._populate_pages(cfg, files)
+        # The sources are not read ahead when a plugin provides them.
+        mock_prefetcher.assert_called_once_with([])
+        self.assertEqual(files.get_file_from_path('index.md').page.markdown, 'source of index.md')
+
+    @tempdir(files={
+        'index.md': '[link](missing.md)',
+        'foo.md': 'foo content',
+    })
+    def test_populate_pages_parallel_warnings(self, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        build._populate_pages(cfg, files)
+        # The links to missing files are recorded in the main process, for the build to report.
+        pages = [file.page for file in files.documentation_pages()]
+        self.assertEqual(get_missing_links(pages), {'index.md': ['missing.md']})
+
+    @tempdir(files={
+        'index.md': '[link](missing.md) [other](missing.md) [image](img/missing.png)',
+        'foo.md': '[link](../missing.md)',
+        'bar.md': '[link](foo.md)',
+    })
+    @tempdir()
+    def test_build_missing_links_report(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        count = warning_filter.count
+        with self.assertLogs('mkdocs', level='WARNING') as cm:
+            build.build(cfg)
+        self.assertEqual(
+            cm.output,
+            ["WARNING:mkdocs.structure.pages:Documentation files contain links to files which are not found "
+             "in the documentation files:\n"
+             "  - 'index.md': 'missing.md', '{}'\n"
+             "  - 'foo.md': '../missing.md'".format(os.path.join('img', 'missing.png'))]
+        )
+        self.assertEqual(warning_filter.count, count + 1)
+
+        # The same report is logged again by another build, as when `serve` rebuilds the site.
+        with self.assertLogs('mkdocs', level='WARNING') as second:
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertEqual(second.output, cm.output)
+        self.assertEqual(warning_filter.count, count + 2)
+
+    @tempdir(files={'index.md': 'page content', 'foo.md': 'foo content'})
+    def test_populate_pages_parallel_error(self, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        files.append(File('missing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']))
+        Page(None, files.get_file_from_path('missing.md'), cfg)
+        with self.assertLogs('mkdocs', level='ERROR') as cm:
+            self.assertRaises(OSError, build._populate_pages, cfg, files)
+        self.assertEqual(
+            cm.output[0], 'ERROR:mkdocs.structure.pages:File not found: missing.md'
+        )
+
+    @tempdir(files={'index.md': 'page content', 'foo.md': 'foo content'})
+    def test_populate_pages_parallel_threads(self, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with mock.patch('threading.active_count', return_value=2), \
+                mock.patch('multiprocessing.context.BaseContext.Pool') as mock_pool, \
+                self.assertLogs('mkdocs', level='INFO') as cm:
+            build._populate_pages(cfg, files)
+        # Worker processes are not forked while other threads (such as those of `serve`) are running.
+        mock_pool.assert_not_called()
+        self.assertEqual(
+            cm.output,
+            ["INFO:mkdocs.commands.build:Rendering pages serially as other threads are running, "
+             "such as those of a server."]
+        )
+        self.assertEqual(files.get_file_from_path('foo.md').page.content, '<p>foo content</p>')
+
+    @tempdir(files={'index.md': 'page content', 'foo.md': 'foo content'})
+    def test_populate_pages_parallel_unsafe_plugin(self, docs_dir):
+        class UnsafePlugin(BasePlugin):
+            def on_page_markdown(self, markdown, **kwargs):
+                self.seen = getattr(self, 'seen', 0) + 1
+
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        cfg['plugins']['unsafe'] = plugin = UnsafePlugin()
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build._populate_pages(cfg, files)
+        self.assertEqual(
+            cm.output,
+            ["INFO:mkdocs.commands.build:Rendering pages serially as the following plugins are not "
+             "marked as safe to run in parallel: unsafe"]
+        )
+        self.assertEqual(plugin.seen, 2)
+
     # Test build._build_page
 
     @tempdir()
@@ -349,6 +649,30 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         build._build_page(page, cfg, files, nav, cfg['theme'].get_env())
         self.assertPathIsFile(site_dir, 'index.html')
 
+    @tempdir()
+    def test_build_pages_concurrently(self, site_dir):
+        cfg = load_config(site_dir=site_dir, nav=['index.md', 'foo.md', 'bar.md'], plugins=[])
+        files = Files([
+            File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+            File('foo.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+            File('bar.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+        ])
+        nav = get_navigation(files, cfg)
+        env = cfg['theme'].get_env()
+        for page in nav.pages:
+            # Fake populate page
+            page.title = page.file.name.capitalize()
+            page.markdown = 'page content'
+            page.content = '<p>page content</p>'
+        with ThreadPoolExecutor(3) as executor:
+            list(executor.map(lambda page: build._build_page(page, cfg, files, nav, env), nav.pages * 4))
+        self.assertTrue(all(page.active is False for page in nav.pages))
+        for page in nav.pages:
+            with open(page.file.abs_dest_path, encoding='utf-8') as f:
+                output = f.read()
+            active = re.findall(r'<li class="navitem active">\s*<a href="[^"]*" class="nav-link">(\w+)</a>', output)
+            self.assertEqual(active, [page.title])
+
     # TODO: fix this. It seems that jinja2 chokes on the mock object. Not sure how to resolve.
     # @tempdir()
     # @mock.patch('jinja2.environment.Template')
@@ -371,34 +695,28 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
     #     self.assert_mock_called_once(mock_template.render)
     #     self.assertPathNotFile(site_dir, 'index.html')
 
-    @tempdir(files={'index.md': 'page content'})
-    @tempdir(files={'index.html': '<p>page content</p>'})
+    @tempdir()
     @mock.patch('mkdocs.utils.write_file')
-    def test_build_page_dirty_modified(self, site_dir, docs_dir, mock_write_file):
-        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, nav=['index.md'], plugins=[])
-        files = Files([File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])])
-        nav = get_navigation(files, cfg)
-        page = files.documentation_pages()[0].page
-        # Fake populate page
-        page.title = 'Title'
-        page.markdown = 'new page content'
-        page.content = '<p>new page content</p>'
-        build._build_page(page, cfg, files, nav, cfg['theme'].get_env(), dirty=True)
-        mock_write_file.assert_not_called()
+    def test_build_page_unchanged(self, site_dir, mock_write_file):
+        contexts = []
 
-    @tempdir(files={'testing.html': '<p>page content</p>'})
-    @mock.patch('mkdocs.utils.write_file')
-    def test_build_page_dirty_not_modified(self, site_dir, mock_write_file):
-        cfg = load_config(site_dir=site_dir, nav=['testing.md'], plugins=[])
-        files = Files([File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])])
+        class ContextPlugin(BasePlugin):
+            def on_page_context(self, context, **kwargs):
+                contexts.append(context)
+
+        cfg = load_config(site_dir=site_dir, nav=['index.md'], plugins=[])
+        cfg['plugins']['context'] = ContextPlugin()
+        files = Files([File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])])
         nav = get_navigation(files, cfg)
         page = files.documentation_pages()[0].page
         # Fake populate page
         page.title = 'Title'
         page.markdown = 'page content'
         page.content = '<p>page content</p>'
-        build._build_page(page, cfg, files, nav, cfg['theme'].get_env(), dirty=True)
-        self.assert_mock_called_once(mock_write_file)
+        build._build_page(page, cfg, files, nav, cfg['theme'].get_env(), changed=False)
+        mock_write_file.assert_not_called()
+        # The `page_context` event is run for unchanged pages.
+        self.assertEqual(len(contexts), 1)
 
     @tempdir()
     def test_build_page_custom_template(self, site_dir):
@@ -475,6 +793,374 @@ class BuildTests(PathAssertionMixin, unittest.TestCase):
         self.assertPathNotExists(site_dir, 'content.html')
         self.assertPathNotExists(site_dir, 'main.html')
 
+    @tempdir(files={'index.md': 'page content', 'img.jpg': ''})
+    @tempdir(files={'stale.html': 'stale content', '.hidden': ''})
+    def test_build_leaves_unchanged_files(self, site_dir, docs_dir):
+        for path in ['stale.html', '.hidden']:
+            os.utime(os.path.join(site_dir, path), (0, 0))
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'}):
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertPathNotExists(site_dir, 'stale.html')
+        self.assertPathIsFile(site_dir, '.hidden')
+        for path in ['index.html', 'img.jpg']:
+            os.utime(os.path.join(site_dir, path), (0, 0))
+
+        # The themes include the build date in each page, so it must not change between builds.
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'}):
+            with self.assertLogs('mkdocs', level='INFO') as cm:
+                build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertEqual(os.path.getmtime(os.path.join(site_dir, 'index.html')), 0)
+        self.assertEqual(os.path.getmtime(os.path.join(site_dir, 'img.jpg')), 0)
+        self.assertIn(
+            'INFO:mkdocs.commands.build:Wrote 0 files and skipped {} unchanged files.'.format(
+                utils.output_tracker.skipped),
+            cm.output
+        )
+
+    @tempdir(files={'index.md': '# Heading\n\npage content', 'other.md': '[link](index.md)'})
+    @tempdir()
+    @tempdir()
+    def test_build_low_memory(self, low_memory_site_dir, site_dir, docs_dir):
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'}):
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+            with self.assertLogs('mkdocs', level='INFO') as cm:
+                build.build(load_config(docs_dir=docs_dir, site_dir=low_memory_site_dir, low_memory=True))
+        self.assertTrue(any('Peak memory usage:' in line for line in cm.output))
+        for path in ['index.html', 'other/index.html', 'search/search_index.json']:
+            with open(os.path.join(site_dir, path), encoding='utf-8') as f:
+                expected = f.read()
+            with open(os.path.join(low_memory_site_dir, path), encoding='utf-8') as f:
+                self.assertEqual(f.read(), expected)
+
+    @tempdir(files={
+        'index.md': 'page content',
+        'foo.md': '[link](index.md)',
+    })
+    def test_populate_pages_spill_dir(self, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, plugins=[], jobs=2)
+        files = get_files(cfg)
+        get_navigation(files, cfg)
+        with TemporaryDirectory() as spill_dir:
+            build._populate_pages(cfg, files, spill_dir=spill_dir)
+            page = files.get_file_from_path('foo.md').page
+            self.assertIsNone(page._content)
+            self.assertEqual(page.content, '<p><a href="..">link</a></p>')
+            self.assertEqual(page.markdown, '[link](index.md)')
+
+    @tempdir(files={'index.md': 'page content', 'css/extra.css': 'body {}'})
+    @tempdir()
+    def test_build_fingerprint_assets(self, site_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, extra_css=['css/extra.css'], fingerprint_assets=True)
+        build.build(cfg)
+        with open(os.path.join(site_dir, 'asset-manifest.json'), encoding='utf-8') as f:
+            urls = json.load(f)
+        self.assertIn('css/base.css', urls)
+        self.assertIn('js/base.js', urls)
+        with open(os.path.join(site_dir, 'index.html'), encoding='utf-8') as f:
+            output = f.read()
+        for path in ['css/base.css', 'js/base.js', 'css/extra.css']:
+            self.assertIn('"{}"'.format(urls[path]), output)
+            self.assertNotIn('"{}"'.format(path), output)
+            # Both the original and the fingerprinted copy are output.
+            self.assertPathIsFile(site_dir, path)
+            self.assertPathIsFile(site_dir, urls[path])
+        self.assertEqual(utils.asset_urls, {})
+
+    @tempdir(files={'index.md': 'page content', 'other.md': 'other content'})
+    @tempdir()
+    def test_build_removes_stale_files_in_manifest(self, site_dir, docs_dir):
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        manifest = Manifest(site_dir)
+        self.assertTrue(manifest.load())
+        self.assertTrue(manifest.complete)
+        self.assertEqual(manifest.files['other/index.html']['source'], 'other.md')
+        self.assertEqual(manifest.files['other/index.html']['producer'], 'template:main.html')
+        self.assertEqual(manifest.files['search/search_index.json']['producer'], 'plugin:search')
+
+        os.remove(os.path.join(docs_dir, 'other.md'))
+        utils.write_file(b'', os.path.join(site_dir, 'untracked.html'))
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertPathNotExists(site_dir, 'other')
+        # Only the files listed in the manifest are removed.
+        self.assertPathIsFile(site_dir, 'untracked.html')
+        manifest.load()
+        self.assertNotIn('other/index.html', manifest.files)
+
+    @tempdir(files={'index.md': 'page content'})
+    @tempdir()
+    def test_build_failed_adds_outputs_to_manifest(self, site_dir, docs_dir):
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+
+        # The build fails once the output of 'a.md' has been written.
+        with open(os.path.join(docs_dir, 'a.md'), 'w') as f:
+            f.write('a content')
+        with open(os.path.join(docs_dir, 'z.md'), 'w') as f:
+            f.write('template: missing.html\n\nz content')
+        with self.assertRaises(TemplateNotFound), self.assertLogs('mkdocs', level='ERROR'):
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertPathIsFile(site_dir, 'a', 'index.html')
+        manifest = Manifest(site_dir)
+        manifest.load()
+        self.assertIn('a/index.html', manifest.files)
+
+        os.remove(os.path.join(docs_dir, 'a.md'))
+        os.remove(os.path.join(docs_dir, 'z.md'))
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir))
+        self.assertPathNotExists(site_dir, 'a')
+
+    @tempdir(files={'index.md': 'page content', 'extra.txt': 'extra'})
+    @tempdir()
+    def test_build_keeps_files_copied_by_plugin(self, site_dir, docs_dir):
+        class CopyPlugin(BasePlugin):
+            def on_post_build(self, config):
+                shutil.copy2(os.path.join(docs_dir, 'extra.txt'), os.path.join(site_dir, 'copied.txt'))
+
+        # A file which a plugin copies directly, keeping its mtime, to a new site_dir is kept.
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        cfg['plugins']['copy'] = CopyPlugin()
+        build.build(cfg)
+        self.assertPathIsFile(site_dir, 'copied.txt')
+
+        # Without a manifest, every file in the site_dir is listed. The copied file is kept as it is
+        # written again, while a file which is not is removed.
+        os.remove(os.path.join(site_dir, MANIFEST_FILENAME))
+        with open(os.path.join(site_dir, 'stale.txt'), 'w') as f:
+            f.write('stale')
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        cfg['plugins']['copy'] = CopyPlugin()
+        build.build(cfg)
+        self.assertPathIsFile(site_dir, 'copied.txt')
+        self.assertPathNotExists(site_dir, 'stale.txt')
+
+    @tempdir(files={'index.md': 'page content'})
+    @tempdir()
+    def test_build_timings(self, site_dir, docs_dir):
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir), timings=True)
+        spans = [s.name for s in instrument.get_root().children]
+        for name in ['get_files', 'add_files_from_theme', 'get_navigation', 'populate_pages', 'copy_static_files',
+                     'static_templates', 'extra_templates', 'build_pages', 'post_build']:
+            self.assertIn(name, spans)
+        build_pages = instrument.get_root().children[spans.index('build_pages')]
+        self.assertEqual([(s.name, s.detail) for s in build_pages.children], [('build_page', 'index.md')])
+        summary = [line for line in cm.output if 'Build timings:' in line]
+        self.assertEqual(len(summary), 1)
+        self.assertIn('populate_pages', summary[0])
+
+    @tempdir(files={'index.md': 'page content'})
+    @tempdir()
+    def test_build_timings_json(self, site_dir, docs_dir):
+        path = os.path.join(site_dir, 'timings.json')
+        build.build(load_config(docs_dir=docs_dir, site_dir=site_dir), timings_json=path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertIn('build_pages', [s['name'] for s in data['spans']])
+        self.assertIn(
+            {'plugin': 'search', 'event': 'page_context', 'calls': 1},
+            [{k: cost[k] for k in ('plugin', 'event', 'calls')} for cost in data['plugins']]
+        )
+
+    @tempdir(files={'index.md': '# Index\n\n[other](other.md)', 'other.md': '# Other'})
+    @tempdir()
+    def test_build_profile_markdown(self, site_dir, docs_dir):
+        path = os.path.join(site_dir, 'timings.json')
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, jobs=2)
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(cfg, timings_json=path, profile_markdown=True)
+        summary = [line for line in cm.output if 'Markdown processor timings:' in line]
+        self.assertEqual(len(summary), 1)
+        self.assertIn('treeprocessors.relpath (mkdocs.structure.pages)', summary[0])
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(sorted(data['markdown']['pages']), ['index.md', 'other.md'])
+        self.assertIn(
+            {'name': 'treeprocessors.inline (markdown.treeprocessors)', 'pages': 2},
+            [{k: item[k] for k in ('name', 'pages')} for item in data['markdown']['processors']]
+        )
+        # Profiling is only enabled for the build.
+        self.assertFalse(pages._profiling)
+
+    def _read_site(self, site_dir):
+        site = {}
+        for root, dirs, filenames in os.walk(site_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                with open(path, 'rb') as f:
+                    site[os.path.relpath(path, site_dir)] = f.read()
+        site.pop(build.DEPS_FILENAME, None)
+        site.pop(MANIFEST_FILENAME, None)
+        site.pop(search.ENTRIES_FILENAME, None)
+        return site
+
+    @tempdir(files={
+        'index.md': '# Home\n\n[foo](foo.md)',
+        'foo.md': 'Title: Foo Title\n\nfoo content',
+        'bar/baz.md': '# Baz\n\n[link](../missing.md)',
+    })
+    @tempdir()
+    @tempdir()
+    @mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'})
+    def test_build_streaming(self, site_dir, streamed_site_dir, docs_dir):
+        for jobs in (1, 2):
+            build.build(load_config(docs_dir=docs_dir, site_dir=site_dir, jobs=jobs))
+            build.build(load_config(docs_dir=docs_dir, site_dir=streamed_site_dir, jobs=jobs, streaming=True))
+            # The site is the same as one built in two phases, including the titles in the nav.
+            self.assertEqual(self._read_site(streamed_site_dir), self._read_site(site_dir))
+            self.assertIn(b'Foo Title', self._read_site(streamed_site_dir)['index.html'])
+            spans = [s.name for s in instrument.get_root().children]
+            self.assertIn('read_headers', spans)
+            self.assertNotIn('populate_pages', spans)
+
+    @tempdir(files={'index.md': '# Home\n\n[link](streamed.md)', 'foo.md': 'foo content'})
+    @tempdir()
+    def test_build_streaming_discards_content(self, site_dir, docs_dir):
+        class ContentPlugin(BasePlugin):
+            streaming_safe = True
+
+            def on_files(self, files, **kwargs):
+                self.files = files
+                self.built = []
+                return files
+
+            def on_post_page(self, output, page, **kwargs):
+                # Only the page being built has any content.
+                self.built.append([
+                    file.src_path for file in self.files.documentation_pages() if file.page.content is not None
+                ])
+                return output
+
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, streaming=True)
+        cfg['plugins']['content'] = plugin = ContentPlugin()
+        with self.assertLogs('mkdocs', level='WARNING') as cm:
+            build.build(cfg)
+        self.assertEqual(plugin.built, [['index.md'], ['foo.md']])
+        # Links to missing files are reported once all pages have been built.
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("'index.md': 'streamed.md'", cm.output[0])
+        for file in plugin.files.documentation_pages():
+            self.assertIsNone(file.page.markdown)
+            self.assertIsNone(file.page.content)
+            self.assertIsNotNone(file.page.title)
+
+    @tempdir(files={'index.md': '# Home', 'foo.md': 'foo content'})
+    @tempdir()
+    def test_build_streaming_unsafe_plugin(self, site_dir, docs_dir):
+        class UnsafePlugin(BasePlugin):
+            def on_page_content(self, html, **kwargs):
+                return html
+
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, streaming=True)
+        cfg['plugins']['unsafe'] = UnsafePlugin()
+        with self.assertLogs('mkdocs', level='INFO') as cm:
+            build.build(cfg)
+        self.assertIn(
+            "INFO:mkdocs.commands.build:Building pages in two phases as the following plugins are not "
+            "marked as safe to stream pages: unsafe",
+            cm.output
+        )
+        spans = [s.name for s in instrument.get_root().children]
+        self.assertIn('populate_pages', spans)
+        self.assertNotIn('read_headers', spans)
+
+    def test_get_template_deps(self):
+        cfg = load_config()
+        env = cfg['theme'].get_env()
+        templates = build._get_template_deps(env, 'main.html')
+        self.assertIn('main.html', templates)
+        self.assertIn('base.html', templates)
+        self.assertIn('toc.html', templates)
+        self.assertNotIn('404.html', templates)
+        self.assertEqual(templates, build._get_template_deps(env, 'main.html'))
+
+    def test_get_template_deps_missing(self):
+        cfg = load_config()
+        env = cfg['theme'].get_env()
+        self.assertEqual(build._get_template_deps(env, 'missing.html'), {'missing.html': None})
+
+    def _build_dirty(self, docs_dir, site_dir):
+        """ Perform a dirty build and return the pages which were written. """
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir)
+        with mock.patch('mkdocs.utils.write_file', wraps=utils.write_file) as mock_write_file:
+            build.build(cfg, dirty=True)
+        paths = [os.path.relpath(args[1], site_dir) for args, kwargs in mock_write_file.call_args_list]
+        return sorted(path for path in paths if path.endswith('index.html'))
+
+    @tempdir(files={
+        'index.md': '# Home\n\n[link](other.md)',
+        'other.md': '# Other',
+        'third.md': '# Third',
+    })
+    @tempdir()
+    def test_build_dirty(self, site_dir, docs_dir):
+        all_pages = ['index.html', os.path.join('other', 'index.html'), os.path.join('third', 'index.html')]
+
+        # Without a record of a previous build, every page is built.
+        self.assertEqual(self._build_dirty(docs_dir, site_dir), all_pages)
+        self.assertPathIsFile(site_dir, build.DEPS_FILENAME)
+
+        self.assertEqual(self._build_dirty(docs_dir, site_dir), [])
+
+        # Only a page whose content has changed is built again.
+        with open(os.path.join(docs_dir, 'other.md'), 'a', encoding='utf-8') as f:
+            f.write('\n\nMore content.')
+        self.assertEqual(self._build_dirty(docs_dir, site_dir), [os.path.join('other', 'index.html')])
+
+        # A new title changes the navigation of every page.
+        with open(os.path.join(docs_dir, 'third.md'), 'w', encoding='utf-8') as f:
+            f.write('# New Title')
+        self.assertEqual(self._build_dirty(docs_dir, site_dir), all_pages)
+
+        # Pages which link to a removed page are built again and the removed page's output is deleted.
+        os.remove(os.path.join(docs_dir, 'other.md'))
+        self.assertEqual(self._build_dirty(docs_dir, site_dir), ['index.html', os.path.join('third', 'index.html')])
+        self.assertPathNotExists(site_dir, 'other', 'index.html')
+        # The directory which held it is removed as it is left empty.
+        self.assertPathNotExists(site_dir, 'other')
+
+    @tempdir(files={'index.md': '# Home', 'img.png': 'image'})
+    @tempdir()
+    @tempdir()
+    def test_build_dirty_snapshot(self, site_dir, cache_dir, docs_dir):
+        cfg = load_config(docs_dir=docs_dir, site_dir=site_dir, cache=True, cache_dir=cache_dir)
+        src_path = os.path.join(docs_dir, 'img.png')
+        dest_path = os.path.join(site_dir, 'img.png')
+        build.build(cfg, dirty=True)
+        self.assertPathIsFile(dest_path)
+
+        # A file which is unchanged but has a new mtime (such as after a checkout) is not copied.
+        os.utime(src_path, (os.path.getmtime(dest_path) + 100,) * 2)
+        with mock.patch('mkdocs.utils.copy_file') as mock_copy_file:
+            build.build(cfg, dirty=True)
+        mock_copy_file.assert_not_called()
+
+        # A file which is changed is copied, even though its mtime is older than its output.
+        with open(src_path, 'w') as f:
+            f.write('IMAGE')
+        os.utime(src_path, (0, 0))
+        build.build(cfg, dirty=True)
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), 'IMAGE')
+
+    @tempdir(files={
+        'index.md': '# Home\n\n[link](other.md)',
+        'other.md': '# Other',
+    })
+    @tempdir()
+    @tempdir()
+    def test_build_dirty_matches_clean(self, clean_site_dir, dirty_site_dir, docs_dir):
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '0'}):
+            self._build_dirty(docs_dir, dirty_site_dir)
+            with open(os.path.join(docs_dir, 'other.md'), 'w', encoding='utf-8') as f:
+                f.write('# New Title')
+            self._build_dirty(docs_dir, dirty_site_dir)
+            build.build(load_config(docs_dir=docs_dir, site_dir=clean_site_dir))
+
+        for path in ['index.html', os.path.join('other', 'index.html')]:
+            with open(os.path.join(clean_site_dir, path), encoding='utf-8') as f:
+                clean_output = f.read()
+            with open(os.path.join(dirty_site_dir, path), encoding='utf-8') as f:
+                self.assertEqual(f.read(), clean_output)
+
     # Test build.site_directory_contains_stale_files
 
     @tempdir(files=['index.html'])
@@ -238,12 +238,17 @@ class CLITests(unittest.TestCase):
         args, kwargs = mock_build.call_args
         self.assertTrue('dirty' in kwargs)
         self.assertFalse(kwargs['dirty'])
+        self.assertFalse(kwargs['timings'])
+        self.assertIsNone(kwargs['timings_json'])
+        self.assertFalse(kwargs['profile_markdown'])
         mock_load_config.assert_called_once_with(
             config_file=None,
             strict=None,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
         logger = logging.getLogger('mkdocs')
         self.assertEqual(logger.level, logging.INFO)
@@ -274,6 +279,42 @@ class CLITests(unittest.TestCase):
         self.assertTrue('dirty' in kwargs)
         self.assertTrue(kwargs['dirty'])
 
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_timings(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--timings'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertTrue(kwargs['timings'])
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_timings_json(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--timings-json', 'timings.json'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertEqual(kwargs['timings_json'], 'timings.json')
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_profile_markdown(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--profile-markdown'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        args, kwargs = mock_build.call_args
+        self.assertTrue(kwargs['profile_markdown'])
+
     @mock.patch('mkdocs.config.load_config', autospec=True)
     @mock.patch('mkdocs.commands.build.build', autospec=True)
     def test_build_config_file(self, mock_build, mock_load_config):
@@ -303,7 +344,9 @@ class CLITests(unittest.TestCase):
             strict=True,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -320,7 +363,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme='readthedocs',
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -337,7 +382,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=True,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -354,7 +401,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=False,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -372,6 +421,46 @@ class CLITests(unittest.TestCase):
             theme=None,
             use_directory_urls=None,
             site_dir='custom',
+            jobs=None,
+            cache=None
+        )
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_jobs(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--jobs', '4'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        mock_load_config.assert_called_once_with(
+            config_file=None,
+            strict=None,
+            theme=None,
+            use_directory_urls=None,
+            site_dir=None,
+            jobs=4,
+            cache=None
+        )
+
+    @mock.patch('mkdocs.config.load_config', autospec=True)
+    @mock.patch('mkdocs.commands.build.build', autospec=True)
+    def test_build_no_cache(self, mock_build, mock_load_config):
+
+        result = self.runner.invoke(
+            cli.cli, ['build', '--no-cache'], catch_exceptions=False)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_build.call_count, 1)
+        mock_load_config.assert_called_once_with(
+            config_file=None,
+            strict=None,
+            theme=None,
+            use_directory_urls=None,
+            site_dir=None,
+            jobs=None,
+            cache=False
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -435,7 +524,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -519,7 +610,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -540,7 +633,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -593,7 +688,9 @@ class CLITests(unittest.TestCase):
             strict=True,
             theme=None,
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -614,7 +711,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme='readthedocs',
             use_directory_urls=None,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -635,7 +734,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=True,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -656,7 +757,9 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=False,
-            site_dir=None
+            site_dir=None,
+            jobs=None,
+            cache=None
         )
 
     @mock.patch('mkdocs.config.load_config', autospec=True)
@@ -677,5 +780,7 @@ class CLITests(unittest.TestCase):
             strict=None,
             theme=None,
             use_directory_urls=None,
-            site_dir='custom'
+            site_dir='custom',
+            jobs=None,
+            cache=None
         )
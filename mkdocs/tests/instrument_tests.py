@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mkdocs import instrument
+
+
+class InstrumentTests(unittest.TestCase):
+
+    def setUp(self):
+        instrument.reset()
+
+    def test_nested_spans(self):
+        with instrument.span('outer') as outer:
+            with instrument.span('inner', 'a.md'):
+                pass
+            with instrument.span('inner', 'b.md'):
+                pass
+        with instrument.span('other'):
+            pass
+        root = instrument.get_root()
+        self.assertEqual([s.name for s in root.children], ['outer', 'other'])
+        self.assertEqual([s.detail for s in outer.children], ['a.md', 'b.md'])
+        self.assertGreaterEqual(outer.duration, sum(s.duration for s in outer.children))
+
+    def test_span_error(self):
+        with self.assertRaises(ValueError):
+            with instrument.span('outer'):
+                raise ValueError()
+        with instrument.span('next'):
+            pass
+        self.assertEqual([s.name for s in instrument.get_root().children], ['outer', 'next'])
+
+    def test_spans_in_threads(self):
+        def work(i):
+            with instrument.span('thread', str(i)):
+                with instrument.span('inner'):
+                    pass
+
+        with instrument.span('outer'):
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(work, range(8)))
+        # Spans opened in other threads have no parent span.
+        spans = instrument.get_root().children
+        self.assertEqual(sorted(s.name for s in spans), ['outer'] + ['thread'] * 8)
+        self.assertTrue(all(len(s.children) == 1 for s in spans if s.name == 'thread'))
+
+    def test_record(self):
+        with instrument.span('outer') as outer:
+            instrument.record('page', 1.5, 'index.md')
+        self.assertEqual(outer.children[0].duration, 1.5)
+
+    def test_reset(self):
+        with instrument.span('outer'):
+            pass
+        root = instrument.reset()
+        self.assertIs(root, instrument.get_root())
+        self.assertEqual(root.children, [])
+
+    def test_get_summary(self):
+        with instrument.span('populate_pages'):
+            instrument.record('page', 1.0, 'index.md')
+            instrument.record('page', 3.0, 'about.md')
+        instrument.get_root().children[0].duration = 4.0
+        instrument.record('post_build', 1.0)
+        lines = instrument.get_summary(slowest=1).splitlines()
+        self.assertEqual(lines[1].split(), ['populate_pages', '1', '4.000', '80.0%'])
+        self.assertEqual(lines[2].split(), ['page', '2', '4.000', '80.0%'])
+        self.assertEqual(lines[3].split(), ['post_build', '1', '1.000', '20.0%'])
+        self.assertEqual(lines[-2:], ['Slowest:', '  {:<46} {:>7} {:>10.3f}'.format('about.md', 'page', 3.0)])
@@ -7,6 +7,7 @@ import os
 
 from mkdocs import plugins
 from mkdocs import config
+from mkdocs import utils
 from mkdocs.commands import build
 from mkdocs.exceptions import BuildError, PluginError
 from mkdocs.tests.base import load_config
@@ -146,6 +147,84 @@ class TestPluginCollection(unittest.TestCase):
         collection = plugins.PluginCollection()
         self.assertRaises(KeyError, collection.run_event, 'unknown', 'page content')
 
+    def test_get_parallel_unsafe(self):
+        class SafePlugin(plugins.BasePlugin):
+            parallel_safe = True
+
+            def on_page_markdown(self, markdown, **kwargs):
+                return markdown
+
+        class NavPlugin(plugins.BasePlugin):
+            def on_nav(self, nav, **kwargs):
+                return nav
+
+        collection = plugins.PluginCollection()
+        collection['foo'] = DummyPlugin()
+        collection['bar'] = SafePlugin()
+        collection['baz'] = NavPlugin()
+        self.assertEqual(collection.get_parallel_unsafe(), ['foo'])
+
+    def test_get_streaming_unsafe(self):
+        class SafePlugin(plugins.BasePlugin):
+            streaming_safe = True
+
+            def on_page_content(self, html, **kwargs):
+                return html
+
+        class NavPlugin(plugins.BasePlugin):
+            def on_nav(self, nav, **kwargs):
+                return nav
+
+        class PostBuildPlugin(plugins.BasePlugin):
+            def on_post_build(self, **kwargs):
+                pass
+
+        collection = plugins.PluginCollection()
+        collection['foo'] = DummyPlugin()
+        collection['bar'] = SafePlugin()
+        collection['baz'] = NavPlugin()
+        collection['qux'] = PostBuildPlugin()
+        self.assertEqual(collection.get_streaming_unsafe(), ['foo', 'qux'])
+
+    def test_run_event_producing(self):
+        producers = []
+
+        class ProducingPlugin(plugins.BasePlugin):
+            def on_post_build(self, **kwargs):
+                producers.append(utils.output_tracker._local.state)
+
+        collection = plugins.PluginCollection()
+        collection['foo'] = ProducingPlugin()
+        with utils.output_tracker.producing('template:main.html', 'index.md'):
+            collection.run_event('post_build')
+        self.assertEqual(producers, [('plugin:foo', 'index.md')])
+
+    def test_run_event_costs(self):
+
+        class SlowPlugin(plugins.BasePlugin):
+            def on_page_content(self, html, **kwargs):
+                return html
+
+            def on_post_build(self, **kwargs):
+                pass
+
+        collection = plugins.PluginCollection()
+        collection['foo'] = SlowPlugin()
+        collection.run_event('page_content', 'html')
+        collection.run_event('page_content', 'html')
+        collection.run_event('post_build')
+        collection.add_cost('foo', 'post_build', 5.0, calls=2)
+        costs = collection.get_costs()
+        self.assertEqual(
+            [(cost['plugin'], cost['event'], cost['calls']) for cost in costs],
+            [('foo', 'post_build', 3), ('foo', 'page_content', 2)]
+        )
+        self.assertGreaterEqual(costs[0]['time'], 5.0)
+        summary = collection.get_costs_summary()
+        self.assertIn('page_content', summary)
+        collection.reset_costs()
+        self.assertEqual(collection.get_costs(), [])
+
     def test_run_build_error_event(self):
         build_errors = []
 
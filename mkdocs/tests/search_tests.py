@@ -334,6 +334,47 @@ class SearchIndexTests(unittest.TestCase):
             self.assertEqual(strip_whitespace(index._entries[3]['text']), "Content3")
             self.assertEqual(index._entries[3]['location'], "{}#heading-3".format(loc))
 
+    def test_search_index_spill(self):
+        cfg = load_config()
+        page = Page('Home', File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']), cfg)
+        page.content = '<h1 id="heading-1">Heading 1</h1><p>Content 1</p>'
+        page.toc = get_toc(get_markdown_toc('# Heading 1'))
+
+        index = search_index.SearchIndex(prebuild_index=False)
+        index.add_entry_from_context(page)
+        expected = index.generate_search_index()
+
+        index = search_index.SearchIndex(prebuild_index=False)
+        index.spill()
+        index.add_entry_from_context(page)
+        self.assertEqual(index._entries, [])
+        spill_file = index._spill_file
+        self.assertEqual(index.generate_search_index(), expected)
+        # The file is closed once the entries have been read back.
+        self.assertTrue(spill_file.closed)
+        self.assertEqual(index.generate_search_index(), expected)
+
+        index = search_index.SearchIndex(prebuild_index=False)
+        index.spill()
+        spill_file = index._spill_file
+        index.close()
+        self.assertTrue(spill_file.closed)
+
+    def test_search_index_add_entries(self):
+        cfg = load_config()
+        page = Page('Home', File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']), cfg)
+        page.content = '<h1 id="heading-1">Heading 1</h1><p>Content 1</p>'
+        page.toc = get_toc(get_markdown_toc('# Heading 1'))
+
+        index = search_index.SearchIndex(prebuild_index=False)
+        entries = index.add_entry_from_context(page)
+        self.assertEqual(entries, index._entries)
+        self.assertEqual([entry['location'] for entry in entries], ['', '#heading-1'])
+
+        other = search_index.SearchIndex(prebuild_index=False)
+        other.add_entries(json.loads(json.dumps(entries)))
+        self.assertEqual(other.generate_search_index(), index.generate_search_index())
+
     @mock.patch('subprocess.Popen', autospec=True)
     def test_prebuild_index(self, mock_popen):
         # See https://stackoverflow.com/a/36501078/866026
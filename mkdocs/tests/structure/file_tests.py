@@ -1,8 +1,12 @@
 import unittest
 import os
+import pickle
+import tracemalloc
 from unittest import mock
 
-from mkdocs.structure.files import Files, File, get_files, _sort_files, _filter_paths
+from mkdocs import exceptions
+from mkdocs.structure.files import Files, File, get_files, _sort_files, _filter_paths, _compile_exclude
+from mkdocs.utils.cache import Cache
 from mkdocs.tests.base import load_config, tempdir, PathAssertionMixin
 
 
@@ -12,6 +16,62 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         file = File('a.md', '/path/to/docs', '/path/to/site', use_directory_urls=False)
         self.assertTrue(file == File('a.md', '/path/to/docs', '/path/to/site', use_directory_urls=False))
 
+    def test_file_assign_paths(self):
+        file = File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        self.assertPathsEqual(file.dest_path, 'foo/bar/index.html')
+        file.dest_path = 'foo/baz.html'
+        file.url = 'foo/baz.html'
+        # The absolute destination path is not changed by the new destination path
+        self.assertPathsEqual(file.abs_dest_path, '/path/to/site/foo/bar/index.html')
+        file.abs_src_path = '/other/bar.md'
+        file.abs_dest_path = '/other/site/baz.html'
+        self.assertPathsEqual(file.abs_src_path, '/other/bar.md')
+        self.assertPathsEqual(file.abs_dest_path, '/other/site/baz.html')
+        self.assertEqual(file.url, 'foo/baz.html')
+        self.assertEqual(file.name, 'bar')
+        # Plugins may add attributes of their own
+        file.extra = 'value'
+        self.assertEqual(file.extra, 'value')
+
+    def test_file_assign_src_path(self):
+        file = File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        file.src_path = 'virtual/page.md'
+        # The other properties are still those of the path the file was created with.
+        self.assertEqual(file.src_path, 'virtual/page.md')
+        self.assertPathsEqual(file.abs_src_path, '/path/to/docs/foo/bar.md')
+        self.assertPathsEqual(file.dest_path, 'foo/bar/index.html')
+        self.assertPathsEqual(file.abs_dest_path, '/path/to/site/foo/bar/index.html')
+        self.assertEqual(file.url, 'foo/bar/')
+        self.assertEqual(file.name, 'bar')
+
+        file = File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        file.use_directory_urls = False
+        file.dest_dir = '/other/site'
+        self.assertPathsEqual(file.abs_dest_path, '/path/to/site/foo/bar/index.html')
+        self.assertEqual(file.url, 'foo/bar/')
+
+    def test_file_pickle(self):
+        file = File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        file.dest_path = 'baz.html'
+        copy = pickle.loads(pickle.dumps(file))
+        self.assertEqual(copy, file)
+        self.assertEqual(copy.dest_path, 'baz.html')
+
+    def test_file_memory(self):
+        # The directories are not repeated in each file, however long they are.
+        src_dir = os.path.join(os.sep, 'path', 'to', 'docs' * 100)
+        dest_dir = os.path.join(os.sep, 'path', 'to', 'site' * 100)
+        paths = ['sub{}/file{}.md'.format(i // 100, i) for i in range(5000)]
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            files = [File(path, src_dir, dest_dir, use_directory_urls=True) for path in paths]
+            size = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(files), 5000)
+        self.assertLess(size / len(files), 400)
+
     def test_file_ne(self):
         file = File('a.md', '/path/to/docs', '/path/to/site', use_directory_urls=False)
         # Different filename
@@ -325,11 +385,12 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         files = Files(fs)
         self.assertEqual([f for f in files], fs)
         self.assertEqual(len(files), 6)
-        self.assertEqual(files.documentation_pages(), [fs[0], fs[1]])
-        self.assertEqual(files.static_pages(), [fs[2]])
-        self.assertEqual(files.media_files(), [fs[3], fs[4], fs[5]])
-        self.assertEqual(files.javascript_files(), [fs[4]])
-        self.assertEqual(files.css_files(), [fs[5]])
+        self.assertEqual(files.documentation_pages(), (fs[0], fs[1]))
+        self.assertIs(files.documentation_pages(), files.documentation_pages())
+        self.assertEqual(files.static_pages(), (fs[2],))
+        self.assertEqual(files.media_files(), (fs[3], fs[4], fs[5]))
+        self.assertEqual(files.javascript_files(), (fs[4],))
+        self.assertEqual(files.css_files(), (fs[5],))
         self.assertEqual(files.get_file_from_path('foo/bar.jpg'), fs[3])
         self.assertEqual(files.get_file_from_path('foo/bar.jpg'), fs[3])
         self.assertEqual(files.get_file_from_path('missing.jpg'), None)
@@ -340,7 +401,80 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         files.append(extra_file)
         self.assertEqual(len(files), 7)
         self.assertTrue(extra_file.src_path in files)
-        self.assertEqual(files.documentation_pages(), [fs[0], fs[1], extra_file])
+        self.assertEqual(files.documentation_pages(), (fs[0], fs[1], extra_file))
+
+    def test_files_remove(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.js', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(list(fs))
+        self.assertEqual(files.documentation_pages(), (fs[0], fs[1]))
+        files.remove(fs[1])
+        self.assertEqual(list(files), [fs[0], fs[2]])
+        self.assertFalse(fs[1].src_path in files)
+        self.assertEqual(files.documentation_pages(), (fs[0],))
+        self.assertEqual(files.get_files_by_extension('.md'), (fs[0],))
+        # An equal file which is not in the collection is not removed in its place.
+        other = File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        with self.assertRaises(ValueError):
+            files.remove(other)
+        self.assertEqual(files.documentation_pages(), (fs[0],))
+        files.remove(fs[2])
+        self.assertEqual(files.media_files(), ())
+        self.assertEqual(files.javascript_files(), ())
+
+    def test_files_get_file_from_url(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo bar.png', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(list(fs))
+        self.assertIs(files.get_file_from_url('.'), fs[0])
+        self.assertIs(files.get_file_from_url('/'), fs[0])
+        self.assertIs(files.get_file_from_url('foo/bar/'), fs[1])
+        self.assertIs(files.get_file_from_url('/foo/bar/'), fs[1])
+        self.assertIs(files.get_file_from_url('foo%20bar.png'), fs[2])
+        self.assertIs(files.get_file_from_url('foo bar.png'), fs[2])
+        self.assertIsNone(files.get_file_from_url('foo/bar.md'))
+        extra_file = File('extra.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        files.append(extra_file)
+        self.assertIs(files.get_file_from_url('extra/'), extra_file)
+        files.remove(extra_file)
+        self.assertIsNone(files.get_file_from_url('extra/'))
+
+    def test_files_get_file_from_dest(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.css', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(list(fs))
+        self.assertIs(files.get_file_from_dest('index.html'), fs[0])
+        self.assertIs(files.get_file_from_dest('foo/bar/index.html'), fs[1])
+        self.assertIs(files.get_file_from_dest('foo/bar.css'), fs[2])
+        self.assertIsNone(files.get_file_from_dest('foo/bar.md'))
+        extra_file = File('extra.md', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        files.append(extra_file)
+        self.assertIs(files.get_file_from_dest('extra/index.html'), extra_file)
+        files.remove(extra_file)
+        self.assertIsNone(files.get_file_from_dest('extra/index.html'))
+
+    def test_files_get_files_by_extension(self):
+        fs = [
+            File('index.md', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/bar.css', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+            File('foo/baz.css', '/path/to/docs', '/path/to/site', use_directory_urls=True),
+        ]
+        files = Files(list(fs))
+        self.assertEqual(files.get_files_by_extension('.css'), (fs[1], fs[2]))
+        self.assertEqual(files.get_files_by_extension('.png'), ())
+        extra_file = File('extra.png', '/path/to/docs', '/path/to/site', use_directory_urls=True)
+        files.append(extra_file)
+        self.assertEqual(files.get_files_by_extension('.png'), (extra_file,))
+        self.assertEqual(files.media_files(), (fs[1], fs[2], extra_file))
 
     @tempdir(files=[
         'favicon.ico',
@@ -376,6 +510,41 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
             os.path.normpath(os.path.join(ddir, 'favicon.ico'))
         )
 
+    @tempdir()
+    @tempdir(files=[
+        'style.css',
+        'css/theme.css',
+        'main.html',
+    ])
+    @tempdir(files=['index.md'])
+    def test_add_files_from_theme_cache(self, ddir, tdir, cache_dir):
+        config = load_config(docs_dir=ddir, theme={'name': None, 'custom_dir': tdir})
+        env = config['theme'].get_env()
+        cache = Cache(cache_dir, 1024 * 1024)
+        with mock.patch.object(config['theme'], 'get_dir_version', return_value='1.0'):
+            files = get_files(config)
+            files.add_files_from_theme(env, config, cache)
+            self.assertEqual(
+                [file.src_path for file in files],
+                ['index.md', 'css/theme.css', 'style.css']
+            )
+            # The dir is not walked again while the version is unchanged
+            with open(os.path.join(tdir, 'css', 'new.css'), 'w') as f:
+                f.write('')
+            files = get_files(config)
+            files.add_files_from_theme(env, config, cache)
+            self.assertEqual(
+                [file.src_path for file in files],
+                ['index.md', 'css/theme.css', 'style.css']
+            )
+        # A dir which is not provided by a package is always walked
+        files = get_files(config)
+        files.add_files_from_theme(env, config, cache)
+        self.assertEqual(
+            [file.src_path for file in files],
+            ['index.md', 'css/new.css', 'css/theme.css', 'style.css']
+        )
+
     def test_filter_paths(self):
         # Root level file
         self.assertFalse(_filter_paths('foo.md', 'foo.md', False, ['bar.md']))
@@ -404,6 +573,49 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertFalse(_filter_paths('bar', 'bar', False, ['bar/']))
         self.assertFalse(_filter_paths('bar', 'foo/bar', False, ['bar/']))
 
+    def test_compile_exclude(self):
+        exclude = _compile_exclude(['*.txt', '/drafts/', 'tmp/', 'foo/*.md', 'docs/**/*.bak', '!keep.txt'])
+        self.assertTrue(exclude('foo.txt'))
+        self.assertTrue(exclude('bar/foo.txt'))
+        self.assertFalse(exclude('keep.txt'))
+        self.assertFalse(exclude('bar/keep.txt'))
+        self.assertFalse(exclude('foo.md'))
+        # Directory patterns
+        self.assertTrue(exclude('drafts', is_dir=True))
+        self.assertFalse(exclude('drafts', is_dir=False))
+        self.assertFalse(exclude('bar/drafts', is_dir=True))
+        self.assertTrue(exclude('bar/tmp', is_dir=True))
+        # Patterns containing a slash are relative to the docs_dir, and `*` does not match a slash.
+        self.assertTrue(exclude('foo/bar.md'))
+        self.assertFalse(exclude('baz/foo/bar.md'))
+        self.assertFalse(exclude('foo/baz/bar.md'))
+        # `**` matches any number of directories.
+        self.assertTrue(exclude('docs/a.bak'))
+        self.assertTrue(exclude('docs/a/b/c.bak'))
+        # The last matching pattern wins.
+        exclude = _compile_exclude(['!keep.txt', '*.txt'])
+        self.assertTrue(exclude('keep.txt'))
+        self.assertFalse(_compile_exclude([])('foo.md'))
+
+    @tempdir(files=[
+        'index.md',
+        'foo.md',
+        'notes.txt',
+        'keep.txt',
+        'drafts/draft.md',
+        'drafts/keep.md',
+        'api/index.md',
+        'api/drafts/other.md',
+    ])
+    def test_get_files_exclude_docs(self, tdir):
+        config = load_config(docs_dir=tdir, exclude_docs=['*.txt', '!keep.txt', '/drafts/', '!/drafts/keep.md'])
+        files = get_files(config)
+        # Files in an excluded directory cannot be included again.
+        self.assertEqual(
+            [f.src_path for f in files],
+            ['index.md', 'foo.md', 'keep.txt'] + [os.path.normpath(p) for p in ('api/index.md', 'api/drafts/other.md')]
+        )
+
     def test_get_relative_url_use_directory_urls(self):
         to_files = [
             'index.md',
@@ -674,3 +886,35 @@ class TestFiles(PathAssertionMixin, unittest.TestCase):
         self.assertPathIsFile(dest_path)
         with open(dest_path, 'r', encoding='utf-8') as f:
             self.assertEqual(f.read(), 'destination content')
+
+    @tempdir()
+    @tempdir(files={
+        'index.md': 'page content',
+        'a/b/c.png': 'c',
+        'a/d.css': 'd',
+        'e.html': 'e',
+    })
+    def test_copy_static_files(self, src_dir, dest_dir):
+        files = Files([
+            File(path, src_dir, dest_dir, use_directory_urls=False)
+            for path in ['index.md', 'a/b/c.png', 'a/d.css', 'e.html']
+        ])
+        files.copy_static_files(max_workers=2)
+        for path in ['a/b/c.png', 'a/d.css', 'e.html']:
+            self.assertPathIsFile(dest_dir, path)
+        self.assertPathNotExists(dest_dir, 'index.html')
+
+    @tempdir()
+    @tempdir(files={'a.png': 'a', 'c.png': 'c'})
+    def test_copy_static_files_errors(self, src_dir, dest_dir):
+        files = Files([
+            File(path, src_dir, dest_dir, use_directory_urls=False) for path in ['a.png', 'b.png', 'c.png']
+        ])
+        with self.assertLogs('mkdocs', level='ERROR') as cm:
+            with self.assertRaises(exceptions.BuildError):
+                files.copy_static_files()
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("Error copying static file 'b.png'", cm.output[0])
+        # The other files are still copied.
+        self.assertPathIsFile(dest_dir, 'a.png')
+        self.assertPathIsFile(dest_dir, 'c.png')
@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 
 import sys
+import threading
 import unittest
 
 from mkdocs.structure.nav import get_navigation, _get_by_type, Section
 from mkdocs.structure.files import File, Files
-from mkdocs.structure.pages import Page
+from mkdocs.structure.pages import Page, activate
 from mkdocs.tests.base import dedent, load_config
 
 
@@ -378,6 +379,42 @@ class SiteNavigationTests(unittest.TestCase):
         self.assertFalse(site_navigation.items[1].children[3].active)
         self.assertFalse(site_navigation.items[1].active)
 
+    def test_activate(self):
+        nav_cfg = [
+            {'Home': 'index.md'},
+            {'API Guide': [
+                {'Running': 'api-guide/running.md'},
+                {'Advanced': [
+                    {'Part 1': 'api-guide/advanced/part-1.md'},
+                ]},
+            ]},
+        ]
+        cfg = load_config(nav=nav_cfg, site_url='http://example.com/')
+        files = Files([
+            File('index.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+            File('api-guide/running.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+            File('api-guide/advanced/part-1.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls']),
+        ])
+        site_navigation = get_navigation(files, cfg)
+        page = site_navigation.items[1].children[1].children[0]
+        seen_by_thread = []
+        with activate((page, *page.ancestors)):
+            # Confirm page and ancestors are active
+            self.assertTrue(page.active)
+            self.assertTrue(site_navigation.items[1].children[1].active)
+            self.assertTrue(site_navigation.items[1].active)
+            # Confirm non-ancestors are not activated
+            self.assertFalse(site_navigation.items[0].active)
+            self.assertFalse(site_navigation.items[1].children[0].active)
+            # Confirm the state is not shared with other threads
+            thread = threading.Thread(target=lambda: seen_by_thread.append(page.active))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen_by_thread, [False])
+        # Confirm nothing is active outside of the context
+        self.assertTrue(all(page.active is False for page in site_navigation.pages))
+        self.assertTrue(all(item.active is False for item in site_navigation.items))
+
     def test_get_by_type_nested_sections(self):
         nav_cfg = [
             {'Section 1': [
@@ -1,12 +1,20 @@
 import unittest
 import os
 import sys
+import threading
 from unittest import mock
+
+import markdown
 from tempfile import TemporaryDirectory
 
-from mkdocs.structure.pages import Page
+from mkdocs.structure.pages import (
+    Page, _get_link_url, get_missing_links, get_missing_links_report, get_processor_times,
+    get_processor_times_summary, profile_markdown
+)
 from mkdocs.structure.files import File, Files
 from mkdocs.tests.base import load_config, dedent
+from mkdocs.utils.cache import Cache
+from mkdocs.utils.prefetch import Prefetcher
 
 
 class PageTests(unittest.TestCase):
@@ -346,6 +354,63 @@ class PageTests(unittest.TestCase):
         self.assertEqual(pg.title, 'Page title')
         self.assertEqual(pg.toc, [])
 
+    def test_page_defer_render(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo'
+        render = mock.Mock(side_effect=lambda: pg.render(cfg, Files([fl])))
+        pg.defer_render(render)
+        self.assertEqual(pg.markdown, '# Foo')
+        render.assert_not_called()
+        # The page is rendered when its content or toc is first accessed, and only once.
+        self.assertEqual(pg.content, '<h1 id="foo">Foo</h1>')
+        self.assertEqual([item.title for item in pg.toc], ['Foo'])
+        render.assert_called_once_with()
+
+        pg.defer_render(render)
+        self.assertEqual([item.title for item in pg.toc], ['Foo'])
+        self.assertEqual(render.call_count, 2)
+
+        # A content which is set takes the place of the deferred rendering.
+        pg.defer_render(render)
+        pg.content = 'Bar'
+        self.assertEqual(pg.content, 'Bar')
+        self.assertEqual(render.call_count, 2)
+
+    def test_page_read_source_prefetched(self):
+        cfg = load_config(docs_dir=self.DOCS_DIR)
+        fl = File('metadata.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        other = File('page-title.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        with Prefetcher([fl.abs_src_path]) as prefetcher:
+            with mock.patch.object(prefetcher, 'read_text', wraps=prefetcher.read_text) as mock_read_text:
+                pg = Page(None, fl, cfg)
+                pg.read_source(cfg, prefetcher)
+                # A page which was not prefetched is read from its file.
+                other_pg = Page(None, other, cfg)
+                other_pg.read_source(cfg, prefetcher)
+        self.assertEqual(mock_read_text.call_count, 2)
+        self.assertEqual(pg.title, 'A Page Title')
+        self.assertTrue(pg.markdown.startswith('# Welcome to MkDocs\n'))
+        self.assertTrue(other_pg.markdown.startswith('Page content.\n'))
+
+    def test_page_read_header(self):
+        cfg = load_config(docs_dir=self.DOCS_DIR)
+        for src_path, title, data in [
+            ('metadata.md', 'A Page Title', {'title': 'A Page Title'}),
+            ('page-title.md', 'Page title', {}),
+        ]:
+            fl = File(src_path, cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+            pg = Page(None, fl, cfg)
+            pg.read_header(cfg)
+            self.assertEqual(pg.title, title)
+            self.assertEqual(pg.meta, data)
+            # The source is left to be read by `read_source`.
+            self.assertEqual(pg.markdown, None)
+            pg.read_source(cfg)
+            self.assertEqual(pg.title, title)
+            self.assertEqual(pg.meta, data)
+
     def test_page_title_from_capitalized_filename(self):
         cfg = load_config(docs_dir=self.DOCS_DIR)
         fl = File('pageTitle.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
@@ -661,12 +726,198 @@ class PageTests(unittest.TestCase):
                 Project layout - #project-layout
         """))
 
+    def test_page_render_cache(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        with TemporaryDirectory() as cache_dir:
+            cache = Cache(cache_dir, 1024 * 1024)
+            pg = Page('Foo', fl, cfg)
+            pg.read_source(cfg)
+            pg.render(cfg, Files([fl]), cache)
+            content, toc = pg.content, str(pg.toc)
+
+            pg = Page('Foo', fl, cfg)
+            pg.read_source(cfg)
+            with mock.patch('mkdocs.structure.pages.markdown.Markdown') as mock_md:
+                pg.render(cfg, Files([fl]), cache)
+            mock_md.assert_not_called()
+            self.assertEqual(pg.content, content)
+            self.assertEqual(str(pg.toc), toc)
+
+            pg.markdown += '\nMore content.'
+            pg.render(cfg, Files([fl]), cache)
+            self.assertNotEqual(pg.content, content)
+
+    def test_page_render_key_versions(self):
+        cfg = load_config(markdown_extensions=['toc', 'codehilite'])
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo'
+        key = pg._get_render_key(cfg)
+        # Upgrading an extension package, or Pygments, invalidates the cached output.
+        with mock.patch('mkdocs.structure.pages.get_markdown_extension_version', return_value='99.0'):
+            self.assertNotEqual(pg._get_render_key(cfg), key)
+        with mock.patch('mkdocs.structure.pages.get_pygments_version', return_value='99.0'):
+            self.assertNotEqual(pg._get_render_key(cfg), key)
+        self.assertEqual(pg._get_render_key(cfg), key)
+
+    def test_page_render_key_extension_instance(self):
+        from markdown.extensions.admonition import AdmonitionExtension
+        cfg = load_config()
+        # Plugins may add extension instances, rather than names, in their `config` event.
+        cfg['markdown_extensions'].append(AdmonitionExtension())
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo'
+        key = pg._get_render_key(cfg)
+        cfg['markdown_extensions'][-1] = AdmonitionExtension()
+        self.assertEqual(pg._get_render_key(cfg), key)
+
+    def test_page_release(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        pg = Page('Foo', fl, cfg)
+        pg.read_source(cfg)
+        pg.render(cfg, Files([fl]))
+        markdown, content = pg.markdown, pg.content
+        with TemporaryDirectory() as spill_dir:
+            pg.release(spill_dir)
+            self.assertIsNone(pg._markdown)
+            self.assertIsNone(pg._content)
+            self.assertEqual(pg.markdown, markdown)
+            self.assertEqual(pg.content, content)
+            # Reading a released value does not keep it in memory.
+            self.assertIsNone(pg._content)
+            pg.content = '<p>new</p>'
+            self.assertEqual(pg.content, '<p>new</p>')
+        self.assertEqual(pg.content, '<p>new</p>')
+
+    def test_page_render_cache_link_changed(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        other = File('other.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        with TemporaryDirectory() as cache_dir:
+            cache = Cache(cache_dir, 1024 * 1024)
+            pg = Page('Foo', fl, cfg)
+            pg.markdown = '[link](other.md)'
+            pg.render(cfg, Files([fl, other]), cache)
+            self.assertEqual(pg.content, '<p><a href="../other/">link</a></p>')
+
+            # The cached output is not used once the link target is removed.
+            pg.render(cfg, Files([fl]), cache)
+            self.assertEqual(pg.content, '<p><a href="other.md">link</a></p>')
+            self.assertEqual(pg._links, [('other.md', None)])
+
+            # The missing link is recorded again when the cached output is used.
+            pg._links = []
+            with mock.patch('mkdocs.structure.pages._get_converter') as mock_get_converter:
+                pg.render(cfg, Files([fl]), cache)
+            mock_get_converter.assert_not_called()
+            self.assertEqual(pg.content, '<p><a href="other.md">link</a></p>')
+            self.assertEqual(pg._links, [['other.md', None]])
+
     def test_missing_page(self):
         cfg = load_config()
         fl = File('missing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
         pg = Page('Foo', fl, cfg)
         self.assertRaises(OSError, pg.read_source, cfg)
 
+    def test_page_render_reuses_converter(self):
+        cfg = load_config(markdown_extensions=['toc', 'abbr'])
+        toc_cfg = load_config(markdown_extensions=['toc'])
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        other = File('other.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        files = Files([fl, other])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo\n\n*[HTML]: Hyper Text Markup Language\n\nHTML [other](other.md)'
+        with mock.patch('markdown.Markdown', wraps=markdown.Markdown) as mock_markdown, \
+                mock.patch('mkdocs.structure.pages._converter', threading.local()):
+            pg.render(cfg, files)
+            self.assertEqual(
+                pg.content,
+                '<h1 id="foo">Foo</h1>\n'
+                '<p><abbr title="Hyper Text Markup Language">HTML</abbr> <a href="../other/">other</a></p>'
+            )
+            self.assertEqual(pg._links, [('other.md', '../other/')])
+
+            # The abbreviation and links of the previous page are not carried over.
+            other_pg = Page('Other', other, cfg)
+            other_pg.markdown = '# Other\n\nHTML'
+            other_pg.render(cfg, files)
+            self.assertEqual(other_pg.content, '<h1 id="other">Other</h1>\n<p>HTML</p>')
+            self.assertEqual(other_pg._links, [])
+            self.assertEqual([item.id for item in other_pg.toc], ['other'])
+            self.assertEqual(mock_markdown.call_count, 1)
+
+            # A converter is created for a different set of extensions.
+            pg.render(toc_cfg, files)
+            self.assertEqual(mock_markdown.call_count, 2)
+
+    def test_page_render_profile_markdown(self):
+        cfg = load_config(markdown_extensions=['toc', 'abbr'])
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        other = File('other.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        files = Files([fl, other])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo\n\n*[HTML]: Hyper Text Markup Language\n\nHTML *em* [other](other.md)'
+        other_pg = Page('Other', other, cfg)
+        other_pg.markdown = '# Other'
+        with mock.patch('mkdocs.structure.pages._converter', threading.local()):
+            pg.render(cfg, files)
+            self.assertIsNone(pg._processor_times)
+            profile_markdown()
+            try:
+                pg.render(cfg, files)
+                other_pg.render(cfg, files)
+            finally:
+                profile_markdown(False)
+            # The output is not changed by profiling.
+            self.assertEqual(
+                pg.content,
+                '<h1 id="foo">Foo</h1>\n'
+                '<p><abbr title="Hyper Text Markup Language">HTML</abbr> <em>em</em> <a href="../other/">other</a></p>'
+            )
+
+        labels = set(pg._processor_times)
+        for label in [
+            'preprocessors.normalize_whitespace (markdown.preprocessors)',
+            'blockprocessors.abbr (markdown.extensions.abbr)',
+            'blockprocessors.hashheader (markdown.blockprocessors)',
+            'treeprocessors.inline (markdown.treeprocessors)',
+            'treeprocessors.toc (markdown.extensions.toc)',
+            'treeprocessors.relpath (mkdocs.structure.pages)',
+            'inlinepatterns.em_strong (markdown.inlinepatterns)',
+            'inlinepatterns.link (markdown.inlinepatterns)',
+            'postprocessors.raw_html (markdown.postprocessors)',
+        ]:
+            self.assertIn(label, labels)
+        self.assertTrue(all(seconds >= 0 for seconds in pg._processor_times.values()))
+        # The times of one page are not carried over to the next.
+        self.assertNotIn('inlinepatterns.link (markdown.inlinepatterns)', other_pg._processor_times)
+
+        times = {label: (count, seconds) for label, count, seconds in get_processor_times([pg, other_pg])}
+        self.assertEqual(times['treeprocessors.inline (markdown.treeprocessors)'][0], 2)
+        self.assertEqual(times['inlinepatterns.link (markdown.inlinepatterns)'][0], 1)
+        summary = get_processor_times_summary([pg, other_pg], slowest=1)
+        self.assertIn('Slowest pages:', summary)
+        self.assertEqual(summary.count('.md'), 1)
+
+    def test_profile_markdown_bypasses_cache(self):
+        cfg = load_config()
+        fl = File('testing.md', cfg['docs_dir'], cfg['site_dir'], cfg['use_directory_urls'])
+        files = Files([fl])
+        pg = Page('Foo', fl, cfg)
+        pg.markdown = '# Foo'
+        with TemporaryDirectory() as cache_dir:
+            cache = Cache(cache_dir, 1024 * 1024)
+            pg.render(cfg, files, cache)
+            profile_markdown()
+            try:
+                pg.render(cfg, files, cache)
+            finally:
+                profile_markdown(False)
+        self.assertIn('treeprocessors.toc (markdown.extensions.toc)', pg._processor_times)
+
 
 class SourceDateEpochTests(unittest.TestCase):
 
@@ -699,6 +950,7 @@ class RelativePathExtensionTests(unittest.TestCase):
         pg = Page('Foo', fs[0], cfg)
         pg.read_source(cfg)
         pg.render(cfg, Files(fs))
+        self.page = pg
         return pg.content
 
     @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[link](non-index.md)'))
@@ -729,6 +981,14 @@ class RelativePathExtensionTests(unittest.TestCase):
             '<p><a href="sub2/non-index/">link</a></p>'  # No trailing /
         )
 
+    @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[link](sub2/index.html)'))
+    def test_relative_html_link_dest_path(self):
+        # A link to the output of a page is not resolved, as only source files are linked to.
+        self.assertEqual(
+            self.get_rendered_result(['index.md', 'sub2/index.md']),
+            '<p><a href="sub2/index.html">link</a></p>'
+        )
+
     @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[link](file%20name.md)'))
     def test_relative_html_link_with_encoded_space(self):
         self.assertEqual(
@@ -808,15 +1068,30 @@ class RelativePathExtensionTests(unittest.TestCase):
 
     @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[link](non-existant.md)'))
     def test_bad_relative_html_link(self):
-        with self.assertLogs('mkdocs', level='WARNING') as cm:
+        self.assertEqual(
+            self.get_rendered_result(['index.md']),
+            '<p><a href="non-existant.md">link</a></p>'
+        )
+        # Links to missing files are recorded for the build to report.
+        self.assertEqual(self.page._links, [('non-existant.md', None)])
+        self.assertEqual(get_missing_links([self.page]), {'index.md': ['non-existant.md']})
+
+    @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[a](non-index.md) [b](non-index.md)'))
+    def test_relative_html_link_resolved_once(self):
+        with mock.patch('mkdocs.structure.pages._get_link_url', wraps=_get_link_url) as mock_get_link_url:
             self.assertEqual(
-                self.get_rendered_result(['index.md']),
-                '<p><a href="non-existant.md">link</a></p>'
+                self.get_rendered_result(['index.md', 'non-index.md']),
+                '<p><a href="non-index/">a</a> <a href="non-index/">b</a></p>'
             )
+        self.assertEqual(mock_get_link_url.call_count, 1)
+        self.assertEqual(self.page._links, [('non-index.md', 'non-index/'), ('non-index.md', 'non-index/')])
+
+    def test_missing_links_report(self):
         self.assertEqual(
-            cm.output,
-            ["WARNING:mkdocs.structure.pages:Documentation file 'index.md' contains a link "
-             "to 'non-existant.md' which is not found in the documentation files."]
+            get_missing_links_report({'index.md': ['a.md', 'b.png'], 'sub/page.md': ['sub/c.md']}),
+            "Documentation files contain links to files which are not found in the documentation files:\n"
+            "  - 'index.md': 'a.md', 'b.png'\n"
+            "  - 'sub/page.md': 'sub/c.md'"
         )
 
     @mock.patch('mkdocs.structure.pages.open', mock.mock_open(read_data='[external](http://example.com/index.md)'))
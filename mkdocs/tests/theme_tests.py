@@ -57,6 +57,16 @@ class ThemeTests(unittest.TestCase):
             [custom, mkdocs_templates_dir]
         )
 
+    def test_get_dir_version(self):
+        custom = tempfile.mkdtemp()
+        theme = Theme(name='mkdocs', custom_dir=custom)
+        self.assertEqual(theme.get_dir_version(os.path.join(theme_dir, 'mkdocs')), mkdocs.__version__)
+        self.assertEqual(theme.get_dir_version(mkdocs_templates_dir), mkdocs.__version__)
+        # Dirs added by the plugins provided by MkDocs
+        search_dir = os.path.join(mkdocs_dir, 'contrib', 'search', 'templates')
+        self.assertEqual(theme.get_dir_version(search_dir), mkdocs.__version__)
+        self.assertIsNone(theme.get_dir_version(custom))
+
     def static_templates(self):
         theme = Theme(name='mkdocs', static_templates='foo.html')
         self.assertEqual(
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+
+import os
+import unittest
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.cache import Cache, get_key
+
+
+class CacheTests(unittest.TestCase):
+
+    def test_get_key(self):
+        self.assertEqual(get_key('a', {'b': 1, 'c': 2}), get_key('a', {'c': 2, 'b': 1}))
+        self.assertNotEqual(get_key('a', 'b'), get_key('a', 'c'))
+        self.assertEqual(len(get_key('a')), 64)
+
+    def test_get_key_callable(self):
+        self.assertEqual(get_key({'slugify': get_key}), get_key({'slugify': get_key}))
+        self.assertNotEqual(get_key({'slugify': get_key}), get_key({'slugify': Cache}))
+
+    def test_get_key_markdown_extension(self):
+        from markdown.extensions.toc import TocExtension
+        self.assertEqual(get_key([TocExtension(permalink=True)]), get_key([TocExtension(permalink=True)]))
+        self.assertNotEqual(get_key([TocExtension(permalink=True)]), get_key([TocExtension()]))
+
+    @tempdir()
+    def test_set_get(self, cache_dir):
+        cache = Cache(cache_dir, 1024)
+        self.assertIsNone(cache.get('ab12'))
+        cache.set('ab12', {'content': '<p>foo</p>'})
+        self.assertEqual(cache.get('ab12'), {'content': '<p>foo</p>'})
+        self.assertTrue(os.path.isfile(os.path.join(cache_dir, 'ab', 'ab12.json')))
+
+    @tempdir()
+    def test_get_invalid_entry(self, cache_dir):
+        os.mkdir(os.path.join(cache_dir, 'ab'))
+        with open(os.path.join(cache_dir, 'ab', 'ab12.json'), 'w') as f:
+            f.write('{"content": ')
+        cache = Cache(cache_dir, 1024)
+        self.assertIsNone(cache.get('ab12'))
+
+    @tempdir()
+    def test_prune(self, cache_dir):
+        cache = Cache(cache_dir, 100)
+        for i, key in enumerate(['aa', 'bb', 'cc']):
+            cache.set(key, 'x' * 40)
+            os.utime(cache._get_path(key), (i, i))
+        # Using an entry makes it the most recently used.
+        cache.get('aa')
+        cache.prune()
+        self.assertEqual(cache.get('aa'), 'x' * 40)
+        self.assertIsNone(cache.get('bb'))
+        self.assertEqual(cache.get('cc'), 'x' * 40)
+
+    @tempdir()
+    def test_prune_within_size(self, cache_dir):
+        cache = Cache(cache_dir, 1024)
+        cache.set('aa', 'x' * 40)
+        cache.set('bb', 'x' * 40)
+        cache.prune()
+        self.assertIsNotNone(cache.get('aa'))
+        self.assertIsNotNone(cache.get('bb'))
+
+    def test_prune_missing_dir(self):
+        cache = Cache(os.path.join('missing', 'cache'), 0)
+        cache.prune()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+
+import os
+import unittest
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.deps import DependencyGraph
+
+
+class DependencyGraphTests(unittest.TestCase):
+
+    @tempdir(files=['foo.html'])
+    def test_is_changed(self, site_dir):
+        path = os.path.join(site_dir, 'deps.json')
+        graph = DependencyGraph(path, 'key')
+        self.assertTrue(graph.is_changed('foo.md', 'foo.html', {'content': 'a'}))
+        graph.add('foo.md', 'foo.html', {'content': 'a'})
+        graph.add('bar.md', 'bar.html', {'content': 'b'})
+        graph.save()
+
+        graph = DependencyGraph(path, 'key')
+        self.assertTrue(graph.load())
+        self.assertFalse(graph.is_changed('foo.md', 'foo.html', {'content': 'a'}))
+        self.assertTrue(graph.is_changed('foo.md', 'foo.html', {'content': 'b'}))
+        self.assertTrue(graph.is_changed('foo.md', 'foo/index.html', {'content': 'a'}))
+        # The output of bar.md does not exist.
+        self.assertTrue(graph.is_changed('bar.md', 'bar.html', {'content': 'b'}))
+
+    @tempdir()
+    def test_load_other_build_key(self, site_dir):
+        path = os.path.join(site_dir, 'deps.json')
+        graph = DependencyGraph(path, 'key')
+        graph.add('foo.md', 'foo.html', {})
+        graph.save()
+
+        graph = DependencyGraph(path, 'other key')
+        self.assertFalse(graph.load())
+        self.assertEqual(graph.previous, {})
+
+    @tempdir(files={'deps.json': '{"build": '})
+    def test_load_invalid(self, site_dir):
+        graph = DependencyGraph(os.path.join(site_dir, 'deps.json'), 'key')
+        self.assertFalse(graph.load())
+
+    @tempdir()
+    def test_load_missing(self, site_dir):
+        graph = DependencyGraph(os.path.join(site_dir, 'deps.json'), 'key')
+        self.assertFalse(graph.load())
+
+    @tempdir()
+    def test_get_removed(self, site_dir):
+        path = os.path.join(site_dir, 'deps.json')
+        graph = DependencyGraph(path, 'key')
+        graph.add('foo.md', 'foo.html', {})
+        graph.add('bar.md', 'bar.html', {})
+        graph.save()
+
+        graph = DependencyGraph(path, 'key')
+        graph.load()
+        self.assertEqual(graph.get_removed(['foo.md']), [os.path.join(site_dir, 'bar.html')])
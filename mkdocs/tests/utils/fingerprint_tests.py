@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+
+import hashlib
+import json
+import os
+import unittest
+
+from mkdocs import utils
+from mkdocs.structure.files import File, Files
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.fingerprint import Fingerprints, MAPPING_FILENAME, get_fingerprinted_path
+
+
+def _hash(content):
+    return hashlib.sha256(content).hexdigest()[:8]
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def test_get_fingerprinted_path(self):
+        self.assertEqual(get_fingerprinted_path('css/base.css', 'abcdef0123456789'), 'css/base.abcdef01.css')
+        self.assertEqual(get_fingerprinted_path('js/a.min.js', 'abcdef0123456789'), 'js/a.min.abcdef01.js')
+
+    @tempdir()
+    @tempdir(files={
+        'index.md': 'page',
+        'css/base.css': (
+            "@font-face { src: url('../fonts/a.woff?v=1'); }\n"
+            "body { background: url(../img/bg.png) url(data:image/png;base64,AAAA) url(/abs.png) url(missing.png); }"
+        ),
+        'fonts/a.woff': 'font',
+        'img/bg.png': 'image',
+        'page.html': 'static page',
+    })
+    def test_fingerprints(self, docs_dir, site_dir):
+        files = Files([
+            File(path, docs_dir, site_dir, use_directory_urls=True)
+            for path in ['index.md', 'css/base.css', 'fonts/a.woff', 'img/bg.png', 'page.html']
+        ])
+        fingerprints = Fingerprints(site_dir)
+        fingerprints.add_files(files)
+
+        font = 'fonts/a.{}.woff'.format(_hash(b'font'))
+        image = 'img/bg.{}.png'.format(_hash(b'image'))
+        css = (
+            "@font-face {{ src: url('../{}?v=1'); }}\n"
+            "body {{ background: url(../{}) url(data:image/png;base64,AAAA) url(/abs.png) url(missing.png); }}"
+        ).format(font, image).encode('utf-8')
+        self.assertEqual(fingerprints.urls, {
+            'fonts/a.woff': font,
+            'img/bg.png': image,
+            'css/base.css': 'css/base.{}.css'.format(_hash(css)),
+        })
+
+        utils.output_tracker.reset()
+        fingerprints.write()
+        with open(os.path.join(site_dir, 'css', 'base.{}.css'.format(_hash(css))), 'rb') as f:
+            self.assertEqual(f.read(), css)
+        self.assertTrue(os.path.isfile(os.path.join(site_dir, *font.split('/'))))
+        self.assertTrue(os.path.isfile(os.path.join(site_dir, *image.split('/'))))
+        with open(os.path.join(site_dir, MAPPING_FILENAME), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), fingerprints.urls)
+        self.assertEqual(
+            {record['producer'] for record in utils.output_tracker.files.values()}, {'fingerprint'}
+        )
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+
+import os
+import unittest
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.manifest import Manifest, get_file_hash
+
+
+class ManifestTests(unittest.TestCase):
+
+    @tempdir(files={'index.html': 'content', 'img/foo.png': 'image'})
+    def test_update(self, site_dir):
+        manifest = Manifest(site_dir)
+        self.assertFalse(manifest.load())
+        manifest.update({
+            os.path.join(site_dir, 'index.html'): {
+                'source': 'index.md', 'producer': 'template:main.html', 'hash': 'abc'
+            },
+            os.path.join(site_dir, 'img', 'foo.png'): {'source': 'img/foo.png', 'producer': 'copy', 'hash': None},
+            os.path.join(site_dir, 'missing.html'): {'source': None, 'producer': None, 'hash': None},
+        }, complete=True)
+
+        manifest = Manifest(site_dir)
+        self.assertTrue(manifest.load())
+        self.assertTrue(manifest.complete)
+        self.assertEqual(sorted(manifest.files), ['img/foo.png', 'index.html'])
+        self.assertEqual(manifest.files['index.html']['hash'], 'abc')
+        self.assertEqual(manifest.files['index.html']['source'], 'index.md')
+        self.assertEqual(manifest.files['index.html']['producer'], 'template:main.html')
+        image_hash = get_file_hash(os.path.join(site_dir, 'img', 'foo.png'))
+        self.assertEqual(manifest.files['img/foo.png']['hash'], image_hash)
+        self.assertEqual(manifest.files['img/foo.png']['size'], 5)
+        self.assertEqual(
+            sorted(manifest.get_paths()),
+            [os.path.join(site_dir, 'img', 'foo.png'), os.path.join(site_dir, 'index.html')]
+        )
+
+    @tempdir(files={'index.html': 'content', 'other.html': 'content'})
+    def test_update_incomplete(self, site_dir):
+        manifest = Manifest(site_dir)
+        manifest.update({os.path.join(site_dir, 'index.html'): {}}, complete=True)
+        manifest.update({os.path.join(site_dir, 'other.html'): {}}, complete=False)
+        self.assertEqual(sorted(manifest.files), ['index.html', 'other.html'])
+        self.assertTrue(manifest.complete)
+        manifest.update({os.path.join(site_dir, 'other.html'): {}}, complete=True)
+        self.assertEqual(sorted(manifest.files), ['other.html'])
+
+    @tempdir(files={'index.html': 'content'})
+    def test_update_reuses_hash(self, site_dir):
+        manifest = Manifest(site_dir)
+        manifest.update({os.path.join(site_dir, 'index.html'): {'hash': 'abc'}}, complete=True)
+        # The file is not hashed again while its size and mtime are unchanged.
+        manifest.update({os.path.join(site_dir, 'index.html'): {'hash': None}}, complete=True)
+        self.assertEqual(manifest.files['index.html']['hash'], 'abc')
+
+    @tempdir(files={'.mkdocs-manifest.json': '{"files": '})
+    def test_load_invalid(self, site_dir):
+        manifest = Manifest(site_dir)
+        self.assertFalse(manifest.load())
+        self.assertFalse(manifest.complete)
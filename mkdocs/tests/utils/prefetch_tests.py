@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+
+import os
+import unittest
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.prefetch import Prefetcher
+
+
+class PrefetcherTests(unittest.TestCase):
+
+    @tempdir(files={'a.md': 'aaaaaa', 'b.md': 'bbbbbb', 'c.md': 'cccccc'})
+    def test_read(self, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md', 'c.md')]
+        with Prefetcher(paths, max_size=10) as prefetcher:
+            # Only the first file fits while it is held.
+            prefetcher._futures[0].result()
+            self.assertFalse(prefetcher._futures[1].done())
+            self.assertEqual(prefetcher.held, 6)
+
+            self.assertEqual(prefetcher.read(paths[0]), b'aaaaaa')
+            self.assertEqual(prefetcher.read(paths[1]), b'bbbbbb')
+            self.assertEqual(prefetcher.read(paths[2]), b'cccccc')
+            self.assertEqual(prefetcher.held, 0)
+            # Each file is only given once.
+            self.assertIsNone(prefetcher.read(paths[0]))
+            self.assertIsNone(prefetcher.read(os.path.join(docs_dir, 'other.md')))
+
+    @tempdir(files={'a.md': 'a' * 100, 'b.md': 'b'})
+    def test_read_larger_than_max_size(self, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md')]
+        with Prefetcher(paths, max_size=10) as prefetcher:
+            self.assertEqual(prefetcher.read(paths[0]), b'a' * 100)
+            self.assertEqual(prefetcher.read(paths[1]), b'b')
+
+    @tempdir(files={'a.md': 'aaaaaa', 'b.md': 'bbbbbb', 'c.md': 'cccccc'})
+    def test_read_out_of_order(self, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md', 'c.md')]
+        with Prefetcher(paths, max_size=10) as prefetcher:
+            # The files which are passed over are released, so that the later file can be read.
+            self.assertEqual(prefetcher.read(paths[2]), b'cccccc')
+            self.assertIsNone(prefetcher.read(paths[0]))
+            self.assertEqual(prefetcher.held, 0)
+
+    @tempdir(files={'a.md': 'a'})
+    def test_read_missing(self, docs_dir):
+        paths = [os.path.join(docs_dir, 'missing.md'), os.path.join(docs_dir, 'a.md')]
+        with Prefetcher(paths) as prefetcher:
+            self.assertIsNone(prefetcher.read(paths[0]))
+            self.assertEqual(prefetcher.read(paths[1]), b'a')
+
+    @tempdir()
+    def test_read_text(self, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md')]
+        with open(paths[0], 'wb') as f:
+            f.write(b'\xef\xbb\xbf# A\r\n\r\nText\rMore')
+        with open(paths[1], 'wb') as f:
+            f.write(b'\xff')
+        with Prefetcher(paths) as prefetcher:
+            with open(paths[0], 'r', encoding='utf-8-sig') as f:
+                self.assertEqual(prefetcher.read_text(paths[0]), f.read())
+            self.assertRaises(ValueError, prefetcher.read_text, paths[1])
+
+    @tempdir(files={'a.md': 'aaaaaa', 'b.md': 'bbbbbb'})
+    def test_close(self, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md')]
+        prefetcher = Prefetcher(paths, max_size=10)
+        prefetcher._futures[0].result()
+        prefetcher.close()
+        self.assertEqual(prefetcher.held, 0)
+        self.assertIsNone(prefetcher.read(paths[0]))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+
+import os
+import unittest
+from unittest import mock
+
+from mkdocs.tests.base import tempdir
+from mkdocs.utils.snapshot import Snapshot
+
+
+class SnapshotTests(unittest.TestCase):
+
+    @tempdir(files={'a.md': 'a', 'b.md': 'b', 'c.md': 'c'})
+    @tempdir()
+    def test_scan(self, cache_dir, docs_dir):
+        paths = [os.path.join(docs_dir, name) for name in ('a.md', 'b.md', 'c.md')]
+        snapshot = Snapshot(cache_dir, '/path/to/site')
+        self.assertFalse(snapshot.load())
+        snapshot.scan(paths)
+        self.assertEqual(snapshot.added, set(paths))
+        self.assertTrue(snapshot.is_changed(paths[0]))
+        snapshot.save()
+
+        # Unchanged content with a new mtime (such as after a checkout)
+        os.utime(paths[0], (0, 0))
+        # Changed content
+        with open(paths[1], 'w') as f:
+            f.write('changed')
+        os.remove(paths[2])
+        new_path = os.path.join(docs_dir, 'd.md')
+        with open(new_path, 'w') as f:
+            f.write('d')
+
+        snapshot = Snapshot(cache_dir, '/path/to/site')
+        self.assertTrue(snapshot.load())
+        snapshot.scan(paths[:2] + [new_path])
+        self.assertEqual(snapshot.added, {new_path})
+        self.assertEqual(snapshot.changed, {paths[1]})
+        self.assertEqual(snapshot.removed, {paths[2]})
+        self.assertFalse(snapshot.is_changed(paths[0]))
+        self.assertTrue(snapshot.is_changed(paths[1]))
+        self.assertTrue(snapshot.is_changed(new_path))
+        self.assertTrue(snapshot.is_changed(paths[2]))
+
+    @tempdir(files={'a.md': 'a'})
+    @tempdir()
+    def test_scan_hashes_changed_files(self, cache_dir, docs_dir):
+        path = os.path.join(docs_dir, 'a.md')
+        snapshot = Snapshot(cache_dir, '/path/to/site')
+        snapshot.scan([path])
+        snapshot.save()
+
+        snapshot = Snapshot(cache_dir, '/path/to/site')
+        snapshot.load()
+        with mock.patch('mkdocs.utils.snapshot.get_file_hash') as get_file_hash:
+            snapshot.scan([path])
+        get_file_hash.assert_not_called()
+
+        os.utime(path, (0, 0))
+        with mock.patch('mkdocs.utils.snapshot.get_file_hash', return_value='abc') as get_file_hash:
+            snapshot.scan([path])
+        get_file_hash.assert_called_once_with(path)
+
+    @tempdir(files={'a.md': 'a'})
+    @tempdir()
+    def test_site_dirs(self, cache_dir, docs_dir):
+        snapshot = Snapshot(cache_dir, '/path/to/site')
+        snapshot.scan([os.path.join(docs_dir, 'a.md')])
+        snapshot.save()
+        self.assertFalse(Snapshot(cache_dir, '/path/to/other').load())
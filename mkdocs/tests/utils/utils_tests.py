@@ -2,6 +2,7 @@
 
 
 from unittest import mock
+import io
 import os
 import unittest
 import tempfile
@@ -12,7 +13,7 @@ import datetime
 from mkdocs import utils, exceptions
 from mkdocs.structure.files import File
 from mkdocs.structure.pages import Page
-from mkdocs.tests.base import dedent, load_config
+from mkdocs.tests.base import dedent, load_config, tempdir
 
 
 class UtilsTests(unittest.TestCase):
@@ -60,6 +61,13 @@ class UtilsTests(unittest.TestCase):
             is_html = utils.is_html_file(path)
             self.assertEqual(is_html, expected_result)
 
+    def test_normalize_url_asset_urls(self):
+        with mock.patch.dict(utils.asset_urls, {'css/base.css': 'css/base.abcdef01.css'}):
+            self.assertEqual(utils.normalize_url('css/base.css', base='..'), '../css/base.abcdef01.css')
+            self.assertEqual(utils.create_media_urls(['css/base.css', 'css/other.css'], base='..'), [
+                '../css/base.abcdef01.css', '../css/other.css'
+            ])
+
     def test_create_media_urls(self):
 
         expected_results = {
@@ -188,6 +196,20 @@ class UtilsTests(unittest.TestCase):
             [1, 2, 3, 4, 5, 6, 7, 8]
         )
 
+    def test_get_markdown_extension_version(self):
+        import markdown
+        import yaml
+        # By the name of a registered extension, by module, and by the top level module of a package.
+        self.assertEqual(utils.get_markdown_extension_version('toc'), markdown.__version__)
+        self.assertEqual(
+            utils.get_markdown_extension_version('markdown.extensions.toc:TocExtension'), markdown.__version__
+        )
+        self.assertEqual(utils.get_markdown_extension_version('yaml.extension'), yaml.__version__)
+        self.assertIsNone(utils.get_markdown_extension_version('missing_package.extension'))
+        # Extension instances added by plugins.
+        from markdown.extensions.admonition import AdmonitionExtension
+        self.assertEqual(utils.get_markdown_extension_version(AdmonitionExtension()), markdown.__version__)
+
     def test_get_themes(self):
 
         self.assertEqual(
@@ -395,6 +417,140 @@ class UtilsTests(unittest.TestCase):
             shutil.rmtree(src_dir)
             shutil.rmtree(dst_dir)
 
+    @tempdir(files={'src.txt': 'content'})
+    @tempdir()
+    def test_copy_file_mtime(self, dst_dir, src_dir):
+        utils.output_tracker.reset()
+        src = os.path.join(src_dir, 'src.txt')
+        dst = os.path.join(dst_dir, 'dst.txt')
+        os.utime(src, (0, 100))
+        utils.copy_file(src, dst)
+        self.assertEqual(os.path.getmtime(dst), 100)
+        # A copy of the same size and mtime is not compared with its source
+        with mock.patch('filecmp.cmp') as cmp:
+            utils.copy_file(src, dst)
+        cmp.assert_not_called()
+        self.assertEqual((utils.output_tracker.written, utils.output_tracker.skipped), (1, 1))
+
+    def test_get_peak_memory(self):
+        peak = utils.get_peak_memory()
+        if peak is not None:
+            self.assertGreater(peak, 1024 * 1024)
+
+    @tempdir(files={'src.txt': 'content'})
+    @tempdir(files={'dst.txt': 'content', 'other.txt': 'old content'})
+    def test_copy_file_unchanged(self, dst_dir, src_dir):
+        utils.output_tracker.reset()
+        dst = os.path.join(dst_dir, 'dst.txt')
+        os.utime(dst, (0, 0))
+        utils.copy_file(os.path.join(src_dir, 'src.txt'), dst)
+        self.assertEqual(os.path.getmtime(dst), 0)
+
+        other = os.path.join(dst_dir, 'other.txt')
+        utils.copy_file(os.path.join(src_dir, 'src.txt'), other)
+        with open(other) as f:
+            self.assertEqual(f.read(), 'content')
+        self.assertEqual((utils.output_tracker.written, utils.output_tracker.skipped), (1, 1))
+        self.assertEqual(utils.output_tracker.paths, {dst, other})
+
+    @tempdir(files={'src.txt': 'content'})
+    @tempdir()
+    def test_copy_file_hardlink(self, dst_dir, src_dir):
+        src = os.path.join(src_dir, 'src.txt')
+        dst = os.path.join(dst_dir, 'dst.txt')
+        utils.output_tracker.reset()
+        utils.copy_file(src, dst, mode='hardlink')
+        self.assertTrue(os.path.samefile(src, dst))
+        utils.copy_file(src, dst, mode='hardlink')
+        self.assertEqual((utils.output_tracker.written, utils.output_tracker.skipped), (1, 1))
+
+        # Writing to the output replaces the link rather than modifying the source.
+        utils.write_file(b'new content', dst)
+        with open(src) as f:
+            self.assertEqual(f.read(), 'content')
+        self.assertFalse(os.path.samefile(src, dst))
+
+    @tempdir(files={'src.txt': 'content'})
+    @tempdir()
+    def test_copy_file_symlink(self, dst_dir, src_dir):
+        src = os.path.join(src_dir, 'src.txt')
+        dst = os.path.join(dst_dir, 'dst.txt')
+        utils.output_tracker.reset()
+        with mock.patch('os.symlink', side_effect=OSError('symlinks not permitted')) as mock_symlink:
+            with mock.patch.object(utils, '_copy_fallbacks', set()), self.assertLogs('mkdocs.utils', level='INFO'):
+                utils.copy_file(src, dst, mode='symlink')
+            mock_symlink.assert_called_once()
+        # The file was copied instead.
+        self.assertFalse(os.path.islink(dst))
+        with open(dst) as f:
+            self.assertEqual(f.read(), 'content')
+
+        try:
+            utils.copy_file(src, dst, mode='symlink')
+        except NotImplementedError:  # pragma: no cover
+            self.skipTest('Symlinks are not supported')
+        if not os.path.islink(dst):  # pragma: no cover
+            self.skipTest('Symlinks are not supported')
+        self.assertEqual(os.readlink(dst), os.path.abspath(src))
+
+        # Changing the mode back to copy replaces the link rather than writing through it.
+        utils.copy_file(src, dst)
+        self.assertFalse(os.path.islink(dst))
+        with open(dst) as f:
+            self.assertEqual(f.read(), 'content')
+
+    @tempdir(files={'src.txt': 'content'})
+    @tempdir()
+    def test_copy_file_reflink(self, dst_dir, src_dir):
+        src = os.path.join(src_dir, 'src.txt')
+        dst = os.path.join(dst_dir, 'dst.txt')
+        # The file is cloned where supported, or copied otherwise.
+        utils.copy_file(src, dst, mode='reflink')
+        self.assertFalse(os.path.samefile(src, dst))
+        with open(dst) as f:
+            self.assertEqual(f.read(), 'content')
+
+    @tempdir(files={'foo.txt': 'content', 'bar.txt': 'old content'})
+    def test_write_file_unchanged(self, dst_dir):
+        utils.output_tracker.reset()
+        foo = os.path.join(dst_dir, 'foo.txt')
+        os.utime(foo, (0, 0))
+        utils.write_file(b'content', foo)
+        self.assertEqual(os.path.getmtime(foo), 0)
+
+        bar = os.path.join(dst_dir, 'bar.txt')
+        utils.write_file(b'new content', bar)
+        with open(bar) as f:
+            self.assertEqual(f.read(), 'new content')
+        utils.write_file(b'content', os.path.join(dst_dir, 'baz', 'baz.txt'))
+        self.assertEqual((utils.output_tracker.written, utils.output_tracker.skipped), (2, 1))
+
+    @tempdir(files=['keep.html', 'stale.html', 'sub/stale.html', 'changed.html', '.hidden', '.git/stale'])
+    def test_remove_stale_files(self, site_dir):
+        listing = utils.list_files(site_dir)
+        self.assertEqual(
+            sorted(os.path.relpath(path, site_dir).replace(os.sep, '/') for path in listing),
+            ['changed.html', 'keep.html', 'stale.html', 'sub/stale.html']
+        )
+        # Files which are output after the listing, or changed since, are not removed.
+        utils.write_file(b'new', os.path.join(site_dir, 'new', 'new.html'))
+        with open(os.path.join(site_dir, 'changed.html'), 'w') as f:
+            f.write('changed')
+        removed = utils.remove_stale_files(site_dir, [os.path.join(site_dir, 'keep.html')], listing)
+        self.assertEqual(removed, 2)
+        self.assertEqual(
+            sorted(os.path.relpath(os.path.join(dirpath, name), site_dir).replace(os.sep, '/')
+                   for dirpath, dirnames, filenames in os.walk(site_dir) for name in filenames),
+            ['.git/stale', '.hidden', 'changed.html', 'keep.html', 'new/new.html']
+        )
+        self.assertFalse(os.path.exists(os.path.join(site_dir, 'sub')))
+
+    @tempdir(files=['listed.html', 'other.html'])
+    def test_list_files_paths(self, site_dir):
+        paths = [os.path.join(site_dir, 'listed.html'), os.path.join(site_dir, 'missing.html')]
+        self.assertEqual(list(utils.list_files(site_dir, paths)), [paths[0]])
+        self.assertEqual(utils.list_files(os.path.join(site_dir, 'missing')), {})
+
     def test_mm_meta_data(self):
         doc = dedent(
             """
@@ -482,3 +638,66 @@ class UtilsTests(unittest.TestCase):
             """
         )
         self.assertEqual(utils.meta.get_data(doc), (doc, {}))
+
+    def test_yaml_meta_data_unclosed(self):
+        doc = '---\nTitle: Title\n\n# Doc body\n'
+        self.assertEqual(utils.meta.get_data(doc), (doc, {}))
+
+    def test_mmd_meta_data_line_endings(self):
+        doc = 'Title: Title\r\nTags: a\r\n    b\r\n\r\nDoc\rbody'
+        self.assertEqual(utils.meta.get_data(doc), ('Doc\nbody', {'title': 'Title', 'tags': 'a b'}))
+
+    def test_get_header(self):
+        doc = dedent(
+            """
+            ---
+            Title: Meta Title
+            ---
+
+            # Doc Title
+
+            Doc body
+            """
+        )
+        self.assertEqual(
+            utils.meta.get_header(doc),
+            ('# Doc Title\n\nDoc body', {'Title': 'Meta Title'}, 'Doc Title')
+        )
+        self.assertEqual(utils.meta.get_header('Title: Meta\n\nDoc body'), ('Doc body', {'title': 'Meta'}, None))
+
+    def test_get_header_scans_header(self):
+        # Only the lines of the header are read, however long the document is.
+        doc = 'Title: Title\n\n# Doc Title\n' + 'Doc body\n' * 100000
+        lines = []
+
+        def iter_lines(doc, pos=0):
+            for line in meta_iter_lines(doc, pos):
+                lines.append(line)
+                yield line
+
+        meta_iter_lines = utils.meta._iter_lines
+        with mock.patch('mkdocs.utils.meta._iter_lines', iter_lines):
+            body, data, title = utils.meta.get_header(doc)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual((data, title), ({'title': 'Title'}, 'Doc Title'))
+        self.assertEqual(len(body), len(doc) - len('Title: Title\n\n'))
+
+    def test_read_header(self):
+        docs = [
+            ('---\ntitle: Foo\n---\n\n# Bar\n\nBody\n', ({'title': 'Foo'}, 'Bar')),
+            ('Title: Foo\nAuthors: A\n    B\n\n# Bar\n', ({'title': 'Foo', 'authors': 'A B'}, 'Bar')),
+            ('\n\n# Bar\r\n\r\nBody', ({}, 'Bar')),
+            ('---\ntitle: Foo\n\n# Bar\n', ({}, None)),
+            ('Body\n# Bar\n', ({}, None)),
+            ('', ({}, None)),
+        ]
+        for doc, expected in docs:
+            # Chunks which end within the header are extended until the header is complete.
+            for size in (1, 3, 4096):
+                self.assertEqual(utils.meta.read_header(io.StringIO(doc), size), expected)
+
+    def test_read_header_reads_header(self):
+        # Only the start of the file is read, however long the document is.
+        f = io.StringIO('Title: Title\n\n# Doc Title\n' + 'Doc body\n' * 100000)
+        self.assertEqual(utils.meta.read_header(f, 8), ({'title': 'Title'}, 'Doc Title'))
+        self.assertLessEqual(f.tell(), 64)
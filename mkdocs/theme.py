@@ -2,7 +2,7 @@ import os
 import jinja2
 import logging
 
-from mkdocs import utils
+from mkdocs import __version__, utils
 from mkdocs.utils import filters
 from mkdocs.config.base import ValidationError
 
@@ -29,6 +29,8 @@ class Theme:
     def __init__(self, name=None, **user_config):
         self.name = name
         self._vars = {}
+        # The version of the package which provides each theme dir.
+        self._dir_versions = {}
 
         # MkDocs provided static templates are always included
         package_dir = os.path.abspath(os.path.dirname(__file__))
@@ -46,6 +48,7 @@ class Theme:
 
         # Include templates provided directly by MkDocs (outside any theme)
         self.dirs.append(mkdocs_templates)
+        self._dir_versions[mkdocs_templates] = __version__
 
         # Handle remaining user configs. Override theme configs (if set)
         self.static_templates.update(user_config.pop('static_templates', []))
@@ -69,11 +72,25 @@ class Theme:
     def __iter__(self):
         return iter(self._vars)
 
+    def get_dir_version(self, dir):
+        """
+        Return the version of the installed package which provides a theme dir, or `None` if the
+        dir is not provided by a package (such as the `custom_dir`).
+        """
+        if dir in self._dir_versions:
+            return self._dir_versions[dir]
+        # Dirs added by the plugins which are provided by MkDocs (such as search).
+        package_dir = os.path.abspath(os.path.dirname(__file__))
+        if os.path.abspath(dir).startswith(package_dir + os.sep):
+            return __version__
+        return None
+
     def _load_theme_config(self, name):
         """ Recursively load theme and any parent themes. """
 
         theme_dir = utils.get_theme_dir(name)
         self.dirs.append(theme_dir)
+        self._dir_versions[theme_dir] = utils.get_theme_version(name)
 
         try:
             file_path = os.path.join(theme_dir, 'mkdocs_theme.yml')
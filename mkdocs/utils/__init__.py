@@ -6,20 +6,34 @@ and structure of the site and pages in the site.
 """
 
 
+import errno
 import logging
 import os
+import filecmp
+import hashlib
+import threading
 import pkg_resources
 import shutil
 import re
+import sys
 import yaml
 import fnmatch
 import posixpath
 import functools
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 from yaml_env_tag import construct_env_tag
 
 from mkdocs import exceptions
+from mkdocs.utils import meta
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows.
+    fcntl = resource = None
 
 log = logging.getLogger(__name__)
 
@@ -131,29 +145,150 @@ def reduce_list(data_set):
             item not in seen and not seen.add(item)]
 
 
-def copy_file(source_path, output_path):
+def get_peak_memory():
+    """ Return the peak resident memory of the current process in bytes, or `None` if it is unknown. """
+    if resource is None:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS reports bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _is_unchanged(output_path, content=None, source_path=None):
+    """ Return True if output_path already holds the given content or a copy of source_path. """
+    try:
+        output_stat = os.stat(output_path)
+        if content is not None:
+            if output_stat.st_size != len(content):
+                return False
+            with open(output_path, 'rb') as f:
+                return f.read() == content
+        source_stat = os.stat(source_path)
+        if output_stat.st_size != source_stat.st_size:
+            return False
+        # Copies are given the modification time of their source, so a matching time means that
+        # the output has not changed since it was copied, and the content need not be compared.
+        if output_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return True
+        return filecmp.cmp(source_path, output_path, shallow=False)
+    except OSError:
+        return False
+
+
+# The ways in which `copy_file` can materialize a file in the output.
+COPY_MODES = ('copy', 'hardlink', 'reflink', 'symlink')
+
+# The `FICLONE` ioctl, which clones a file on filesystems with copy-on-write support.
+_FICLONE = 0x40049409
+
+# The copy modes which have fallen back to copying, so that the fallback is only reported once.
+_copy_fallbacks = set()
+
+
+def _is_linked(path):
+    """ Return True if path is a symlink or a hard link, so writing to it could modify another file. """
+    try:
+        return os.path.islink(path) or os.stat(path).st_nlink > 1
+    except OSError:
+        return False
+
+
+def _is_linked_to(source_path, output_path, mode):
+    """ Return True if output_path is already a link to source_path of the given mode. """
+    try:
+        if mode == 'symlink':
+            return os.path.islink(output_path) and os.readlink(output_path) == os.path.abspath(source_path)
+        return os.path.samefile(source_path, output_path)
+    except OSError:
+        return False
+
+
+def _reflink(source_path, output_path):
+    """ Clone source_path to output_path, sharing their data until either is modified. """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, 'Reflinks are not supported on this platform')
+    with open(source_path, 'rb') as src, open(output_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+def _link_file(source_path, output_path, mode):
+    """ Create output_path from source_path using the given mode, other than `copy`. """
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    if mode == 'hardlink':
+        os.link(source_path, output_path)
+    elif mode == 'symlink':
+        os.symlink(os.path.abspath(source_path), output_path)
+    else:
+        _reflink(source_path, output_path)
+
+
+def copy_file(source_path, output_path, mode='copy', makedirs=True):
     """
     Copy source_path to output_path, making sure any parent directories exist.
 
-    The output_path may be a directory.
-    """
-    output_dir = os.path.dirname(output_path)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    if os.path.isdir(output_path):
-        output_path = os.path.join(output_path, os.path.basename(source_path))
+    The output_path may be a directory. An existing output_path with the same
+    content is left untouched, so that its modification time is preserved. A
+    copy is given the modification time of source_path, so that an unchanged
+    copy is recognised by its size and modification time alone.
+
+    If makedirs is false, the parent directory of output_path must already
+    exist and output_path must not be a directory.
+
+    The mode is one of `COPY_MODES`. Rather than copying the file, `hardlink`
+    and `symlink` link output_path to source_path, and `reflink` clones it on
+    filesystems with copy-on-write support. If the mode is not supported for
+    the file, it is copied instead.
+    """
+    if makedirs:
+        output_dir = os.path.dirname(output_path)
+        os.makedirs(output_dir, exist_ok=True)
+        if os.path.isdir(output_path):
+            output_path = os.path.join(output_path, os.path.basename(source_path))
+    if mode in ('hardlink', 'symlink'):
+        unchanged = _is_linked_to(source_path, output_path, mode)
+    else:
+        # A link left by another mode is replaced, so that writing to it cannot modify the source.
+        unchanged = not _is_linked(output_path) and _is_unchanged(output_path, source_path=source_path)
+    if unchanged:
+        output_tracker.add(output_path, written=False)
+        return
+    if mode != 'copy':
+        try:
+            _link_file(source_path, output_path, mode)
+            output_tracker.add(output_path, written=True)
+            return
+        except (OSError, NotImplementedError) as e:
+            if mode not in _copy_fallbacks:
+                _copy_fallbacks.add(mode)
+                log.info("Copying files as the '{}' static_copy_mode is not supported: {}".format(mode, e))
+    if _is_linked(output_path):
+        os.remove(output_path)
     shutil.copyfile(source_path, output_path)
+    st = os.stat(source_path)
+    os.utime(output_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    output_tracker.add(output_path, written=True)
 
 
 def write_file(content, output_path):
     """
     Write content to output_path, making sure any parent directories exist.
+
+    An existing output_path with the same content is left untouched, so that
+    its modification time is preserved.
     """
     output_dir = os.path.dirname(output_path)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    content_hash = hashlib.sha256(content).hexdigest()
+    if _is_unchanged(output_path, content=content):
+        output_tracker.add(output_path, written=False, content_hash=content_hash)
+        return
+    if _is_linked(output_path):
+        # Don't write through a link to a source file.
+        os.remove(output_path)
     with open(output_path, 'wb') as f:
         f.write(content)
+    output_tracker.add(output_path, written=True, content_hash=content_hash)
 
 
 def clean_directory(directory):
@@ -177,6 +312,95 @@ def clean_directory(directory):
             os.unlink(path)
 
 
+def list_files(directory, paths=None):
+    """
+    Return a dict of the absolute path of each file in a directory to the state
+    of the file, for `remove_stale_files` to tell whether it is changed later.
+
+    If a list of `paths` is given, only those which exist are listed. Otherwise
+    every file in the directory is, except that, as with `clean_directory`,
+    hidden entries at the top of the directory are not listed.
+    """
+    if not os.path.exists(directory):
+        return {}
+
+    directory = os.path.abspath(directory)
+    if paths is None:
+        paths = _walk_files(directory)
+    files = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        try:
+            files[path] = _get_file_state(path)
+        except OSError:
+            continue
+    return files
+
+
+def _get_file_state(path):
+    # The change time is updated by any write to the file, even one which keeps its
+    # modification time (such as `shutil.copy2`).
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+
+
+def remove_stale_files(directory, keep, listing):
+    """
+    Remove the files of a `listing` (as returned by `list_files` before a build)
+    which are not in `keep` and have not been changed since they were listed,
+    and any directories of `directory` left empty.
+
+    Only files which existed before the build are removed, so files which are
+    output by other means (such as by a plugin copying them directly) are never
+    removed by the build which output them. Return the number of files removed.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    removed = []
+    for path, state in listing.items():
+        try:
+            if path in keep or _get_file_state(path) != state:
+                continue
+            log.debug("Removing stale file: '{}'".format(path))
+            os.unlink(path)
+        except OSError:
+            continue
+        removed.append(path)
+    remove_empty_dirs(directory, removed)
+    return len(removed)
+
+
+def remove_empty_dirs(directory, paths):
+    """
+    Remove the directories containing each of `paths` which are empty, and any of
+    their parents left empty, up to (but not including) `directory`.
+    """
+    directory = os.path.abspath(directory)
+    dirs = set()
+    for path in paths:
+        parent = os.path.dirname(os.path.abspath(path))
+        while parent.startswith(directory + os.sep) and parent not in dirs:
+            dirs.add(parent)
+            parent = os.path.dirname(parent)
+
+    # Remove the deepest directories first, so that their parents may be empty.
+    for path in sorted(dirs, key=len, reverse=True):
+        try:
+            if not os.listdir(path):
+                os.rmdir(path)
+        except OSError:
+            continue
+
+
+def _walk_files(directory):
+    """ Yield the path of every file in a directory, except hidden entries at the top of the directory. """
+    for dirpath, dirnames, filenames in os.walk(directory):
+        if dirpath == directory:
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            filenames = [name for name in filenames if not name.startswith('.')]
+        for filename in filenames:
+            yield os.path.join(dirpath, filename)
+
+
 def get_html_path(path):
     """
     Map a source file path to an output html path.
@@ -265,7 +489,7 @@ def get_relative_url(url, other):
 
 def normalize_url(path, page=None, base=''):
     """ Return a URL relative to the given page or using the base. """
-    path, is_abs = _get_norm_url(path)
+    path, is_abs = _get_norm_url(asset_urls.get(path, path))
     if is_abs:
         return path
     if page is not None:
@@ -311,6 +535,48 @@ def get_theme_dir(name):
     return os.path.dirname(os.path.abspath(theme.load().__file__))
 
 
+def get_theme_version(name):
+    """ Return the version of the Python package which provides an installed theme. """
+
+    return get_themes()[name].dist.version
+
+
+def get_markdown_extension_version(name):
+    """
+    Return the version of the Python package which provides the Markdown extension `name` (as given
+    in the `markdown_extensions` setting, which may also hold `markdown.Extension` instances added
+    by plugins), or `None` if the package can not be found.
+    """
+
+    if not isinstance(name, str):
+        name = type(name).__module__
+    return _get_markdown_extension_version(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_markdown_extension_version(name):
+    # Extensions may be registered by name, as Markdown's own extensions are.
+    for entry_point in pkg_resources.iter_entry_points('markdown.extensions', name):
+        return entry_point.dist.version
+
+    package = name.split(':')[0].split('.')[0]
+    for dist in pkg_resources.working_set:
+        if dist.has_metadata('top_level.txt') and package in dist.get_metadata_lines('top_level.txt'):
+            return dist.version
+    return getattr(sys.modules.get(package), '__version__', None)
+
+
+@functools.lru_cache(maxsize=None)
+def get_pygments_version():
+    """ Return the version of Pygments, which is used to highlight code by Markdown extensions, if installed. """
+
+    try:
+        import pygments
+    except ImportError:
+        return None
+    return pygments.__version__
+
+
 def get_themes():
     """ Return a dict of all installed themes as (name, entry point) pairs. """
 
@@ -356,19 +622,11 @@ def get_markdown_title(markdown_src):
     """
     Get the title of a Markdown document. The title in this case is considered
     to be a H1 that occurs before any other content in the document.
-    The procedure is then to iterate through the lines, stopping at the first
-    non-whitespace content. If it is a title, return that, otherwise return
-    None.
+    The procedure is then to find the first non-whitespace content. If it is a
+    title, return that, otherwise return None.
     """
 
-    lines = markdown_src.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-    while lines:
-        line = lines.pop(0).strip()
-        if not line.strip():
-            continue
-        if not line.startswith('# '):
-            return
-        return line.lstrip('# ')
+    return meta.get_title(markdown_src)
 
 
 def find_or_create_node(branch, key):
@@ -429,3 +687,60 @@ class WarningFilter(logging.Filter):
 
 # A global instance to use throughout package
 warning_filter = WarningFilter()
+
+
+# The fingerprinted URL of each asset of the site being built, which `normalize_url` returns in
+# place of the URL of the asset. See `mkdocs.utils.fingerprint`.
+asset_urls = {}
+
+
+class OutputTracker:
+    """
+    Tracks the files written, or left unchanged, by `write_file` and `copy_file`.
+
+    `files` maps the absolute path of each output to a dict of the `source` and `producer`
+    which were set with `producing` when it was output, and the `hash` of any content
+    written from memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self.files = {}
+        self.written = 0
+        self.skipped = 0
+
+    @property
+    def paths(self):
+        return set(self.files)
+
+    @contextmanager
+    def producing(self, producer, source=None):
+        """
+        Attribute the files output by this thread within the context to a producer and source.
+
+        If no source is given, the source of any enclosing context is kept.
+        """
+        previous = getattr(self._local, 'state', (None, None))
+        self._local.state = (producer, source if source is not None else previous[1])
+        try:
+            yield
+        finally:
+            self._local.state = previous
+
+    def add(self, path, written, content_hash=None):
+        producer, source = getattr(self._local, 'state', (None, None))
+        record = {'source': source, 'producer': producer, 'hash': content_hash}
+        with self._lock:
+            self.files[os.path.abspath(path)] = record
+            if written:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+
+# A global instance to use throughout package
+output_tracker = OutputTracker()
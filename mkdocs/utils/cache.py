@@ -0,0 +1,103 @@
+"""
+A persistent, content addressed cache.
+
+Each entry is stored as a JSON file named after a hash of the inputs which produced it. The
+modification time of an entry is updated whenever it is used, so that the least recently used
+entries can be removed once the cache grows beyond its maximum size.
+"""
+
+
+import hashlib
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+
+def _json_default(obj):
+    """ Serialize objects which JSON does not support in a way that is stable across builds. """
+    if callable(obj) and hasattr(obj, '__qualname__'):
+        return '{}.{}'.format(getattr(obj, '__module__', ''), obj.__qualname__)
+    if hasattr(obj, 'getConfigs'):
+        # A `markdown.Extension` instance, whose repr includes its address.
+        return [_json_default(type(obj)), obj.getConfigs()]
+    return repr(obj)
+
+
+def get_key(*parts):
+    """ Return a hash of the given JSON serializable parts, for use as a cache key. """
+    data = json.dumps(parts, sort_keys=True, default=_json_default)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class Cache:
+    """
+    A directory of cached JSON values.
+
+    Keywords:
+
+        cache_dir: The directory in which the entries are stored. It is created when needed.
+
+        max_size: The size in bytes which the entries may use before `prune` removes any.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        """ Return the value stored for key, or `None` if there isn't a usable entry. """
+        path = self._get_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            # Record the use of the entry for `prune`.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def set(self, key, value):
+        """ Store a JSON serializable value for key. """
+        path = self._get_path(key)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, separators=(',', ':'))
+            # Replace atomically so that concurrent readers never see a partial entry.
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.debug("Unable to write cache entry '{}': {}".format(path, e))
+
+    def prune(self):
+        """ Remove the least recently used entries until the cache fits within `max_size`. """
+        entries = []
+        total = 0
+        for dirpath, dirnames, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+        for mtime, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
+        log.debug("Pruned the cache in '{}' to {} bytes.".format(self.cache_dir, total))
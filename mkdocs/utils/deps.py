@@ -0,0 +1,76 @@
+"""
+A record of the inputs which each output of a build depended on.
+
+The graph is stored between builds, so that an incremental build can skip any output whose inputs
+are unchanged and remove the outputs of sources which no longer exist.
+"""
+
+
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+
+class DependencyGraph:
+    """
+    The dependencies of the outputs of a build, keyed by the path of their source.
+
+    Keywords:
+
+        path: The file in which the graph is stored between builds. Output paths are relative to
+            the directory which contains it.
+
+        build_key: A key for the inputs which every output depends on (such as the config). A
+            stored graph with a different key is not used.
+    """
+
+    def __init__(self, path, build_key):
+        self.path = path
+        self.build_key = build_key
+        self.previous = {}
+        self.outputs = {}
+
+    def load(self):
+        """ Load the graph of the previous build. Return `False` if there isn't a usable one. """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('build') != self.build_key:
+            return False
+        self.previous = data.get('outputs', {})
+        return True
+
+    def _get_abs_path(self, dest_path):
+        return os.path.join(os.path.dirname(self.path), dest_path)
+
+    def is_changed(self, src_path, dest_path, deps):
+        """ Return `True` if the output of `src_path` needs to be built again. """
+        record = self.previous.get(src_path)
+        if record is None or record != {'dest_path': dest_path, 'deps': deps}:
+            return True
+        return not os.path.isfile(self._get_abs_path(dest_path))
+
+    def add(self, src_path, dest_path, deps):
+        """ Record the dependencies of the output of `src_path`. """
+        self.outputs[src_path] = {'dest_path': dest_path, 'deps': deps}
+
+    def get_removed(self, src_paths):
+        """ Return the absolute output paths of the previous build whose source is not in `src_paths`. """
+        src_paths = set(src_paths)
+        return [
+            self._get_abs_path(record['dest_path'])
+            for src_path, record in self.previous.items() if src_path not in src_paths
+        ]
+
+    def save(self):
+        """ Store the graph for the next build. """
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'build': self.build_key, 'outputs': self.outputs}, f, sort_keys=True)
+        except OSError as e:
+            log.debug("Unable to write dependency graph '{}': {}".format(self.path, e))
@@ -0,0 +1,120 @@
+"""
+Content-hash fingerprinted copies of static assets.
+
+A fingerprinted copy of an asset has the hash of its content in its name (such
+as `css/base.1a2b3c4d.css`), so that it can be cached by browsers forever: a
+changed asset gets a new name. The original files are still output, so that any
+references to them which cannot be rewritten (such as those built by scripts)
+continue to work.
+"""
+
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+from mkdocs import utils
+from mkdocs.utils.manifest import get_file_hash
+
+# The extensions of the assets which are fingerprinted.
+FINGERPRINT_EXTENSIONS = (
+    '.css', '.js',
+    '.eot', '.otf', '.ttf', '.woff', '.woff2',
+    '.gif', '.ico', '.jpeg', '.jpg', '.png', '.svg', '.webp',
+)
+
+# The file in the site_dir which maps the URL of each asset to its fingerprinted URL.
+MAPPING_FILENAME = 'asset-manifest.json'
+
+# Matches the `url()` references in a stylesheet.
+_CSS_URL_RE = re.compile(rb'''url\(\s*(['"]?)([^'")\s]+)\1\s*\)''')
+
+
+def get_fingerprinted_path(path, content_hash):
+    """ Return `path` with the first characters of `content_hash` inserted before its extension. """
+    root, ext = posixpath.splitext(path)
+    return '{}.{}{}'.format(root, content_hash[:8], ext)
+
+
+class Fingerprints:
+    """
+    The fingerprinted URLs of the assets of a site.
+
+    `urls` maps the URL of each asset (relative to the `site_dir`) to its fingerprinted URL.
+    """
+
+    def __init__(self, site_dir):
+        self.site_dir = site_dir
+        self.urls = {}
+        # The (file, fingerprinted path, rewritten content) of each asset. The content is `None`
+        # unless the asset is a stylesheet whose references were rewritten.
+        self._outputs = []
+
+    def add_files(self, files):
+        """ Fingerprint the assets in a `Files` collection. """
+        assets = [
+            file for file in files
+            if not file.is_documentation_page() and
+            os.path.splitext(file.src_path)[1].lower() in FINGERPRINT_EXTENSIONS
+        ]
+        # Stylesheets are fingerprinted last, so that their references to other assets can be
+        # rewritten first, and their hash includes the rewritten references.
+        assets.sort(key=lambda file: file.is_css())
+        for file in assets:
+            path = utils.path_to_url(file.dest_path)
+            content = None
+            if file.is_css():
+                with open(file.abs_src_path, 'rb') as f:
+                    content = self._rewrite_css(f.read(), path)
+                content_hash = hashlib.sha256(content).hexdigest()
+            else:
+                content_hash = get_file_hash(file.abs_src_path)
+            fingerprinted_path = get_fingerprinted_path(path, content_hash)
+            self.urls[path] = fingerprinted_path
+            self._outputs.append((file, fingerprinted_path, content))
+
+    def _rewrite_css(self, content, path):
+        """ Rewrite the `url()` references to fingerprinted assets in a stylesheet at `path`. """
+        base = posixpath.dirname(path)
+
+        def replace(match):
+            quote, ref = match.group(1), match.group(2).decode('utf-8', errors='surrogateescape')
+            # Keep any query string or fragment (which are common in references to fonts).
+            ref_path, sep, suffix = _split_ref(ref)
+            if not ref_path or ref_path.startswith('/') or ':' in ref_path:
+                return match.group(0)
+            target = posixpath.normpath(posixpath.join(base, ref_path))
+            if target not in self.urls:
+                return match.group(0)
+            new_ref = posixpath.join(posixpath.dirname(ref_path), posixpath.basename(self.urls[target]))
+            new_ref = (new_ref + sep + suffix).encode('utf-8', errors='surrogateescape')
+            return b'url(' + quote + new_ref + quote + b')'
+
+        return _CSS_URL_RE.sub(replace, content)
+
+    def write(self, mode='copy'):
+        """
+        Write the fingerprinted copy of each asset to the `site_dir` (using one of
+        `mkdocs.utils.COPY_MODES` for assets which are unchanged) and the mapping file.
+        """
+        for file, fingerprinted_path, content in self._outputs:
+            output_path = os.path.join(self.site_dir, *fingerprinted_path.split('/'))
+            with utils.output_tracker.producing('fingerprint', file.src_path):
+                if content is None:
+                    utils.copy_file(file.abs_src_path, output_path, mode)
+                else:
+                    utils.write_file(content, output_path)
+
+        mapping = json.dumps(self.urls, indent=2, sort_keys=True)
+        with utils.output_tracker.producing('fingerprint'):
+            utils.write_file(mapping.encode('utf-8'), os.path.join(self.site_dir, MAPPING_FILENAME))
+
+
+def _split_ref(ref):
+    """ Split a reference into its path, and the separator and remainder of any query or fragment. """
+    match = re.search(r'[?#]', ref)
+    if match is None:
+        return ref, '', ''
+    return ref[:match.start()], match.group(0), ref[match.end():]
@@ -0,0 +1,111 @@
+"""
+A manifest of the files output by a build, which is stored in the site_dir.
+
+The manifest of the previous build lists the files which a build can remove
+when they are no longer produced, without walking the whole site_dir.
+"""
+
+
+import hashlib
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = '.mkdocs-manifest.json'
+
+
+def get_file_hash(path):
+    """ Return the sha256 hash of the content of a file. """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class Manifest:
+    """
+    The files output by the builds to a site_dir.
+
+    `files` maps the path of each file (relative to the site_dir and using forward slashes) to a
+    dict of its `size`, `mtime`, content `hash`, and the `source` and `producer` which output it.
+    The manifest is `complete` if every file output to the site_dir, since it was last emptied of
+    stale files, is listed.
+    """
+
+    def __init__(self, site_dir):
+        self.site_dir = os.path.abspath(site_dir)
+        self.path = os.path.join(self.site_dir, MANIFEST_FILENAME)
+        self.files = {}
+        self.complete = False
+
+    def _get_abs_path(self, path):
+        return os.path.join(self.site_dir, *path.split('/'))
+
+    def _get_rel_path(self, path):
+        return os.path.relpath(path, self.site_dir).replace(os.sep, '/')
+
+    def load(self):
+        """ Load the manifest of the previous build. Return `False` if there isn't a usable one. """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = dict(data['files'])
+            self.complete = bool(data['complete'])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.files = {}
+            self.complete = False
+            return False
+        return True
+
+    def get_paths(self):
+        """ Return the absolute paths of the files in the manifest. """
+        return [self._get_abs_path(path) for path in self.files]
+
+    def update(self, outputs, complete):
+        """
+        Update the manifest with the files output by a build and store it.
+
+        `outputs` is a dict of absolute output paths to their records, as collected by
+        `mkdocs.utils.output_tracker`. If `complete` is true, the manifest is replaced rather
+        than updated, as the outputs are the only files which remain from any build.
+        """
+        previous = self.files
+        files = {} if complete else dict(previous)
+        for abs_path, output in outputs.items():
+            path = self._get_rel_path(abs_path)
+            if path.startswith('../'):
+                continue
+            files[path] = dict(output)
+
+        self.files = {}
+        for path, record in sorted(files.items()):
+            abs_path = self._get_abs_path(path)
+            try:
+                st = os.stat(abs_path)
+                content_hash = record.get('hash')
+                if content_hash is None:
+                    old = previous.get(path, {})
+                    if old.get('size') == st.st_size and old.get('mtime') == st.st_mtime_ns:
+                        # The file is unchanged since the hash was calculated.
+                        content_hash = old.get('hash')
+                    else:
+                        content_hash = get_file_hash(abs_path)
+            except OSError:
+                continue
+            self.files[path] = {
+                'size': st.st_size,
+                'mtime': st.st_mtime_ns,
+                'hash': content_hash,
+                'source': record.get('source'),
+                'producer': record.get('producer'),
+            }
+        self.complete = complete or self.complete
+
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'complete': self.complete, 'files': self.files}, f, indent=0, sort_keys=True)
+        except OSError as e:
+            log.debug("Unable to write build manifest '{}': {}".format(self.path, e))
@@ -49,6 +49,127 @@ YAML_RE = re.compile(r'^-{3}[ \t]*\n(.*?\n)(?:\.{3}|-{3})[ \t]*\n', re.UNICODE |
 META_RE = re.compile(r'^[ ]{0,3}(?P<key>[A-Za-z0-9_-]+):\s*(?P<value>.*)')
 META_MORE_RE = re.compile(r'^([ ]{4}|\t)(\s*)(?P<value>.*)')
 
+# The parts of `YAML_RE`, which are matched a line at a time so that only the header is scanned.
+YAML_START_RE = re.compile(r'-{3}[ \t]*\n')
+YAML_END_RE = re.compile(r'(?:\.{3}|-{3})[ \t]*\n')
+NEWLINE_RE = re.compile(r'\r\n|\r|\n')
+# The first line of a document which is not blank.
+FIRST_LINE_RE = re.compile(r'\s*([^\r\n]*)')
+
+
+def _iter_lines(doc, pos=0):
+    """
+    Yield each line of `doc` from `pos`, with the position which follows it, as `str.split` would
+    split the document after normalizing its line endings. The lines are found as they are used,
+    so the rest of the document is not split.
+    """
+    while True:
+        m = NEWLINE_RE.search(doc, pos)
+        if m is None:
+            yield doc[pos:], len(doc)
+            return
+        yield doc[pos:m.start()], m.end()
+        pos = m.end()
+
+
+def _normalize(doc):
+    if '\r' in doc:
+        doc = doc.replace('\r\n', '\n').replace('\r', '\n')
+    return doc
+
+
+def _match_yaml(doc):
+    """
+    Return the start and end of the data of a YAML header, and the position at which the document
+    continues after the header, as matched by `YAML_RE`. Return `None` if there isn't a header.
+    Only the lines of the header are scanned.
+    """
+    m = YAML_START_RE.match(doc)
+    if m is None:
+        return None
+    start = m.end()
+    end = doc.find('\n', start)
+    while end != -1:
+        m = YAML_END_RE.match(doc, end + 1)
+        if m is not None:
+            return start, end + 1, m.end()
+        end = doc.find('\n', end + 1)
+    return None
+
+
+def get_title(doc):
+    """
+    Return the title of a Markdown document, which is the content of a H1 that occurs before any
+    other content in the document, or `None`. Only the start of the document is scanned.
+    """
+    line = FIRST_LINE_RE.match(doc).group(1).strip()
+    if not line.startswith('# '):
+        return None
+    return line.lstrip('# ')
+
+
+def get_header(doc):
+    """
+    Extract meta-data and the title from the header of a text document in a single pass, which
+    stops at the end of the header.
+
+    Returns a tuple of the document (without any meta-data), a data dict, and the title as
+    returned by `get_title`.
+    """
+    doc, data = get_data(doc)
+    return doc, data, get_title(doc)
+
+
+def _is_header_complete(doc):
+    """
+    Return whether `doc`, the start of a document, contains all of the document's header (and the
+    line which follows it), so that `get_header` returns the same data and title for it as for the
+    whole document.
+    """
+    # The last line may be cut short.
+    doc = doc[:doc.rfind('\n') + 1]
+
+    if YAML_START_RE.match(doc):
+        m = _match_yaml(doc)
+        if m is None:
+            return False
+        pos = m[2]
+    else:
+        key = None
+        pos = 0
+        for line, next_pos in _iter_lines(doc):
+            if pos == len(doc):
+                return False
+            if line.strip() == '':
+                break
+            m1 = META_RE.match(line)
+            if m1:
+                key = m1.group('key')
+            elif not (key and META_MORE_RE.match(line)):
+                break
+            pos = next_pos
+
+    # The first line of content (which may be the title) must be complete.
+    return FIRST_LINE_RE.match(doc, pos).end() < len(doc)
+
+
+def read_header(f, size=4096):
+    """
+    Extract meta-data and the title from the header of a text file object, reading only as much
+    of the file as is needed (in chunks starting at `size` characters).
+
+    Returns a tuple of a data dict and the title, as returned by `get_header`.
+    """
+    doc = ''
+    while True:
+        chunk = f.read(size)
+        doc += chunk
+        if not chunk or _is_header_complete(doc):
+            break
+        size *= 2
+    doc, data, title = get_header(doc)
+    return data, title
+
 
 def get_data(doc):
     """
@@ -59,12 +180,13 @@ def get_data(doc):
     data = {}
 
     # First try YAML
-    m = YAML_RE.match(doc)
+    m = _match_yaml(doc)
     if m:
+        start, end, pos = m
         try:
-            data = yaml.load(m.group(1), SafeLoader)
+            data = yaml.load(doc[start:end], SafeLoader)
             if isinstance(data, dict):
-                doc = doc[m.end():].lstrip('\n')
+                doc = doc[pos:].lstrip('\n')
             else:
                 data = {}
         except Exception:
@@ -72,13 +194,11 @@ def get_data(doc):
         return doc, data
 
     # No YAML deliminators. Try MultiMarkdown style
-    lines = doc.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-
     key = None
-    while lines:
-        line = lines.pop(0)
-
+    pos = 0
+    for line, next_pos in _iter_lines(doc):
         if line.strip() == '':
+            pos = next_pos
             break  # blank line - done
         m1 = META_RE.match(line)
         if m1:
@@ -94,6 +214,6 @@ def get_data(doc):
                 # Add another line to existing key
                 data[key] += ' {}'.format(m2.group('value').strip())
             else:
-                lines.insert(0, line)
                 break  # no meta data - done
-    return '\n'.join(lines).lstrip('\n'), data
+        pos = next_pos
+    return _normalize(doc[pos:]).lstrip('\n'), data
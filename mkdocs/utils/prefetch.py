@@ -0,0 +1,166 @@
+"""
+Read the source files of pages ahead of their use, on background threads.
+
+Pages are rendered one after another, so on a slow file system (such as a
+network file system) reading each source file when its page is rendered stalls
+the rendering. A `Prefetcher` reads the files of the pages which follow in a
+pool of threads instead, keeping no more than a given number of bytes in memory
+which have not yet been used.
+"""
+
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# The default number of bytes which may be read ahead of use.
+MAX_SIZE = 16 * 1024 * 1024
+
+# The default number of threads which read files.
+MAX_WORKERS = 4
+
+# The states of each path: waiting to be read, read (or being read), and skipped.
+_PENDING, _ADMITTED, _SKIPPED = range(3)
+
+
+class Prefetcher:
+    """
+    Read a list of files, in order, ahead of their use.
+
+    The files are read in the order given, and a file is only read once the files
+    read before it (but not yet used) and the file itself fit within `max_size`
+    bytes. A file which is larger than `max_size` is read once nothing else is held.
+    Use the content of each file with `read` (or `read_text`), ideally in the same
+    order. Files which are passed over are released.
+
+    Keywords:
+
+        paths: The paths of the files, in the order in which they will be used.
+
+        max_size: The number of bytes which may be held before they are used.
+
+        max_workers: The number of threads which read files.
+    """
+
+    def __init__(self, paths, max_size=MAX_SIZE, max_workers=MAX_WORKERS):
+        self.max_size = max_size
+        self._paths = list(paths)
+        self._index = {path: index for index, path in reversed(list(enumerate(self._paths)))}
+        self._states = [_PENDING] * len(self._paths)
+        self._sizes = [0] * len(self._paths)
+        # The number of bytes read (or being read) which have not been used.
+        self._held = 0
+        # The first path which has not been read or skipped, which must be read before any other.
+        self._next = 0
+        # The first path which has not been used or passed over.
+        self._used = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='mkdocs_prefetch')
+        self._futures = [self._executor.submit(self._read, index) for index in range(len(self._paths))]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def held(self):
+        """ The number of bytes which have been read (or are being read) but not used. """
+        with self._cond:
+            return self._held
+
+    def _advance(self):
+        while self._next < len(self._states) and self._states[self._next] != _PENDING:
+            self._next += 1
+
+    def _read(self, index):
+        """ Read a file once it is the next to be read and it fits. Runs on a thread of the pool. """
+        path = self._paths[index]
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        with self._cond:
+            self._cond.wait_for(lambda: (
+                self._closed or self._states[index] != _PENDING or
+                (self._next == index and (self._held == 0 or self._held + size <= self.max_size))
+            ))
+            if self._states[index] != _PENDING or self._closed:
+                return None
+            self._states[index] = _ADMITTED
+            self._sizes[index] = size
+            self._held += size
+            self._advance()
+            self._cond.notify_all()
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            # The error is raised when the file is read again by its user.
+            return None
+
+    def _release(self, index):
+        """ Release the bytes held for a path, and its content. Call with the condition held. """
+        if self._states[index] == _ADMITTED:
+            self._held -= self._sizes[index]
+        self._states[index] = _SKIPPED
+        future = self._futures[index]
+        if future is not None:
+            future.cancel()
+            self._futures[index] = None
+        self._cond.notify_all()
+
+    def read(self, path):
+        """
+        Return the content of the file at `path` as bytes, waiting for it to be read if needed.
+
+        Return `None` if the file is not one of the paths, has already been used or could not be
+        read. The caller should then read the file itself.
+        """
+        index = self._index.get(path)
+        if index is None:
+            return None
+        with self._cond:
+            if self._closed or index < self._used:
+                return None
+            # Pass over any paths which were not used, so that they no longer hold up the others.
+            for skipped in range(self._used, index):
+                self._release(skipped)
+            self._used = index + 1
+            self._advance()
+            future = self._futures[index]
+        try:
+            return future.result()
+        finally:
+            with self._cond:
+                self._release(index)
+                self._advance()
+
+    def read_text(self, path, encoding='utf-8-sig'):
+        """
+        Return the content of the file at `path` as `str`, with line endings translated as
+        `open` does in text mode, or `None` as for `read`. A `ValueError` is raised if the
+        content can not be decoded.
+        """
+        data = self.read(path)
+        if data is None:
+            return None
+        text = data.decode(encoding)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    def close(self):
+        """ Stop reading files and release everything which has been read. """
+        with self._cond:
+            self._closed = True
+            for future in self._futures:
+                if future is not None:
+                    future.cancel()
+            self._cond.notify_all()
+        self._executor.shutdown(wait=True)
+        with self._cond:
+            for index in range(len(self._futures)):
+                self._release(index)
@@ -0,0 +1,91 @@
+"""
+A snapshot of the source files of a build, which is stored in the cache_dir.
+
+The snapshot records the size, modification time, inode and content hash of
+each source file. Comparing a new scan with the snapshot of the previous build
+gives the exact sets of files which were added, changed and removed, even when
+the modification times of every file have changed (such as after a checkout or
+when a cache is restored in CI), and a file is only hashed when its stat data
+has changed.
+"""
+
+
+import json
+import logging
+import os
+
+from mkdocs.utils.cache import get_key
+from mkdocs.utils.manifest import get_file_hash
+
+log = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """
+    The source files of the builds to a site_dir.
+
+    `files` maps the absolute path of each file to a list of its size, mtime (in nanoseconds),
+    inode and content hash. After a `scan`, `added`, `changed` and `removed` are the sets of paths
+    which differ from the snapshot of the previous build.
+
+    Keywords:
+
+        cache_dir: The directory in which snapshots are stored.
+
+        site_dir: The site_dir of the builds. Each site_dir has its own snapshot, as the snapshot
+            describes the sources of the files in it.
+    """
+
+    def __init__(self, cache_dir, site_dir):
+        self.path = os.path.join(cache_dir, get_key(os.path.abspath(site_dir)) + '.json')
+        self.previous = {}
+        self.files = {}
+        self.added = set()
+        self.changed = set()
+        self.removed = set()
+
+    def load(self):
+        """ Load the snapshot of the previous build. Return `False` if there isn't a usable one. """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.previous = dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            self.previous = {}
+            return False
+        return True
+
+    def scan(self, paths):
+        """ Record the files at `paths`, hashing only those whose stat data has changed. """
+        self.files = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stat = [st.st_size, st.st_mtime_ns, st.st_ino]
+                old = self.previous.get(path)
+                if old is not None and old[:3] == stat:
+                    content_hash = old[3]
+                else:
+                    content_hash = get_file_hash(path)
+            except OSError:
+                continue
+            self.files[path] = stat + [content_hash]
+
+        self.added = set(self.files) - set(self.previous)
+        self.removed = set(self.previous) - set(self.files)
+        self.changed = {
+            path for path, record in self.files.items()
+            if path in self.previous and self.previous[path][3] != record[3]
+        }
+
+    def is_changed(self, path):
+        """ Return `True` unless the content of the file at `path` is the same as in the previous build. """
+        return path not in self.files or path in self.added or path in self.changed
+
+    def save(self):
+        """ Store the snapshot for the next build. """
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.files, f, separators=(',', ':'), sort_keys=True)
+        except OSError as e:
+            log.debug("Unable to write source snapshot '{}': {}".format(self.path, e))